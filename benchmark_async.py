@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Async throughput benchmark
+Shows how AsyncRepository.findOne throughput scales with the number of concurrent coroutines
+"""
+
+import asyncio
+import os
+import time
+
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+TEST_RECORDS = 1000
+QUERIES_PER_LEVEL = 5000
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", 5432)),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", "password"),
+    "database": os.getenv("DB_NAME", "benchmark_test"),
+}
+
+
+async def run_level(userRepo, ids, concurrency: int) -> float:
+    """Run QUERIES_PER_LEVEL findOne calls with `concurrency` workers, return queries/s"""
+    queue = asyncio.Queue()
+    for i in range(QUERIES_PER_LEVEL):
+        queue.put_nowait(ids[i % len(ids)])
+
+    async def worker():
+        while not queue.empty():
+            await userRepo.findOne(queue.get_nowait())
+
+    start_time = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start_time
+    return QUERIES_PER_LEVEL / elapsed
+
+
+async def benchmark_async():
+    """Measure findOne throughput at increasing concurrency"""
+    print("🚀 ASYNC THROUGHPUT BENCHMARK")
+    print("=" * 60)
+
+    try:
+        from takeo import Entity, PrimaryGeneratedColumn, Column, createAsyncConnection
+
+        @Entity("async_benchmark_users")
+        class User:
+            def __init__(self):
+                self.id = None
+                self.name = None
+                self.email = None
+                self.age = None
+
+            id = PrimaryGeneratedColumn()
+            name = Column("VARCHAR(100)", nullable=False)
+            email = Column("VARCHAR(255)")
+            age = Column("INTEGER")
+
+        connection = await createAsyncConnection(
+            **DB_CONFIG, max_open_conns=max(CONCURRENCY_LEVELS)
+        )
+        userRepo = connection.getRepository(User)
+        connection._connection._api.CreateTable("User")
+
+        users = []
+        for i in range(TEST_RECORDS):
+            user = User()
+            user.name = f"Async User {i}"
+            user.email = f"async{i}@test.com"
+            user.age = 20 + (i % 50)
+            users.append(user)
+        await userRepo.saveBatch(users)
+        ids = [user.id for user in users]
+
+        print(f"📊 {QUERIES_PER_LEVEL:,} findOne calls per level\n")
+        baseline = None
+        for concurrency in CONCURRENCY_LEVELS:
+            throughput = await run_level(userRepo, ids, concurrency)
+            baseline = baseline or throughput
+            print(
+                f"   concurrency {concurrency:>3}: {throughput:10,.0f} queries/s "
+                f"({throughput / baseline:.1f}x)"
+            )
+
+        stats = await connection.poolStats()
+        print(
+            f"\n   Pool: {stats['open_connections']} open, "
+            f"{stats['wait_count']} waits ({stats['wait_duration']:.3f}s)"
+        )
+
+        # Cleanup
+        connection._connection._api.DropTable("User")
+        await connection.close()
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    asyncio.run(benchmark_async())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Bulk ingest benchmark: INSERT ... VALUES vs COPY FROM STDIN
+Compares both saveBatch paths at 1k, 10k and 100k rows
+"""
+
+import os
+import time
+
+BATCH_SIZES = [1_000, 10_000, 100_000]
+TEST_ITERATIONS = 3
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "port": int(os.getenv("DB_PORT", 5432)),
+    "user": os.getenv("DB_USER", "postgres"),
+    "password": os.getenv("DB_PASSWORD", "password"),
+    "database": os.getenv("DB_NAME", "benchmark_test"),
+}
+
+# copy_threshold=0 désactive COPY, copy_threshold=1 force COPY pour tout batch > 1
+MODES = {"VALUES": 0, "COPY": 1}
+
+
+def benchmark_bulk_ingest():
+    """Time saveBatch through the VALUES and COPY paths"""
+    print("🚀 BULK INGEST BENCHMARK: VALUES vs COPY")
+    print("=" * 60)
+
+    try:
+        from takeo import Entity, PrimaryGeneratedColumn, Column, createConnection
+
+        @Entity("bulk_benchmark_users")
+        class User:
+            def __init__(self):
+                self.id = None
+                self.name = None
+                self.email = None
+                self.age = None
+
+            id = PrimaryGeneratedColumn()
+            name = Column("VARCHAR(100)", nullable=False)
+            email = Column("VARCHAR(255)")
+            age = Column("INTEGER")
+
+        connection = createConnection(**DB_CONFIG)
+        userRepo = connection.getRepository(User)
+
+        results = {}
+        for size in BATCH_SIZES:
+            for mode, threshold in MODES.items():
+                connection._api.SetCopyThreshold(threshold)
+                timings = []
+                for _ in range(TEST_ITERATIONS):
+                    connection._api.DropTable("User")
+                    connection._api.CreateTable("User")
+
+                    users = []
+                    for i in range(size):
+                        user = User()
+                        user.name = f"Bulk User {i}"
+                        user.email = f"bulk{i}@test.com"
+                        user.age = 20 + (i % 50)
+                        users.append(user)
+
+                    start_time = time.perf_counter()
+                    userRepo.saveBatch(users)
+                    timings.append((time.perf_counter() - start_time) * 1000)
+
+                    assert users[-1].id is not None, "ids were not assigned"
+
+                best = min(timings)
+                results[(mode, size)] = best
+                print(
+                    f"   {mode:<6} {size:>7,} rows: {best:10.1f}ms "
+                    f"({size / best * 1000:,.0f} rows/s)"
+                )
+
+        print(f"\n📈 RESULTS (best of {TEST_ITERATIONS}):")
+        for size in BATCH_SIZES:
+            values_time = results.get(("VALUES", size))
+            copy_time = results.get(("COPY", size))
+            if values_time and copy_time:
+                print(f"   {size:>7,} rows: COPY is {values_time / copy_time:.2f}x faster")
+
+        # Cleanup
+        connection._api.DropTable("User")
+        connection.close()
+
+    except Exception as e:
+        print(f"❌ Error: {e}")
+        import traceback
+
+        traceback.print_exc()
+
+
+if __name__ == "__main__":
+    benchmark_bulk_ingest()
@@ -0,0 +1,410 @@
+package core
+
+import (
+	"database/sql"
+	"fmt"
+	"sort"
+	"strings"
+
+	"github.com/lib/pq"
+)
+
+// DefaultCopyThreshold est la taille de batch au-delà de laquelle SaveBatch
+// bascule de INSERT ... VALUES vers COPY FROM STDIN
+const DefaultCopyThreshold = 1000
+
+// copySequenceSQL retourne la séquence de la clé primaire et si elle est
+// GENERATED ALWAYS AS IDENTITY, lues au moment de l'insertion (la table peut
+// être créée après l'enregistrement de l'entité)
+const copySequenceSQL = `SELECT pg_get_serial_sequence($1, $2),
+	COALESCE((SELECT attidentity = 'a' FROM pg_attribute
+		WHERE attrelid = to_regclass($1) AND attname = $2 AND NOT attisdropped), false)`
+
+// MaxBindParams est le nombre maximum de paramètres bind d'un statement PostgreSQL
+const MaxBindParams = 65535
+
+// batchRowsPerChunk retourne le nombre de lignes par INSERT ... VALUES pour rester
+// sous MaxBindParams
+func batchRowsPerChunk(columnCount, total int) int {
+	if columnCount == 0 {
+		return total
+	}
+	if maxRows := MaxBindParams / columnCount; maxRows < total {
+		return maxRows
+	}
+	return total
+}
+
+// saveBatchTx insère un batch dans tx et retourne les IDs dans l'ordre d'entrée.
+// Les lignes sont regroupées par ensemble de colonnes fournies (groupInserts) :
+// une colonne absente d'une ligne prend son DEFAULT, pas NULL.
+func saveBatchTx(tx *sql.Tx, metadata *EntityMetadata, entitiesData []map[string]interface{}, copyThreshold int) ([]int64, error) {
+	groups := groupInserts(metadata, entitiesData)
+	if len(groups) == 1 {
+		return insertGroupTx(tx, metadata, groups[0].columns, entitiesData, copyThreshold)
+	}
+
+	ids := make([]int64, len(entitiesData))
+	for _, group := range groups {
+		groupIDs, err := insertGroupTx(tx, metadata, group.columns, group.rows, copyThreshold)
+		if err != nil {
+			return nil, err
+		}
+		for i, pos := range group.positions {
+			ids[pos] = groupIDs[i]
+		}
+	}
+	return ids, nil
+}
+
+// insertGroupTx insère des lignes qui fournissent toutes columns : COPY au-delà
+// de copyThreshold (si la clé primaire a une séquence et n'est pas GENERATED
+// ALWAYS), INSERT ... VALUES sinon
+func insertGroupTx(tx *sql.Tx, metadata *EntityMetadata, columns []string, entitiesData []map[string]interface{}, copyThreshold int) ([]int64, error) {
+	// Large batches go through COPY, which skips parsing/planning a huge VALUES list
+	if copyThreshold > 0 && len(entitiesData) > copyThreshold {
+		ids, ok, err := insertCopy(tx, metadata, columns, entitiesData)
+		if err != nil {
+			return nil, err
+		}
+		if ok {
+			return ids, nil
+		}
+	}
+
+	plan := metadata.plan()
+	return insertValues(tx, columns, entitiesData, func(rowCount int) string {
+		if len(columns) == len(plan.insertColumns) {
+			return plan.batchInsertSQL(metadata, rowCount)
+		}
+		return metadata.BuildBatchInsertColumnsQuery(columns, rowCount)
+	})
+}
+
+// insertGroup regroupe les lignes d'un batch qui fournissent le même ensemble de
+// colonnes; positions[i] est la position de rows[i] dans le batch
+type insertGroup struct {
+	columns   []string
+	rows      []map[string]interface{}
+	positions []int
+}
+
+// groupInserts regroupe les lignes par ensemble de colonnes insérables présentes,
+// dans l'ordre de première apparition. Un batch homogène (le cas courant) forme
+// un seul groupe, sans copie des lignes.
+func groupInserts(metadata *EntityMetadata, entitiesData []map[string]interface{}) []*insertGroup {
+	insertColumns := metadata.plan().insertColumns
+	mask := make([]byte, (len(insertColumns)+7)/8)
+
+	byMask := make(map[string]*insertGroup)
+	var groups []*insertGroup
+	for pos, entityData := range entitiesData {
+		for i := range mask {
+			mask[i] = 0
+		}
+		for i, colName := range insertColumns {
+			if _, exists := entityData[colName]; exists {
+				mask[i/8] |= 1 << (i % 8)
+			}
+		}
+
+		group, exists := byMask[string(mask)]
+		if !exists {
+			group = &insertGroup{columns: make([]string, 0, len(insertColumns))}
+			for i, colName := range insertColumns {
+				if mask[i/8]&(1<<(i%8)) != 0 {
+					group.columns = append(group.columns, colName)
+				}
+			}
+			byMask[string(mask)] = group
+			groups = append(groups, group)
+		}
+		group.rows = append(group.rows, entityData)
+		group.positions = append(group.positions, pos)
+	}
+	return groups
+}
+
+// insertValues insère un batch via INSERT ... VALUES ... RETURNING, découpé en
+// chunks qui respectent la limite de paramètres. Chaque ligne lie columns;
+// buildQuery produit le SQL d'un chunk de n lignes (BuildBatchInsertQuery, ou un
+// upsert). Un statement est préparé par taille de chunk (au plus deux : chunk
+// plein et reliquat) et réutilisé.
+func insertValues(tx *sql.Tx, columns []string, entitiesData []map[string]interface{}, buildQuery func(rowCount int) string) ([]int64, error) {
+	rowsPerChunk := batchRowsPerChunk(len(columns), len(entitiesData))
+
+	stmts := make(map[int]*sql.Stmt)
+	defer func() {
+		for _, stmt := range stmts {
+			stmt.Close()
+		}
+	}()
+
+	ids := make([]int64, 0, len(entitiesData))
+	args := make([]interface{}, 0, rowsPerChunk*len(columns))
+
+	for start := 0; start < len(entitiesData); start += rowsPerChunk {
+		end := start + rowsPerChunk
+		if end > len(entitiesData) {
+			end = len(entitiesData)
+		}
+		chunk := entitiesData[start:end]
+
+		stmt, exists := stmts[len(chunk)]
+		if !exists {
+			var err error
+			stmt, err = tx.Prepare(buildQuery(len(chunk)))
+			if err != nil {
+				return nil, err
+			}
+			stmts[len(chunk)] = stmt
+		}
+
+		// Every row binds every column so all rows share the chunk shape;
+		// missing keys (upserts only) are written as NULL
+		args = args[:0]
+		for _, entityData := range chunk {
+			for _, colName := range columns {
+				args = append(args, entityData[colName])
+			}
+		}
+
+		var err error
+		ids, err = scanIDs(stmt, args, ids)
+		if err != nil {
+			return nil, err
+		}
+	}
+
+	return ids, nil
+}
+
+// scanIDs exécute un INSERT ... RETURNING et ajoute les IDs retournés à ids
+func scanIDs(stmt *sql.Stmt, args []interface{}, ids []int64) ([]int64, error) {
+	rows, err := stmt.Query(args...)
+	if err != nil {
+		return nil, err
+	}
+	defer rows.Close()
+
+	for rows.Next() {
+		var id int64
+		if err := rows.Scan(&id); err != nil {
+			return nil, err
+		}
+		ids = append(ids, id)
+	}
+
+	return ids, rows.Err()
+}
+
+// insertCopy insère un batch via COPY FROM STDIN.
+//
+// COPY ne supporte pas RETURNING : les clés primaires sont donc réservées à
+// l'avance sur la séquence de la table puis écrites explicitement, ce qui
+// garantit que ids[i] correspond à entitiesData[i]. Retourne ok=false (sans
+// rien écrire) si la clé primaire n'est pas adossée à une séquence, ou si c'est
+// une colonne GENERATED ALWAYS AS IDENTITY : COPY n'a pas d'OVERRIDING SYSTEM
+// VALUE et refuserait les IDs explicites.
+func insertCopy(tx *sql.Tx, metadata *EntityMetadata, columns []string, entitiesData []map[string]interface{}) (ids []int64, ok bool, err error) {
+	var sequence sql.NullString
+	var identityAlways bool
+	err = tx.QueryRow(copySequenceSQL, metadata.TableName, metadata.PrimaryKey).Scan(&sequence, &identityAlways)
+	if err != nil {
+		return nil, false, err
+	}
+	if !sequence.Valid || identityAlways {
+		return nil, false, nil
+	}
+
+	ids, err = reserveSequenceValues(tx, sequence.String, len(entitiesData))
+	if err != nil {
+		return nil, true, err
+	}
+
+	// Columns left out take their DEFAULT, as with INSERT
+	copyColumns := append([]string{metadata.PrimaryKey}, columns...)
+
+	stmt, err := tx.Prepare(pq.CopyIn(metadata.TableName, copyColumns...))
+	if err != nil {
+		return nil, true, err
+	}
+	defer stmt.Close()
+
+	// Reuse a single row buffer: lib/pq encodes the values before Exec returns
+	row := make([]interface{}, len(copyColumns))
+	for i, entityData := range entitiesData {
+		row[0] = ids[i]
+		for j, colName := range columns {
+			row[j+1] = entityData[colName]
+		}
+		if _, err := stmt.Exec(row...); err != nil {
+			return nil, true, err
+		}
+	}
+
+	// Flush the COPY buffer
+	if _, err := stmt.Exec(); err != nil {
+		return nil, true, err
+	}
+
+	return ids, true, nil
+}
+
+// reserveSequenceValues réserve n valeurs sur une séquence en un seul aller-retour
+func reserveSequenceValues(tx *sql.Tx, sequence string, n int) ([]int64, error) {
+	rows, err := tx.Query("SELECT nextval($1::regclass) FROM generate_series(1, $2)", sequence, n)
+	if err != nil {
+		return nil, err
+	}
+	defer rows.Close()
+
+	ids := make([]int64, 0, n)
+	for rows.Next() {
+		var id int64
+		if err := rows.Scan(&id); err != nil {
+			return nil, err
+		}
+		ids = append(ids, id)
+	}
+	if err := rows.Err(); err != nil {
+		return nil, err
+	}
+	if len(ids) != n {
+		return nil, fmt.Errorf("reserved %d sequence values, expected %d", len(ids), n)
+	}
+
+	return ids, nil
+}
+
+// updateBatchTx écrit des mises à jour dans tx, un groupe de colonnes à la fois,
+// et retourne le nombre de lignes modifiées
+func updateBatchTx(tx *sql.Tx, metadata *EntityMetadata, updates []UpdateData) (int64, error) {
+	groups := groupUpdates(metadata, updates)
+	if len(groups) == 0 {
+		return 0, fmt.Errorf("no valid fields to update")
+	}
+
+	var affected int64
+	for _, group := range groups {
+		n, err := execUpdateGroup(tx, metadata, group)
+		if err != nil {
+			return 0, err
+		}
+		affected += n
+	}
+	return affected, nil
+}
+
+// updateGroup regroupe des mises à jour qui modifient le même ensemble de colonnes
+type updateGroup struct {
+	columns []string
+	rows    []UpdateData
+}
+
+// groupUpdates fusionne les mises à jour par ID (la dernière valeur gagne), ignore
+// les colonnes inconnues ou auto-générées comme Update, puis regroupe les lignes par
+// ensemble de colonnes. Les groupes et leurs colonnes sont triés pour que le texte
+// SQL soit stable d'un appel à l'autre.
+func groupUpdates(metadata *EntityMetadata, updates []UpdateData) []*updateGroup {
+	merged := make(map[int64]map[string]interface{}, len(updates))
+	order := make([]int64, 0, len(updates))
+	for _, update := range updates {
+		values, exists := merged[update.ID]
+		if !exists {
+			values = make(map[string]interface{}, len(update.Updates))
+			merged[update.ID] = values
+			order = append(order, update.ID)
+		}
+		for colName, value := range update.Updates {
+			if col, exists := metadata.Columns[colName]; exists && !col.IsPrimaryKey && !col.IsAutoIncrement {
+				values[colName] = value
+			}
+		}
+	}
+
+	byKey := make(map[string]*updateGroup)
+	var keys []string
+	for _, id := range order {
+		values := merged[id]
+		if len(values) == 0 {
+			continue
+		}
+
+		columns := make([]string, 0, len(values))
+		for colName := range values {
+			columns = append(columns, colName)
+		}
+		sort.Strings(columns)
+
+		key := strings.Join(columns, ",")
+		group, exists := byKey[key]
+		if !exists {
+			group = &updateGroup{columns: columns}
+			byKey[key] = group
+			keys = append(keys, key)
+		}
+		group.rows = append(group.rows, UpdateData{ID: id, Updates: values})
+	}
+
+	sort.Strings(keys)
+	groups := make([]*updateGroup, len(keys))
+	for i, key := range keys {
+		groups[i] = byKey[key]
+	}
+	return groups
+}
+
+// execUpdateGroup écrit un groupe via UPDATE ... FROM (VALUES ...), découpé en chunks
+// qui respectent la limite de paramètres, et retourne le nombre de lignes modifiées
+func execUpdateGroup(tx *sql.Tx, metadata *EntityMetadata, group *updateGroup) (int64, error) {
+	rowsPerChunk := batchRowsPerChunk(len(group.columns)+1, len(group.rows))
+
+	stmts := make(map[int]*sql.Stmt)
+	defer func() {
+		for _, stmt := range stmts {
+			stmt.Close()
+		}
+	}()
+
+	var affected int64
+	args := make([]interface{}, 0, rowsPerChunk*(len(group.columns)+1))
+
+	for start := 0; start < len(group.rows); start += rowsPerChunk {
+		end := start + rowsPerChunk
+		if end > len(group.rows) {
+			end = len(group.rows)
+		}
+		chunk := group.rows[start:end]
+
+		stmt, exists := stmts[len(chunk)]
+		if !exists {
+			var err error
+			stmt, err = tx.Prepare(metadata.BuildBatchUpdateQuery(group.columns, len(chunk)))
+			if err != nil {
+				return 0, err
+			}
+			stmts[len(chunk)] = stmt
+		}
+
+		args = args[:0]
+		for _, row := range chunk {
+			args = append(args, row.ID)
+			for _, colName := range group.columns {
+				args = append(args, row.Updates[colName])
+			}
+		}
+
+		result, err := stmt.Exec(args...)
+		if err != nil {
+			return 0, err
+		}
+		n, err := result.RowsAffected()
+		if err != nil {
+			return 0, err
+		}
+		affected += n
+	}
+
+	return affected, nil
+}
@@ -0,0 +1,230 @@
+package core
+
+import (
+	"database/sql"
+	"fmt"
+	"sync"
+	"time"
+
+	"github.com/lib/pq"
+)
+
+// DefaultCacheSyncChannel est le canal LISTEN/NOTIFY utilisé par défaut
+const DefaultCacheSyncChannel = "takeo_cache"
+
+// Reconnexion du listener et ping périodique de sa connexion dédiée
+const (
+	cacheSyncMinReconnect = 100 * time.Millisecond
+	cacheSyncMaxReconnect = time.Minute
+	cacheSyncPingInterval = 90 * time.Second
+)
+
+// notifySQL envoie une notification; canal et entité sont passés en paramètres
+const notifySQL = "SELECT pg_notify($1, $2)"
+
+// cacheTriggerFunctionSQL est la fonction des triggers installés par
+// InstallCacheTrigger : elle notifie TG_ARGV[0] avec le nom d'entité TG_ARGV[1]
+const cacheTriggerFunctionSQL = `CREATE OR REPLACE FUNCTION takeo_cache_notify() RETURNS trigger AS $$
+BEGIN
+	PERFORM pg_notify(TG_ARGV[0], TG_ARGV[1]);
+	RETURN NULL;
+END;
+$$ LANGUAGE plpgsql`
+
+// cacheSync propage les invalidations du cache de résultats entre processus :
+// chaque écriture envoie NOTIFY sur channel avec le nom de l'entité, et un goroutine en LISTEN sur une connexion dédiée invalide
+// localement les entités notifiées.
+type cacheSync struct {
+	manager  *TakeoManager
+	channel  string
+	listener *pq.Listener
+	stop     chan struct{}
+	stopped  chan struct{}
+
+	mu        sync.Mutex
+	triggered map[string]bool // entités déjà notifiées par un trigger
+}
+
+func newCacheSync(manager *TakeoManager, channel string, listener *pq.Listener) *cacheSync {
+	s := &cacheSync{
+		manager:   manager,
+		channel:   channel,
+		listener:  listener,
+		stop:      make(chan struct{}),
+		stopped:   make(chan struct{}),
+		triggered: make(map[string]bool),
+	}
+	go s.run()
+	return s
+}
+
+// run applique les notifications reçues jusqu'à close
+func (s *cacheSync) run() {
+	defer close(s.stopped)
+
+	ping := time.NewTicker(cacheSyncPingInterval)
+	defer ping.Stop()
+
+	for {
+		select {
+		case notification, ok := <-s.listener.Notify:
+			if !ok {
+				return
+			}
+			if notification == nil {
+				// Reconnected: notifications sent while disconnected are lost
+				s.manager.invalidateAllLocal()
+				continue
+			}
+			s.manager.invalidateLocal(notification.Extra)
+		case <-ping.C:
+			// Detects a dead connection; the listener then reconnects by itself
+			go s.listener.Ping()
+		case <-s.stop:
+			return
+		}
+	}
+}
+
+// notifies indique si une écriture sur entityType doit envoyer une notification :
+// toujours, sauf si un trigger la couvre déjà. Un autre processus peut mettre en
+// cache ou répliquer une entité que ce processus se contente d'écrire.
+func (s *cacheSync) notifies(entityType string) bool {
+	s.mu.Lock()
+	defer s.mu.Unlock()
+	return !s.triggered[entityType]
+}
+
+// close arrête le goroutine puis ferme la connexion LISTEN
+func (s *cacheSync) close() error {
+	close(s.stop)
+	<-s.stopped
+	return s.listener.Close()
+}
+
+// EnableCacheSync active l'invalidation du cache de résultats entre processus via
+// LISTEN/NOTIFY sur channel (vide : DefaultCacheSyncChannel). Tous les processus
+// qui partagent la base doivent utiliser le même canal.
+func (tm *TakeoManager) EnableCacheSync(channel string) error {
+	if channel == "" {
+		channel = DefaultCacheSyncChannel
+	}
+
+	tm.cacheSyncMu.Lock()
+	defer tm.cacheSyncMu.Unlock()
+
+	if tm.cacheSync != nil {
+		return fmt.Errorf("cache sync already enabled")
+	}
+
+	listener := pq.NewListener(tm.db.config.ConnString(), cacheSyncMinReconnect, cacheSyncMaxReconnect, nil)
+	if err := listener.Listen(channel); err != nil {
+		listener.Close()
+		return err
+	}
+
+	tm.cacheSync = newCacheSync(tm, channel, listener)
+	return nil
+}
+
+// InstallCacheTrigger installe sur la table de l'entité un trigger qui envoie la
+// notification d'invalidation à chaque INSERT, UPDATE, DELETE ou TRUNCATE, y
+// compris pour les écritures faites hors de Takeo. Les écritures de ce processus
+// ne notifient alors plus elles-mêmes.
+func (tm *TakeoManager) InstallCacheTrigger(entityType string) error {
+	metadata, exists := tm.registry.GetEntity(entityType)
+	if !exists {
+		return fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	s := tm.cacheSyncer()
+	if s == nil {
+		return fmt.Errorf("cache sync not enabled")
+	}
+
+	tx, err := tm.db.conn.Begin()
+	if err != nil {
+		return err
+	}
+	defer tx.Rollback()
+
+	queries := []string{
+		cacheTriggerFunctionSQL,
+		"DROP TRIGGER IF EXISTS takeo_cache_notify ON " + metadata.TableName,
+		fmt.Sprintf("CREATE TRIGGER takeo_cache_notify AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON %s "+
+			"FOR EACH STATEMENT EXECUTE FUNCTION takeo_cache_notify(%s, %s)",
+			metadata.TableName, pq.QuoteLiteral(s.channel), pq.QuoteLiteral(entityType)),
+	}
+	for _, query := range queries {
+		if _, err := tx.Exec(query); err != nil {
+			return err
+		}
+	}
+	if err := tx.Commit(); err != nil {
+		return err
+	}
+
+	s.mu.Lock()
+	s.triggered[entityType] = true
+	s.mu.Unlock()
+	return nil
+}
+
+// cacheSyncer retourne la synchronisation active, ou nil
+func (tm *TakeoManager) cacheSyncer() *cacheSync {
+	tm.cacheSyncMu.Lock()
+	defer tm.cacheSyncMu.Unlock()
+	return tm.cacheSync
+}
+
+// invalidateLocal invalide le cache de résultats et la copie en mémoire d'une entité
+func (tm *TakeoManager) invalidateLocal(entityType string) {
+	tm.results.invalidate(entityType)
+	if replica := tm.replicaOf(entityType); replica != nil {
+		replica.markStale()
+	}
+}
+
+// invalidateAllLocal invalide tous les caches et toutes les copies en mémoire
+func (tm *TakeoManager) invalidateAllLocal() {
+	tm.results.invalidateAll()
+
+	tm.replicasMu.RLock()
+	defer tm.replicasMu.RUnlock()
+	for _, replica := range tm.replicas {
+		replica.markStale()
+	}
+}
+
+// entityWritten invalide les données locales d'une entité après une écriture
+// et, si la synchronisation est active, notifie les autres processus. Hors
+// transaction, le NOTIFY est un aller-retour de plus après chaque écriture,
+// sauf pour les entités couvertes par InstallCacheTrigger.
+func (tm *TakeoManager) entityWritten(entityType string) {
+	tm.invalidateLocal(entityType)
+
+	if s := tm.cacheSyncer(); s != nil && s.notifies(entityType) {
+		// Best effort: the write is already done, and on failure other processes
+		// still drop the entry when its TTL expires
+		tm.db.conn.Exec(notifySQL, s.channel, entityType)
+	}
+}
+
+// notifyTx envoie dans tx les notifications des entités écrites : PostgreSQL ne
+// les délivre qu'au commit, et jamais si la transaction est annulée
+func (tm *TakeoManager) notifyTx(tx *sql.Tx, written map[string]bool) error {
+	s := tm.cacheSyncer()
+	if s == nil {
+		return nil
+	}
+
+	for entityType := range written {
+		if !s.notifies(entityType) {
+			continue
+		}
+		if _, err := tx.Exec(notifySQL, s.channel, entityType); err != nil {
+			return err
+		}
+	}
+	return nil
+}
@@ -0,0 +1,64 @@
+package core
+
+import "fmt"
+
+// EntityChanges regroupe les écritures en attente d'une unité de travail pour un
+// type d'entité
+type EntityChanges struct {
+	Entity  string                   `json:"entity"`
+	Inserts []map[string]interface{} `json:"inserts"`
+	Updates []UpdateData             `json:"updates"`
+	Deletes []int64                  `json:"deletes"`
+}
+
+// ApplyChanges écrit une unité de travail dans une seule TakeoTransaction : toutes
+// les insertions (dans l'ordre de changes), puis les mises à jour, puis les
+// suppressions (dans l'ordre inverse). Chaque étape est un batch par type
+// d'entité. Retourne les IDs insérés, un tableau par élément de changes.
+func (tm *TakeoManager) ApplyChanges(changes []EntityChanges) ([][]int64, error) {
+	for _, change := range changes {
+		if _, exists := tm.registry.GetEntity(change.Entity); !exists {
+			return nil, fmt.Errorf("entity %s not registered", change.Entity)
+		}
+	}
+
+	tx, err := tm.BeginTransaction()
+	if err != nil {
+		return nil, err
+	}
+	defer func() {
+		if !tx.finished {
+			tx.Rollback()
+		}
+	}()
+
+	inserted := make([][]int64, len(changes))
+	for i, change := range changes {
+		ids, err := tx.SaveBatch(change.Entity, change.Inserts)
+		if err != nil {
+			return nil, err
+		}
+		if ids == nil {
+			ids = []int64{}
+		}
+		inserted[i] = ids
+	}
+
+	for _, change := range changes {
+		if _, err := tx.UpdateBatch(change.Entity, change.Updates); err != nil {
+			return nil, err
+		}
+	}
+
+	// Delete in reverse order so rows inserted first (e.g. parents) are deleted last
+	for i := len(changes) - 1; i >= 0; i-- {
+		if _, err := tx.DeleteBatch(changes[i].Entity, changes[i].Deletes); err != nil {
+			return nil, err
+		}
+	}
+
+	if err := tx.Commit(); err != nil {
+		return nil, err
+	}
+	return inserted, nil
+}
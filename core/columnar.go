@@ -0,0 +1,261 @@
+package core
+
+import (
+	"database/sql"
+	"encoding/binary"
+	"encoding/json"
+	"fmt"
+	"math"
+	"strings"
+)
+
+// ColumnKind est le type Go natif d'une colonne, déduit de son type SQL
+type ColumnKind string
+
+const (
+	KindInt64   ColumnKind = "int64"
+	KindFloat64 ColumnKind = "float64"
+	KindDecimal ColumnKind = "decimal"
+	KindBool    ColumnKind = "bool"
+	KindString  ColumnKind = "string"
+	KindTime    ColumnKind = "time"
+	KindBytes   ColumnKind = "bytes"
+	KindObject  ColumnKind = "object"
+)
+
+// sqlTypeKinds associe le premier mot d'un type SQL à son ColumnKind
+var sqlTypeKinds = map[string]ColumnKind{
+	"SMALLINT":    KindInt64,
+	"INTEGER":     KindInt64,
+	"INT":         KindInt64,
+	"INT2":        KindInt64,
+	"INT4":        KindInt64,
+	"INT8":        KindInt64,
+	"BIGINT":      KindInt64,
+	"SMALLSERIAL": KindInt64,
+	"SERIAL":      KindInt64,
+	"BIGSERIAL":   KindInt64,
+	"REAL":        KindFloat64,
+	"FLOAT":       KindFloat64,
+	"FLOAT4":      KindFloat64,
+	"FLOAT8":      KindFloat64,
+	"DOUBLE":      KindFloat64,
+	"NUMERIC":     KindDecimal,
+	"DECIMAL":     KindDecimal,
+	"BOOLEAN":     KindBool,
+	"BOOL":        KindBool,
+	"VARCHAR":     KindString,
+	"CHARACTER":   KindString,
+	"CHAR":        KindString,
+	"TEXT":        KindString,
+	"UUID":        KindString,
+	"TIMESTAMP":   KindTime,
+	"TIMESTAMPTZ": KindTime,
+	"DATE":        KindTime,
+	"BYTEA":       KindBytes,
+}
+
+// ColumnKindOf déduit le ColumnKind d'un type SQL tel que "VARCHAR(255) NOT NULL"
+func ColumnKindOf(sqlType string) ColumnKind {
+	word := strings.ToUpper(strings.TrimSpace(sqlType))
+	if end := strings.IndexAny(word, " ("); end >= 0 {
+		word = word[:end]
+	}
+	if kind, exists := sqlTypeKinds[word]; exists {
+		return kind
+	}
+	return KindObject
+}
+
+// columnarColumn décrit une colonne dans l'en-tête d'une trame colonnaire
+type columnarColumn struct {
+	Name   string     `json:"name"`
+	Kind   ColumnKind `json:"kind"`
+	Offset int        `json:"offset"`
+	Length int        `json:"length"`
+}
+
+// columnarHeader est l'en-tête JSON d'une trame colonnaire
+type columnarHeader struct {
+	Rows    int              `json:"rows"`
+	Columns []columnarColumn `json:"columns"`
+}
+
+// columnBuffer accumule les valeurs d'une colonne pendant rows.Scan
+type columnBuffer struct {
+	name    string
+	kind    ColumnKind
+	ints    []int64
+	floats  []float64
+	bools   []bool
+	objects []interface{}
+	valid   []bool
+	hasNull bool
+	dest    interface{}
+}
+
+func newColumnBuffer(name string, kind ColumnKind) *columnBuffer {
+	buf := &columnBuffer{name: name, kind: kind}
+	switch kind {
+	case KindInt64:
+		buf.dest = &sql.NullInt64{}
+	case KindFloat64, KindDecimal:
+		// Analytics read NUMERIC as float64 arrays; rows keep its exact text
+		buf.kind = KindFloat64
+		buf.dest = &sql.NullFloat64{}
+	case KindBool:
+		buf.dest = &sql.NullBool{}
+	default:
+		buf.kind = KindObject
+		buf.dest = new(interface{})
+	}
+	return buf
+}
+
+// collect copie la valeur scannée dans dest vers le buffer typé
+func (b *columnBuffer) collect() {
+	switch dest := b.dest.(type) {
+	case *sql.NullInt64:
+		b.ints = append(b.ints, dest.Int64)
+		b.valid = append(b.valid, dest.Valid)
+		b.hasNull = b.hasNull || !dest.Valid
+	case *sql.NullFloat64:
+		if !dest.Valid {
+			dest.Float64 = math.NaN()
+		}
+		b.floats = append(b.floats, dest.Float64)
+	case *sql.NullBool:
+		b.bools = append(b.bools, dest.Bool)
+		b.valid = append(b.valid, dest.Valid)
+		b.hasNull = b.hasNull || !dest.Valid
+	case *interface{}:
+		b.objects = append(b.objects, *dest)
+	}
+}
+
+// encode écrit la colonne à la fin de body. Les entiers avec NULL deviennent des
+// float64 avec NaN; les booléens avec NULL deviennent une colonne objet.
+func (b *columnBuffer) encode(body []byte) ([]byte, ColumnKind, error) {
+	switch {
+	case b.kind == KindInt64 && !b.hasNull:
+		for _, v := range b.ints {
+			body = binary.LittleEndian.AppendUint64(body, uint64(v))
+		}
+		return body, KindInt64, nil
+	case b.kind == KindInt64:
+		for i, v := range b.ints {
+			f := float64(v)
+			if !b.valid[i] {
+				f = math.NaN()
+			}
+			body = binary.LittleEndian.AppendUint64(body, math.Float64bits(f))
+		}
+		return body, KindFloat64, nil
+	case b.kind == KindFloat64:
+		for _, v := range b.floats {
+			body = binary.LittleEndian.AppendUint64(body, math.Float64bits(v))
+		}
+		return body, KindFloat64, nil
+	case b.kind == KindBool && !b.hasNull:
+		for _, v := range b.bools {
+			if v {
+				body = append(body, 1)
+			} else {
+				body = append(body, 0)
+			}
+		}
+		return body, KindBool, nil
+	case b.kind == KindBool:
+		b.objects = make([]interface{}, len(b.bools))
+		for i, v := range b.bools {
+			if b.valid[i] {
+				b.objects[i] = v
+			}
+		}
+	}
+
+	encoded, err := json.Marshal(b.objects)
+	if err != nil {
+		return nil, "", fmt.Errorf("failed to marshal column %s: %v", b.name, err)
+	}
+	return append(body, encoded...), KindObject, nil
+}
+
+// FindColumns lit des colonnes entières en une trame binaire colonnaire :
+//
+//	uint32 little-endian : taille H de l'en-tête
+//	H octets             : en-tête JSON (columnarHeader)
+//	corps                : une section par colonne, à l'offset indiqué dans l'en-tête
+//
+// Les colonnes int64/float64 sont des tableaux little-endian de 8 octets, les
+// colonnes bool un octet par ligne; les autres colonnes sont un tableau JSON.
+// Une liste de colonnes vide sélectionne toutes les colonnes de l'entité.
+func (tm *TakeoManager) FindColumns(entityType string, columns []string) ([]byte, error) {
+	metadata, exists := tm.registry.GetEntity(entityType)
+	if !exists {
+		return nil, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	if len(columns) == 0 {
+		columns = metadata.ColumnOrder
+	}
+
+	buffers := make([]*columnBuffer, len(columns))
+	scanDests := make([]interface{}, len(columns))
+	for i, colName := range columns {
+		col, exists := metadata.Columns[colName]
+		if !exists {
+			return nil, fmt.Errorf("column %s not found on entity %s", colName, entityType)
+		}
+		buffers[i] = newColumnBuffer(colName, ColumnKindOf(col.Type))
+		scanDests[i] = buffers[i].dest
+	}
+
+	query := fmt.Sprintf("SELECT %s FROM %s", strings.Join(columns, ", "), metadata.TableName)
+	rows, err := tm.db.conn.Query(query)
+	if err != nil {
+		return nil, err
+	}
+	defer rows.Close()
+
+	rowCount := 0
+	for rows.Next() {
+		if err := rows.Scan(scanDests...); err != nil {
+			return nil, err
+		}
+		for _, buf := range buffers {
+			buf.collect()
+		}
+		rowCount++
+	}
+	if err := rows.Err(); err != nil {
+		return nil, err
+	}
+
+	header := columnarHeader{Rows: rowCount, Columns: make([]columnarColumn, len(buffers))}
+	body := make([]byte, 0, rowCount*len(buffers)*8)
+	for i, buf := range buffers {
+		offset := len(body)
+		var kind ColumnKind
+		body, kind, err = buf.encode(body)
+		if err != nil {
+			return nil, err
+		}
+		header.Columns[i] = columnarColumn{
+			Name:   buf.name,
+			Kind:   kind,
+			Offset: offset,
+			Length: len(body) - offset,
+		}
+	}
+
+	headerJSON, err := json.Marshal(header)
+	if err != nil {
+		return nil, fmt.Errorf("failed to marshal columnar header: %v", err)
+	}
+
+	frame := make([]byte, 4, 4+len(headerJSON)+len(body))
+	binary.LittleEndian.PutUint32(frame, uint32(len(headerJSON)))
+	frame = append(frame, headerJSON...)
+	return append(frame, body...), nil
+}
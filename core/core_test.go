@@ -1,7 +1,15 @@
 package core
 
 import (
+	"database/sql"
+	"encoding/json"
+	"fmt"
+	"strings"
+	"sync"
 	"testing"
+	"time"
+
+	"github.com/lib/pq"
 )
 
 func TestDatabaseConfig(t *testing.T) {
@@ -64,4 +72,968 @@ func TestEntityRegistryBasics(t *testing.T) {
 	if retrieved.TableName != "test_table" {
 		t.Errorf("Expected table name 'test_table', got '%s'", retrieved.TableName)
 	}
-}
\ No newline at end of file
+}
+func TestNonAutoColumns(t *testing.T) {
+	metadata := &EntityMetadata{
+		TableName:  "users",
+		PrimaryKey: "id",
+		Columns: map[string]ColumnMetadata{
+			"id":    {Name: "id", IsPrimaryKey: true, IsAutoIncrement: true},
+			"name":  {Name: "name"},
+			"email": {Name: "email"},
+		},
+		ColumnOrder: []string{"id", "name", "email"},
+	}
+
+	columns := metadata.NonAutoColumns()
+	if len(columns) != 2 || columns[0] != "name" || columns[1] != "email" {
+		t.Errorf("Expected [name email], got %v", columns)
+	}
+}
+
+func TestBuildBatchInsertQuery(t *testing.T) {
+	metadata := &EntityMetadata{
+		TableName:  "users",
+		PrimaryKey: "id",
+		Columns: map[string]ColumnMetadata{
+			"id":   {Name: "id", IsPrimaryKey: true, IsAutoIncrement: true},
+			"name": {Name: "name"},
+			"age":  {Name: "age"},
+		},
+		ColumnOrder: []string{"id", "name", "age"},
+	}
+
+	expected := "INSERT INTO users (name, age) VALUES ($1, $2), ($3, $4) RETURNING id"
+	if query := metadata.BuildBatchInsertQuery(2); query != expected {
+		t.Errorf("Expected %q, got %q", expected, query)
+	}
+}
+
+func TestBuildBatchUpsertQuery(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	expected := "INSERT INTO users (name, age) VALUES ($1, $2), ($3, $4)" +
+		" ON CONFLICT (name) DO UPDATE SET age = EXCLUDED.age RETURNING id"
+	if query := metadata.BuildBatchUpsertQuery(2, []string{"name"}, []string{"age"}); query != expected {
+		t.Errorf("Expected %q, got %q", expected, query)
+	}
+
+	// Without update columns existing rows must still be returned
+	expected = "INSERT INTO users (name, age) VALUES ($1, $2)" +
+		" ON CONFLICT (name) DO UPDATE SET name = EXCLUDED.name RETURNING id"
+	if query := metadata.BuildBatchUpsertQuery(1, []string{"name"}, nil); query != expected {
+		t.Errorf("Expected %q, got %q", expected, query)
+	}
+}
+
+func TestResolveUpsertColumns(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	conflict, update, err := metadata.resolveUpsertColumns(UpsertOptions{ConflictColumns: []string{"name"}})
+	if err != nil {
+		t.Fatalf("Expected options to resolve, got %v", err)
+	}
+	if len(conflict) != 1 || len(update) != 1 || update[0] != "age" {
+		t.Errorf("Expected to update age on conflict on name, got %v / %v", conflict, update)
+	}
+
+	if _, _, err := metadata.resolveUpsertColumns(UpsertOptions{ConflictColumns: []string{"id"}}); err == nil {
+		t.Error("Expected a generated primary key to be rejected as conflict column")
+	}
+}
+
+func TestDedupeByConflictKey(t *testing.T) {
+	unique, index := dedupeByConflictKey([]map[string]interface{}{
+		{"name": "a", "age": 1.0},
+		{"name": "b", "age": 2.0},
+		{"name": "a", "age": 3.0},
+		{"name": nil, "age": 4.0},
+		{"name": nil, "age": 5.0},
+	}, []string{"name"})
+
+	if len(unique) != 4 {
+		t.Fatalf("Expected 4 unique rows, got %d", len(unique))
+	}
+	if index[2] != 0 || unique[0]["age"] != 3.0 {
+		t.Errorf("Expected the last duplicate to win, got index %v and %v", index, unique[0])
+	}
+	if index[3] == index[4] {
+		t.Error("Expected NULL conflict keys not to be merged")
+	}
+}
+
+func TestGroupInsertsByPresentColumns(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	groups := groupInserts(metadata, []map[string]interface{}{
+		{"name": "a", "age": 1.0},
+		{"name": "b"},
+		{"age": nil, "name": "c"},
+		{},
+		{"name": "d", "unknown": true},
+	})
+
+	if len(groups) != 3 {
+		t.Fatalf("Expected 3 groups, got %d", len(groups))
+	}
+	expected := []struct {
+		columns   string
+		positions string
+	}{
+		{"name,age", "[0 2]"},
+		{"name", "[1 4]"},
+		{"", "[3]"},
+	}
+	for i, group := range groups {
+		if columns := strings.Join(group.columns, ","); columns != expected[i].columns ||
+			fmt.Sprint(group.positions) != expected[i].positions {
+			t.Errorf("Group %d: unexpected columns %q at %v", i, columns, group.positions)
+		}
+	}
+
+	// Missing columns are left out of the INSERT so they take their DEFAULT
+	if query := metadata.BuildBatchInsertColumnsQuery([]string{"name"}, 2); query != "INSERT INTO users (name) VALUES ($1), ($2) RETURNING id" {
+		t.Errorf("Unexpected query %q", query)
+	}
+	if query := metadata.BuildBatchInsertColumnsQuery(nil, 2); query != "INSERT INTO users (id) VALUES (DEFAULT), (DEFAULT) RETURNING id" {
+		t.Errorf("Unexpected query %q", query)
+	}
+}
+
+func TestBatchRowsPerChunk(t *testing.T) {
+	if rows := batchRowsPerChunk(10, 100); rows != 100 {
+		t.Errorf("Expected small batch to fit in one chunk, got %d rows", rows)
+	}
+	if rows := batchRowsPerChunk(10, 100000); rows != 6553 {
+		t.Errorf("Expected 6553 rows per chunk, got %d", rows)
+	}
+}
+
+func TestCursorRegistryRemoveUnknown(t *testing.T) {
+	registry := newCursorRegistry()
+
+	if _, exists := registry.get(42); exists {
+		t.Error("Expected unknown cursor to be missing")
+	}
+	if err := registry.remove(42); err != nil {
+		t.Errorf("Expected removing an unknown cursor to be a no-op, got %v", err)
+	}
+}
+
+func TestRowSetJSON(t *testing.T) {
+	metadata := &EntityMetadata{ColumnOrder: []string{"id", "name"}}
+
+	rowSet := newRowSet(metadata, 1)
+	if err := rowSet.appendValues([]interface{}{int64(1), "Alice"}); err != nil {
+		t.Fatalf("Expected values to encode, got %v", err)
+	}
+
+	data, err := json.Marshal(rowSet)
+	if err != nil {
+		t.Fatalf("Expected RowSet to marshal, got %v", err)
+	}
+
+	expected := `{"columns":["id","name"],"rows":[[1,"Alice"]]}`
+	if string(data) != expected {
+		t.Errorf("Expected %s, got %s", expected, data)
+	}
+}
+
+func TestRowScannerEncodesByKind(t *testing.T) {
+	metadata := &EntityMetadata{
+		Columns: map[string]ColumnMetadata{
+			"id":    {Name: "id", Type: "SERIAL PRIMARY KEY"},
+			"score": {Name: "score", Type: "FLOAT8"},
+			"name":  {Name: "name", Type: "TEXT"},
+			"nick":  {Name: "nick", Type: "TEXT"},
+			"data":  {Name: "data", Type: "BYTEA"},
+			"meta":  {Name: "meta", Type: "JSONB"},
+		},
+		ColumnOrder: []string{"id", "score", "name", "nick", "data", "meta"},
+	}
+
+	scanner := getRowScanner(metadata)
+	defer putRowScanner(scanner)
+	scanner.reset()
+	scanner.raw[0] = sql.RawBytes("42")
+	scanner.raw[1] = sql.RawBytes("NaN")
+	scanner.raw[2] = sql.RawBytes("a \"b\"\n\xff")
+	scanner.raw[4] = sql.RawBytes{1, 2, 3}
+	scanner.values[5] = "x"
+
+	rowSet := newRowSet(metadata, 1)
+	if err := rowSet.appendScanned(scanner); err != nil {
+		t.Fatalf("Expected row to encode, got %v", err)
+	}
+	scanner.raw[3] = nil
+	if err := rowSet.appendScanned(scanner); err != nil {
+		t.Fatalf("Expected row to encode, got %v", err)
+	}
+
+	var decoded struct {
+		Rows [][]interface{} `json:"rows"`
+	}
+	if err := json.Unmarshal(rowSet.JSON(), &decoded); err != nil {
+		t.Fatalf("Expected valid JSON, got %v in %s", err, rowSet.JSON())
+	}
+
+	expected := []interface{}{42.0, "NaN", "a \"b\"\n\ufffd", "", "AQID", "x"}
+	for i, value := range decoded.Rows[0] {
+		if value != expected[i] {
+			t.Errorf("Column %d: expected %#v, got %#v", i, expected[i], value)
+		}
+	}
+	if decoded.Rows[1][3] != nil {
+		t.Errorf("Expected NULL to encode as null, got %#v", decoded.Rows[1][3])
+	}
+}
+
+func TestColumnKindOf(t *testing.T) {
+	cases := map[string]ColumnKind{
+		"SERIAL PRIMARY KEY":       KindInt64,
+		"INTEGER":                  KindInt64,
+		"double precision":         KindFloat64,
+		"NUMERIC(10, 2) NOT NULL":  KindDecimal,
+		"BOOLEAN DEFAULT true":     KindBool,
+		"VARCHAR(255) UNIQUE":      KindString,
+		"TIMESTAMP WITH TIME ZONE": KindTime,
+		"BYTEA":                    KindBytes,
+		"JSONB":                    KindObject,
+	}
+
+	for sqlType, expected := range cases {
+		if kind := ColumnKindOf(sqlType); kind != expected {
+			t.Errorf("Expected %s for %q, got %s", expected, sqlType, kind)
+		}
+	}
+}
+
+func TestColumnBufferEncodeNullableInt(t *testing.T) {
+	buf := newColumnBuffer("age", KindInt64)
+	buf.ints = []int64{1, 0}
+	buf.valid = []bool{true, false}
+	buf.hasNull = true
+
+	body, kind, err := buf.encode(nil)
+	if err != nil {
+		t.Fatalf("Expected encode to succeed, got %v", err)
+	}
+	if kind != KindFloat64 || len(body) != 16 {
+		t.Errorf("Expected 16 bytes of float64, got %d bytes of %s", len(body), kind)
+	}
+}
+
+func TestConfigurePool(t *testing.T) {
+	// sql.Open does not connect, so no database is needed here
+	conn, err := sql.Open("postgres", "host=invalid-host sslmode=disable")
+	if err != nil {
+		t.Fatalf("Expected sql.Open to succeed, got %v", err)
+	}
+	db := &DB{conn: conn}
+	defer conn.Close()
+
+	db.ConfigurePool(PoolConfig{MaxOpenConns: 7})
+
+	if stats := db.PoolStats(); stats.MaxOpenConnections != 7 {
+		t.Errorf("Expected MaxOpenConnections 7, got %d", stats.MaxOpenConnections)
+	}
+}
+
+func queryTestMetadata() *EntityMetadata {
+	return &EntityMetadata{
+		TableName:  "users",
+		PrimaryKey: "id",
+		Columns: map[string]ColumnMetadata{
+			"id":   {Name: "id", IsPrimaryKey: true, IsAutoIncrement: true},
+			"name": {Name: "name"},
+			"age":  {Name: "age"},
+		},
+		ColumnOrder: []string{"id", "name", "age"},
+	}
+}
+
+func TestBuildSelectByIDsQuery(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	expected := "SELECT id, name, age FROM users WHERE id = ANY($1)"
+	if query := metadata.BuildSelectByIDsQuery(); query != expected {
+		t.Errorf("Expected %q, got %q", expected, query)
+	}
+}
+
+func TestColumnCastType(t *testing.T) {
+	cases := map[string]string{
+		"SERIAL PRIMARY KEY":         "INTEGER",
+		"VARCHAR(255) NOT NULL":      "VARCHAR(255)",
+		"integer default 0":          "INTEGER",
+		"TIMESTAMP WITH TIME ZONE":   "TIMESTAMP WITH TIME ZONE",
+		"DOUBLE PRECISION UNIQUE":    "DOUBLE PRECISION",
+		"TEXT REFERENCES users (id)": "TEXT",
+	}
+
+	for def, expected := range cases {
+		if cast := (ColumnMetadata{Type: def}).CastType(); cast != expected {
+			t.Errorf("Expected %q for %q, got %q", expected, def, cast)
+		}
+	}
+}
+
+func TestBuildBatchUpdateQuery(t *testing.T) {
+	metadata := queryTestMetadata()
+	metadata.Columns["id"] = ColumnMetadata{Name: "id", Type: "SERIAL PRIMARY KEY", IsPrimaryKey: true, IsAutoIncrement: true}
+	metadata.Columns["age"] = ColumnMetadata{Name: "age", Type: "INTEGER"}
+	metadata.Columns["name"] = ColumnMetadata{Name: "name", Type: "VARCHAR(100) NOT NULL"}
+
+	expected := "UPDATE users AS t SET age = v.age, name = v.name FROM (VALUES " +
+		"($1::INTEGER, $2::INTEGER, $3::VARCHAR(100)), ($4, $5, $6)) AS v (id, age, name) WHERE t.id = v.id"
+	if query := metadata.BuildBatchUpdateQuery([]string{"age", "name"}, 2); query != expected {
+		t.Errorf("Expected %q, got %q", expected, query)
+	}
+}
+
+func TestGroupUpdates(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	groups := groupUpdates(metadata, []UpdateData{
+		{ID: 1, Updates: map[string]interface{}{"name": "a"}},
+		{ID: 2, Updates: map[string]interface{}{"name": "b", "age": 3.0}},
+		{ID: 1, Updates: map[string]interface{}{"age": 4.0, "id": 9.0, "unknown": true}},
+		{ID: 3, Updates: map[string]interface{}{"id": 9.0}},
+	})
+
+	// ID 1 is merged into the same column set as ID 2; ID 3 has nothing to update
+	if len(groups) != 1 || len(groups[0].rows) != 2 {
+		t.Fatalf("Expected one group of 2 rows, got %d groups", len(groups))
+	}
+	if cols := strings.Join(groups[0].columns, ","); cols != "age,name" {
+		t.Errorf("Expected columns age,name, got %s", cols)
+	}
+}
+
+func TestBuildFindQueryCanonical(t *testing.T) {
+	metadata := queryTestMetadata()
+	limit := int64(10)
+
+	query, args, err := metadata.BuildFindQuery(&Query{
+		Where: []Condition{
+			{Column: "name", Op: "like", Value: "A%"},
+			{Column: "age", Op: "<", Value: 30.0},
+			{Column: "id", Op: "IN", Value: []interface{}{1.0, 2.0}},
+		},
+		OrderBy: []OrderBy{{Column: "age", Desc: true}},
+		Limit:   &limit,
+	})
+	if err != nil {
+		t.Fatalf("Expected query to compile, got %v", err)
+	}
+
+	expected := "SELECT id, name, age FROM users WHERE age < $1 AND id = ANY($2) AND name LIKE $3 ORDER BY age DESC LIMIT $4"
+	if query != expected {
+		t.Errorf("Expected %q, got %q", expected, query)
+	}
+	if len(args) != 4 {
+		t.Errorf("Expected 4 args, got %d", len(args))
+	}
+}
+
+func TestBuildFindQueryIsNull(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	query, args, err := metadata.BuildFindQuery(&Query{
+		Where: []Condition{{Column: "name", Op: "IS NULL"}},
+	})
+	if err != nil {
+		t.Fatalf("Expected query to compile, got %v", err)
+	}
+	if query != "SELECT id, name, age FROM users WHERE name IS NULL" || len(args) != 0 {
+		t.Errorf("Unexpected query %q with %d args", query, len(args))
+	}
+}
+
+func TestBuildFindQueryRejectsUnknownColumns(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	if _, _, err := metadata.BuildFindQuery(&Query{
+		Where: []Condition{{Column: "1=1; DROP TABLE users", Op: "="}},
+	}); err == nil {
+		t.Error("Expected unknown column to be rejected")
+	}
+	if _, _, err := metadata.BuildFindQuery(&Query{
+		Where: []Condition{{Column: "age", Op: "~"}},
+	}); err == nil {
+		t.Error("Expected unknown operator to be rejected")
+	}
+}
+
+func TestBuildDeleteWhereQuery(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	query, args, err := metadata.BuildDeleteWhereQuery([]Condition{
+		{Column: "name", Op: "=", Value: "a"},
+		{Column: "age", Op: ">", Value: 30.0},
+	})
+	if err != nil {
+		t.Fatalf("Expected query to compile, got %v", err)
+	}
+	if query != "DELETE FROM users WHERE age > $1 AND name = $2" || len(args) != 2 {
+		t.Errorf("Unexpected query %q with %d args", query, len(args))
+	}
+
+	if _, _, err := metadata.BuildDeleteWhereQuery(nil); err == nil {
+		t.Error("Expected a delete without conditions to be rejected")
+	}
+}
+
+func TestApplyChangesRejectsUnknownEntity(t *testing.T) {
+	// Validation happens before a transaction is opened, so no database is needed
+	tm := &TakeoManager{registry: NewEntityRegistry()}
+
+	if _, err := tm.ApplyChanges([]EntityChanges{{Entity: "Missing"}}); err == nil {
+		t.Error("Expected unknown entity to be rejected")
+	}
+}
+
+func TestBuildPartialUpdateQuery(t *testing.T) {
+	metadata := queryTestMetadata()
+
+	query, args, err := metadata.BuildPartialUpdateQuery(7, map[string]interface{}{
+		"name": "a", "age": 3.0, "id": 9.0, "unknown": true,
+	})
+	if err != nil {
+		t.Fatalf("Expected query to compile, got %v", err)
+	}
+	if query != "UPDATE users SET age = $1, name = $2 WHERE id = $3" || len(args) != 3 || args[2] != int64(7) {
+		t.Errorf("Unexpected query %q with args %v", query, args)
+	}
+
+	if _, _, err := metadata.BuildPartialUpdateQuery(7, map[string]interface{}{"id": 1.0}); err == nil {
+		t.Error("Expected an update without valid fields to be rejected")
+	}
+}
+
+func TestPlanCachesPartialUpdates(t *testing.T) {
+	metadata := queryTestMetadata()
+	metadata.Name = "User"
+	plan := metadata.plan()
+
+	shape, args, err := plan.partialUpdate(metadata, 7, map[string]interface{}{
+		"age": 3.0, "name": nil, "id": 9.0, "unknown": true,
+	})
+	if err != nil {
+		t.Fatalf("Expected update to compile, got %v", err)
+	}
+	if shape.sql != "UPDATE users SET name = $1, age = $2 WHERE id = $3" || shape.key != "update_User_name,age" {
+		t.Errorf("Unexpected shape %q (key %q)", shape.sql, shape.key)
+	}
+	if len(args) != 3 || args[0] != nil || args[1] != 3.0 || args[2] != int64(7) {
+		t.Errorf("Unexpected args %v", args)
+	}
+
+	// The same set of columns reuses the compiled shape
+	again, _, _ := plan.partialUpdate(metadata, 8, map[string]interface{}{"name": "a", "age": 1.0})
+	if again != shape {
+		t.Error("Expected the shape to be cached by column set")
+	}
+	if other, _, _ := plan.partialUpdate(metadata, 8, map[string]interface{}{"age": 1.0}); other == shape {
+		t.Error("Expected another column set to get its own shape")
+	}
+
+	if _, _, err := plan.partialUpdate(metadata, 7, map[string]interface{}{"id": 1.0}); err == nil {
+		t.Error("Expected an update without valid fields to be rejected")
+	}
+}
+
+func TestTxRegistryUnknownTransaction(t *testing.T) {
+	tm := &TakeoManager{transactions: newTxRegistry()}
+
+	if err := tm.CommitTransaction(42); err == nil {
+		t.Error("Expected commit of an unknown transaction to fail")
+	}
+	if _, err := tm.Transaction(42); err == nil {
+		t.Error("Expected lookup of an unknown transaction to fail")
+	}
+}
+
+func TestRegisterEntityCompilesPlan(t *testing.T) {
+	tm := &TakeoManager{registry: NewEntityRegistry()}
+	columns := map[string]string{"name": "TEXT", "id": "SERIAL PRIMARY KEY", "age": "INTEGER"}
+	if err := tm.RegisterEntity("User", "users", columns, "id"); err != nil {
+		t.Fatalf("Expected registration to succeed, got %v", err)
+	}
+
+	metadata, _ := tm.registry.GetEntity("User")
+	if strings.Join(metadata.ColumnOrder, ",") != "id,age,name" {
+		t.Errorf("Expected primary key first then sorted columns, got %v", metadata.ColumnOrder)
+	}
+
+	plan := metadata.plan()
+	if plan.insertSQL != "INSERT INTO users (age, name) VALUES ($1, $2) RETURNING id" || plan.insertKey != "insert_User" {
+		t.Errorf("Unexpected insert plan %q / %q", plan.insertSQL, plan.insertKey)
+	}
+
+	if shape, args := plan.insert(metadata, map[string]interface{}{"age": nil, "name": "a"}); shape != plan.fullInsert || len(args) != 2 || args[0] != nil || args[1] != "a" {
+		t.Errorf("Unexpected full insert %q with args %v", shape.sql, args)
+	}
+
+	// Missing keys are left out of the INSERT so they take their DEFAULT
+	shape, args := plan.insert(metadata, map[string]interface{}{"name": "a"})
+	if shape.sql != "INSERT INTO users (name) VALUES ($1) RETURNING id" || shape.key != "insert_User_name" || len(args) != 1 || args[0] != "a" {
+		t.Errorf("Unexpected partial insert %q (key %q) with args %v", shape.sql, shape.key, args)
+	}
+	if again, _ := plan.insert(metadata, map[string]interface{}{"name": "b"}); again != shape {
+		t.Error("Expected the partial insert to be cached by column set")
+	}
+}
+
+func TestJSONObjectKeysKeepDeclarationOrder(t *testing.T) {
+	keys, err := jsonObjectKeys([]byte(`{"id": "SERIAL", "name": {"x": 1}, "age": "INTEGER"}`))
+	if err != nil || strings.Join(keys, ",") != "id,name,age" {
+		t.Errorf("Expected [id name age], got %v (%v)", keys, err)
+	}
+}
+
+func TestWriteBehindFlushes(t *testing.T) {
+	// The entity is not registered, so every flush fails before touching the database
+	tm := &TakeoManager{registry: NewEntityRegistry()}
+	if _, err := tm.EnqueueSave("User", map[string]interface{}{}); err == nil {
+		t.Error("Expected enqueue of an unregistered entity to fail")
+	}
+
+	wb := newWriteBehind(tm, 2, time.Hour)
+	first, _ := wb.enqueue("User", map[string]interface{}{"name": "a"})
+	if wb.done(first) {
+		t.Error("Expected a partial batch to stay queued")
+	}
+	second, _ := wb.enqueue("User", map[string]interface{}{"name": "b"})
+	if !wb.done(first) || !wb.done(second) {
+		t.Error("Expected a full batch to be written")
+	}
+	if _, err := wb.await(first, 0); err == nil {
+		t.Error("Expected the flush error to reach the ticket")
+	}
+
+	third, _ := wb.enqueue("User", map[string]interface{}{"name": "c"})
+	if _, err := wb.await(third, time.Millisecond); err == nil || !strings.Contains(err.Error(), "timed out") {
+		t.Errorf("Expected a timeout, got %v", err)
+	}
+	if err := wb.close(); err == nil || !wb.done(third) {
+		t.Error("Expected close to drain the queue")
+	}
+	if _, err := wb.enqueue("User", map[string]interface{}{}); err == nil {
+		t.Error("Expected enqueue after close to fail")
+	}
+}
+
+func TestResultCacheReadThrough(t *testing.T) {
+	tm := &TakeoManager{registry: NewEntityRegistry(), results: newResultCache(1 << 10)}
+	tm.RegisterEntity("User", "users", map[string]string{"id": "SERIAL PRIMARY KEY", "name": "VARCHAR(100)"}, "id")
+	metadata, _ := tm.registry.GetEntity("User")
+	if err := tm.CacheEntity("User", time.Hour); err != nil {
+		t.Fatalf("CacheEntity failed: %v", err)
+	}
+
+	reads := 0
+	read := func() (*RowSet, error) {
+		reads++
+		rs := newRowSet(metadata, 1)
+		rs.appendValues([]interface{}{1, "Alice"})
+		return rs, nil
+	}
+	key := func() string { return "id:1" }
+
+	first, _ := tm.cachedRead(metadata, key, read)
+	second, _ := tm.cachedRead(metadata, key, read)
+	if reads != 1 || string(first.JSON()) != string(second.JSON()) || second.Len() != 1 {
+		t.Errorf("Expected the second read to be served from the cache, got %d reads", reads)
+	}
+
+	// A write invalidates the entity, and a read that missed before it is not stored
+	_, _, generation, _ := tm.results.get("User", "stale")
+	tm.InvalidateResults("User")
+	tm.results.put("User", "stale", generation, []byte("[]"), 0)
+	tm.cachedRead(metadata, key, read)
+	if reads != 2 || tm.results.stats().Entries != 1 {
+		t.Errorf("Expected invalidation to force a new read, got %d reads, %+v", reads, tm.results.stats())
+	}
+
+	// Entries are evicted by total size, least recently used first
+	tm.results.put("User", "big", tm.results.entities["User"].generation, make([]byte, 1000), 0)
+	if _, _, _, hit := tm.results.get("User", "id:1"); hit {
+		t.Error("Expected the oldest entry to be evicted")
+	}
+
+	stats := tm.ResultCacheStats()
+	if stats.Hits != 1 || stats.Evictions != 1 || stats.Invalidations != 1 || stats.Bytes > stats.Capacity {
+		t.Errorf("Unexpected stats %+v", stats)
+	}
+}
+
+func TestResultCacheTTL(t *testing.T) {
+	cache := newResultCache(0)
+	cache.configure("User", time.Millisecond)
+	cache.put("User", "all", 0, []byte("{}"), 0)
+	time.Sleep(2 * time.Millisecond)
+
+	if _, _, _, hit := cache.get("User", "all"); hit || cache.stats().Expirations != 1 {
+		t.Error("Expected the entry to expire")
+	}
+	if cache.enabled("Post") {
+		t.Error("Expected entities to be uncached by default")
+	}
+}
+
+func TestCacheSyncAppliesNotifications(t *testing.T) {
+	tm := &TakeoManager{registry: NewEntityRegistry(), results: newResultCache(0)}
+	tm.results.configure("User", time.Hour)
+	tm.results.configure("Post", time.Hour)
+	tm.results.put("User", "all", 0, []byte("{}"), 0)
+	tm.results.put("Post", "all", 0, []byte("{}"), 0)
+
+	s := newCacheSync(tm, DefaultCacheSyncChannel, &pq.Listener{Notify: make(chan *pq.Notification)})
+	s.listener.Notify <- &pq.Notification{Channel: DefaultCacheSyncChannel, Extra: "User"}
+	close(s.stop)
+	<-s.stopped
+
+	if _, _, _, hit := tm.results.get("User", "all"); hit {
+		t.Error("Expected the notified entity to be invalidated")
+	}
+	if _, _, _, hit := tm.results.get("Post", "all"); !hit {
+		t.Error("Expected other entities to stay cached")
+	}
+
+	// Entities this process does not cache may be cached by another one
+	if !s.notifies("User") || !s.notifies("Comment") {
+		t.Error("Expected writes to every entity to be notified")
+	}
+	s.triggered["User"] = true
+	if s.notifies("User") {
+		t.Error("Expected entities with a trigger not to be notified by the ORM")
+	}
+}
+
+func TestReplicaServesEqualityQueries(t *testing.T) {
+	tm := &TakeoManager{registry: NewEntityRegistry()}
+	tm.RegisterEntity("Country", "countries", map[string]string{
+		"id": "SERIAL PRIMARY KEY", "code": "VARCHAR(2)", "region": "TEXT", "data": "JSONB",
+	}, "id")
+	metadata, _ := tm.registry.GetEntity("Country")
+
+	if _, err := newReplica(tm, metadata, []string{"data"}, ""); err == nil {
+		t.Error("Expected a JSONB column to be rejected as an index")
+	}
+	r, err := newReplica(tm, metadata, []string{"code", "region"}, "")
+	if err != nil {
+		t.Fatalf("newReplica failed: %v", err)
+	}
+
+	row := func(id int64, code, region string) replicaRow {
+		return replicaRow{id: id, encoded: []byte(fmt.Sprintf(`[%d,"%s"]`, id, code)), keys: []string{code, region}}
+	}
+	base := r.build(nil, []replicaRow{row(1, "FR", "eu"), row(2, "DE", "eu"), row(3, "US", "na")}, "")
+	r.snapshot = r.build(base, []replicaRow{row(2, "DE", "eu"), row(4, "CA", "na")}, "")
+	r.loadedGen = r.staleGen
+
+	query := func(q *Query) string {
+		result, ok := r.findQuery(q)
+		if !ok {
+			return "fallback"
+		}
+		return string(result.JSON())
+	}
+	limit := int64(1)
+	cases := []struct {
+		query *Query
+		rows  string
+	}{
+		{&Query{Where: ConditionsFromMap(map[string]interface{}{"code": "FR"})}, `[[1,"FR"]]`},
+		{&Query{Where: []Condition{{Column: "region", Op: "=", Value: "na"}}}, `[[3,"US"],[4,"CA"]]`},
+		{&Query{Where: []Condition{{Column: "region", Value: "eu"}, {Column: "id", Op: "IN", Value: []interface{}{2.0, 3.0}}}}, `[[2,"DE"]]`},
+		{&Query{Where: []Condition{{Column: "code", Op: "IN", Value: []interface{}{"CA", "FR"}}}, Limit: &limit}, `[[1,"FR"]]`},
+		{&Query{Where: []Condition{{Column: "code", Op: "!=", Value: "FR"}}}, "fallback"},
+		{&Query{Where: []Condition{{Column: "data", Value: "x"}}}, "fallback"},
+		{&Query{OrderBy: []OrderBy{{Column: "code"}}}, "fallback"},
+	}
+	for _, c := range cases {
+		want := c.rows
+		if want != "fallback" {
+			want = `{"columns":["id","code","data","region"],"rows":` + want + `}`
+		}
+		if got := query(c.query); got != want {
+			t.Errorf("Query %+v: expected %s, got %s", c.query, want, got)
+		}
+	}
+
+	if result, _ := r.findByIDs([]int64{4, 9, 1}); result.Len() != 2 || !strings.Contains(string(result.JSON()), `[[4,"CA"],[1,"FR"]]`) {
+		t.Errorf("Unexpected FindByIDs result %s", result.JSON())
+	}
+}
+
+func TestReplicaRefreshesOnlyWhenStale(t *testing.T) {
+	tm := &TakeoManager{registry: NewEntityRegistry()}
+	tm.RegisterEntity("Plan", "plans", map[string]string{
+		"id": "SERIAL PRIMARY KEY", "slug": "TEXT", "updated_at": "TIMESTAMP",
+	}, "id")
+	metadata, _ := tm.registry.GetEntity("Plan")
+	r, err := newReplica(tm, metadata, []string{"slug"}, "updated_at")
+	if err != nil {
+		t.Fatalf("newReplica failed: %v", err)
+	}
+	r.snapshot = r.build(nil, nil, "2024-01-01")
+	r.loadedGen = r.staleGen
+
+	// Up to date: neither refresh path touches the database (tm.db is nil)
+	if err := r.refresh(false); err != nil {
+		t.Fatalf("refresh failed: %v", err)
+	}
+	if snapshot, err := r.current(); err != nil || snapshot != r.snapshot {
+		t.Fatalf("Expected the current snapshot, got %v", err)
+	}
+
+	r.markStale()
+	if _, _, stale := r.state(); !stale {
+		t.Error("Expected a write to mark the replica stale")
+	}
+}
+
+func TestSplitPKRange(t *testing.T) {
+	q := &Query{Where: []Condition{{Column: "age", Op: ">", Value: 18}}}
+	parts := splitPKRange("id", q, 1, 10, 3, false)
+	if len(parts) != 3 || len(q.Where) != 1 {
+		t.Fatalf("Expected 3 slices and an untouched query, got %d", len(parts))
+	}
+
+	var bounds [][2]interface{}
+	for _, part := range parts {
+		bounds = append(bounds, [2]interface{}{part.Where[1].Value, part.Where[2].Value})
+	}
+	expected := [][2]interface{}{{int64(1), int64(4)}, {int64(5), int64(7)}, {int64(8), int64(10)}}
+	for i := range expected {
+		if bounds[i] != expected[i] {
+			t.Errorf("Slice %d: expected %v, got %v", i, expected[i], bounds[i])
+		}
+	}
+
+	if parts := splitPKRange("id", q, 5, 6, 8, true); len(parts) != 2 || parts[0].Where[1].Value != int64(6) {
+		t.Error("Expected at most one slice per key, in descending order")
+	}
+
+	// Every slice has the same SQL shape
+	first, _, _ := (&EntityMetadata{Name: "User", TableName: "users", PrimaryKey: "id", ColumnOrder: []string{"id", "age"},
+		Columns: map[string]ColumnMetadata{"id": {Name: "id"}, "age": {Name: "age"}}}).BuildFindQuery(parts[0])
+	if !strings.Contains(first, "WHERE age > $1 AND id <= $2 AND id >= $3") {
+		t.Errorf("Unexpected slice query %s", first)
+	}
+}
+
+func TestRowSetAppendRowSet(t *testing.T) {
+	metadata := &EntityMetadata{Name: "User", TableName: "users", PrimaryKey: "id", ColumnOrder: []string{"id"},
+		Columns: map[string]ColumnMetadata{"id": {Name: "id", Type: "SERIAL"}}}
+
+	merged := newRowSet(metadata, 0)
+	for _, ids := range [][]interface{}{{1}, {}, {2, 3}} {
+		part := newRowSet(metadata, 0)
+		for _, id := range ids {
+			part.appendValues([]interface{}{id})
+		}
+		merged.appendRowSet(part)
+	}
+
+	if merged.Len() != 3 || string(merged.JSON()) != `{"columns":["id"],"rows":[[1],[2],[3]]}` {
+		t.Errorf("Unexpected merged RowSet %s", merged.JSON())
+	}
+}
+
+func TestStmtCacheEvictsLeastRecentlyUsed(t *testing.T) {
+	cache := newStmtCache(2)
+
+	cache.add("users", "a", nil)
+	cache.add("users", "b", nil)
+	cache.get("a") // "b" becomes least recently used
+	cache.add("posts", "c", nil)
+
+	if _, exists := cache.get("b"); exists {
+		t.Error("Expected b to be evicted")
+	}
+	if _, exists := cache.get("a"); !exists {
+		t.Error("Expected a to stay cached")
+	}
+
+	stats := cache.stats()
+	if stats.Size != 2 || stats.Evictions != 1 || stats.Hits != 2 || stats.Misses != 1 {
+		t.Errorf("Unexpected stats %+v", stats)
+	}
+}
+
+func TestStmtCacheInvalidateTable(t *testing.T) {
+	cache := newStmtCache(10)
+
+	cache.add("users", "a", nil)
+	cache.add("posts", "b", nil)
+	cache.invalidateTable("users")
+
+	if _, exists := cache.get("a"); exists {
+		t.Error("Expected users statement to be invalidated")
+	}
+	if _, exists := cache.get("b"); !exists {
+		t.Error("Expected posts statement to stay cached")
+	}
+}
+
+func TestStmtCacheDefersCloseWhilePinned(t *testing.T) {
+	cache := newStmtCache(2)
+
+	// Every goroutine pins statements while the others churn the LRU and
+	// invalidate the table: a pinned statement must never be closed
+	var wg sync.WaitGroup
+	for g := 0; g < 8; g++ {
+		wg.Add(1)
+		go func(g int) {
+			defer wg.Done()
+			for i := 0; i < 500; i++ {
+				key := fmt.Sprintf("q%d", (g+i)%5)
+				entry, exists := cache.get(key)
+				if !exists {
+					entry = cache.add("users", key, nil)
+				}
+
+				cache.mu.Lock()
+				closed := entry.closed
+				cache.mu.Unlock()
+				if closed {
+					t.Errorf("Statement %s closed while pinned", key)
+				}
+
+				if i%50 == 0 {
+					cache.invalidateTable("users")
+				}
+				cache.release(entry)
+			}
+		}(g)
+	}
+	wg.Wait()
+
+	cache.closeAll()
+	pinned := cache.add("users", "a", nil)
+	cache.closeAll()
+	if pinned.closed {
+		t.Error("Expected a pinned statement to stay open until released")
+	}
+	cache.release(pinned)
+	if !pinned.closed {
+		t.Error("Expected the last release to close a dropped statement")
+	}
+}
+
+func TestWriteBehindIsolatesFailingRows(t *testing.T) {
+	tm := &TakeoManager{registry: NewEntityRegistry()}
+	wb := newWriteBehind(tm, 100, time.Hour)
+
+	// Rows named "dup" violate a unique constraint and fail the whole batch
+	var calls int
+	wb.saveBatch = func(entityType string, entitiesData []map[string]interface{}) ([]int64, error) {
+		calls++
+		ids := make([]int64, len(entitiesData))
+		for i, data := range entitiesData {
+			if data["name"] == "dup" {
+				return nil, &pq.Error{Code: "23505", Message: "duplicate key value"}
+			}
+			ids[i] = int64(data["n"].(int))
+		}
+		return ids, nil
+	}
+
+	tickets := make([]int64, 8)
+	for i := range tickets {
+		name := "ok"
+		if i == 5 {
+			name = "dup"
+		}
+		tickets[i], _ = wb.enqueue("User", map[string]interface{}{"name": name, "n": i + 1})
+	}
+	if err := wb.flush(); err == nil {
+		t.Error("Expected flush to report the failing row")
+	}
+
+	for i, ticket := range tickets {
+		id, err := wb.await(ticket, 0)
+		if i == 5 {
+			if err == nil {
+				t.Error("Expected the duplicate row to fail")
+			}
+		} else if err != nil || id != int64(i+1) {
+			t.Errorf("Row %d: expected id %d, got %d (%v)", i, i+1, id, err)
+		}
+	}
+	// 8 -> 4+4 -> 2+2 -> 1+1: one batch per level on the failing side
+	if calls != 7 {
+		t.Errorf("Expected 7 SaveBatch calls, got %d", calls)
+	}
+
+	// Errors that are not about the rows' values fail every ticket at once
+	calls = 0
+	wb.saveBatch = func(string, []map[string]interface{}) ([]int64, error) {
+		calls++
+		return nil, fmt.Errorf("connection refused")
+	}
+	first, _ := wb.enqueue("User", map[string]interface{}{})
+	second, _ := wb.enqueue("User", map[string]interface{}{})
+	wb.flush()
+	if _, err := wb.await(first, 0); err == nil || calls != 1 {
+		t.Errorf("Expected one failing batch, got %d calls (%v)", calls, err)
+	}
+	if _, err := wb.await(second, 0); err == nil {
+		t.Error("Expected the batch error to reach every ticket")
+	}
+}
+
+func TestEnableWriteBehindKeepsPendingTickets(t *testing.T) {
+	tm := &TakeoManager{registry: NewEntityRegistry()}
+	tm.writeBehind = newWriteBehind(tm, 100, time.Hour)
+	tm.writeBehind.saveBatch = func(_ string, entitiesData []map[string]interface{}) ([]int64, error) {
+		return []int64{42}, nil
+	}
+
+	ticket, _ := tm.writeBehind.enqueue("User", map[string]interface{}{})
+	if err := tm.EnableWriteBehind(10, time.Hour); err != nil {
+		t.Fatal(err)
+	}
+
+	if id, err := tm.AwaitSave(ticket, time.Second); err != nil || id != 42 {
+		t.Errorf("Expected the pending save to resolve to 42, got %d (%v)", id, err)
+	}
+	next, _ := tm.writeBehind.enqueue("User", map[string]interface{}{})
+	if next == ticket {
+		t.Error("Expected ticket numbers to continue after re-enabling")
+	}
+}
+
+func TestRowScannerEncodesNumericAsString(t *testing.T) {
+	metadata := &EntityMetadata{
+		Columns: map[string]ColumnMetadata{
+			"price": {Name: "price", Type: "NUMERIC(30, 20)"},
+			"total": {Name: "total", Type: "DECIMAL"},
+		},
+		ColumnOrder: []string{"price", "total"},
+	}
+
+	scanner := getRowScanner(metadata)
+	defer putRowScanner(scanner)
+	scanner.reset()
+	scanner.raw[0] = sql.RawBytes("1234567890.12345678901234567890")
+	scanner.raw[1] = nil
+
+	rowSet := newRowSet(metadata, 1)
+	if err := rowSet.appendScanned(scanner); err != nil {
+		t.Fatalf("Expected row to encode, got %v", err)
+	}
+
+	// A JSON number would lose digits once parsed as a double
+	expected := `{"columns":["price","total"],"rows":[["1234567890.12345678901234567890",null]]}`
+	if string(rowSet.JSON()) != expected {
+		t.Errorf("Expected %s, got %s", expected, rowSet.JSON())
+	}
+
+	if buf := newColumnBuffer("price", KindDecimal); buf.kind != KindFloat64 {
+		t.Errorf("Expected NUMERIC columnar reads to stay float64, got %s", buf.kind)
+	}
+}
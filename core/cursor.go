@@ -0,0 +1,150 @@
+package core
+
+import (
+	"database/sql"
+	"fmt"
+	"sync"
+)
+
+// DefaultCursorBatchSize est le nombre de lignes retournées par FetchCursor par défaut
+const DefaultCursorBatchSize = 1000
+
+// rowCursor garde un handle *sql.Rows ouvert entre deux appels gopy.
+// lib/pq lit les lignes au fil de rows.Next(), donc seule la page courante
+// est matérialisée côté Go.
+type rowCursor struct {
+	mu        sync.Mutex
+	rows      *sql.Rows
+	metadata  *EntityMetadata
+	batchSize int
+	scan      *parallelScan // curseur parallèle (OpenParallelCursor) : rows est nil
+}
+
+// close ferme les lignes du curseur, ou arrête son scan parallèle
+func (cursor *rowCursor) close() error {
+	cursor.mu.Lock()
+	defer cursor.mu.Unlock()
+
+	if cursor.scan != nil {
+		cursor.scan.close()
+		return nil
+	}
+	return cursor.rows.Close()
+}
+
+// cursorRegistry associe des identifiants numériques (passables via gopy) aux curseurs ouverts
+type cursorRegistry struct {
+	mu      sync.Mutex
+	nextID  int64
+	cursors map[int64]*rowCursor
+}
+
+func newCursorRegistry() *cursorRegistry {
+	return &cursorRegistry{cursors: make(map[int64]*rowCursor)}
+}
+
+func (r *cursorRegistry) add(cursor *rowCursor) int64 {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+
+	r.nextID++
+	r.cursors[r.nextID] = cursor
+	return r.nextID
+}
+
+func (r *cursorRegistry) get(id int64) (*rowCursor, bool) {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+
+	cursor, exists := r.cursors[id]
+	return cursor, exists
+}
+
+// remove retire le curseur du registre et ferme ses lignes; sans effet si déjà retiré
+func (r *cursorRegistry) remove(id int64) error {
+	r.mu.Lock()
+	cursor, exists := r.cursors[id]
+	delete(r.cursors, id)
+	r.mu.Unlock()
+
+	if !exists {
+		return nil
+	}
+	return cursor.close()
+}
+
+// closeAll ferme tous les curseurs encore ouverts
+func (r *cursorRegistry) closeAll() {
+	r.mu.Lock()
+	cursors := r.cursors
+	r.cursors = make(map[int64]*rowCursor)
+	r.mu.Unlock()
+
+	for _, cursor := range cursors {
+		cursor.close()
+	}
+}
+
+// OpenCursor ouvre un curseur sur toutes les entités d'un type et retourne son identifiant
+func (tm *TakeoManager) OpenCursor(entityType string, batchSize int) (int64, error) {
+	metadata, exists := tm.registry.GetEntity(entityType)
+	if !exists {
+		return 0, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	if batchSize <= 0 {
+		batchSize = DefaultCursorBatchSize
+	}
+
+	plan := metadata.plan()
+	stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, plan.findAllKey, plan.selectSQL)
+	if err != nil {
+		return 0, err
+	}
+	defer release()
+
+	rows, err := stmt.Query()
+	if err != nil {
+		return 0, err
+	}
+
+	return tm.cursors.add(&rowCursor{
+		rows:      rows,
+		metadata:  metadata,
+		batchSize: batchSize,
+	}), nil
+}
+
+// FetchCursor retourne la page suivante d'un curseur (au plus batchSize lignes).
+// Une page vide signifie que le curseur est épuisé; il est alors fermé automatiquement.
+func (tm *TakeoManager) FetchCursor(cursorID int64) (*RowSet, error) {
+	cursor, exists := tm.cursors.get(cursorID)
+	if !exists {
+		return nil, fmt.Errorf("cursor %d not found", cursorID)
+	}
+
+	cursor.mu.Lock()
+	var results *RowSet
+	var err error
+	if cursor.scan != nil {
+		results, err = cursor.scan.next(cursor.metadata)
+	} else {
+		results = newRowSet(cursor.metadata, cursor.batchSize)
+		err = results.scan(cursor.rows, cursor.metadata, cursor.batchSize)
+	}
+	cursor.mu.Unlock()
+
+	if err != nil || results.Len() == 0 {
+		tm.cursors.remove(cursorID)
+	}
+	if err != nil {
+		return nil, err
+	}
+
+	return results, nil
+}
+
+// CloseCursor ferme un curseur et libère sa connexion (idempotent)
+func (tm *TakeoManager) CloseCursor(cursorID int64) error {
+	return tm.cursors.remove(cursorID)
+}
@@ -3,7 +3,7 @@ package core
 import (
 	"database/sql"
 	"fmt"
-	"sync"
+	"time"
 
 	_ "github.com/lib/pq"
 )
@@ -16,22 +16,34 @@ type DatabaseConfig struct {
 	Password string
 	Database string
 	SSLMode  string
+	Pool     PoolConfig
+}
+
+// PoolConfig holds connection pool settings. Zero values keep the database/sql
+// defaults; negative values follow database/sql semantics (no limit / no idle).
+type PoolConfig struct {
+	MaxOpenConns    int
+	MaxIdleConns    int
+	ConnMaxLifetime time.Duration
+	ConnMaxIdleTime time.Duration
 }
 
 // DB represents the database connection and operations
 type DB struct {
-	conn            *sql.DB
-	config          *DatabaseConfig
-	preparedStmts   map[string]*sql.Stmt
-	stmtMutex      sync.RWMutex
+	conn   *sql.DB
+	config *DatabaseConfig
+	stmts  *stmtCache
 }
 
-// NewDB creates a new database connection
-func NewDB(config *DatabaseConfig) (*DB, error) {
-	connStr := fmt.Sprintf("host=%s port=%d user=%s password=%s dbname=%s sslmode=%s",
+// ConnString returns the lib/pq connection string for the configuration
+func (config *DatabaseConfig) ConnString() string {
+	return fmt.Sprintf("host=%s port=%d user=%s password=%s dbname=%s sslmode=%s",
 		config.Host, config.Port, config.User, config.Password, config.Database, config.SSLMode)
+}
 
-	conn, err := sql.Open("postgres", connStr)
+// NewDB creates a new database connection
+func NewDB(config *DatabaseConfig) (*DB, error) {
+	conn, err := sql.Open("postgres", config.ConnString())
 	if err != nil {
 		return nil, fmt.Errorf("failed to open database connection: %w", err)
 	}
@@ -40,58 +52,79 @@ func NewDB(config *DatabaseConfig) (*DB, error) {
 		return nil, fmt.Errorf("failed to ping database: %w", err)
 	}
 
-	return &DB{
-		conn:          conn,
-		config:        config,
-		preparedStmts: make(map[string]*sql.Stmt),
-	}, nil
+	db := &DB{
+		conn:   conn,
+		config: config,
+		stmts:  newStmtCache(DefaultStmtCacheSize),
+	}
+	db.ConfigurePool(config.Pool)
+
+	return db, nil
 }
 
-// GetOrCreatePreparedStmt gets or creates a prepared statement
-func (db *DB) GetOrCreatePreparedStmt(key, query string) (*sql.Stmt, error) {
-	db.stmtMutex.RLock()
-	stmt, exists := db.preparedStmts[key]
-	db.stmtMutex.RUnlock()
-	
-	if exists && stmt != nil {
-		return stmt, nil
+// ConfigurePool applies connection pool settings; zero fields are left unchanged
+func (db *DB) ConfigurePool(pool PoolConfig) {
+	if pool.MaxOpenConns != 0 {
+		db.conn.SetMaxOpenConns(pool.MaxOpenConns)
 	}
-	
-	db.stmtMutex.Lock()
-	defer db.stmtMutex.Unlock()
-	
-	// Double-check after acquiring write lock
-	if stmt, exists := db.preparedStmts[key]; exists && stmt != nil {
-		return stmt, nil
+	if pool.MaxIdleConns != 0 {
+		db.conn.SetMaxIdleConns(pool.MaxIdleConns)
 	}
-	
-	// Create new prepared statement
-	newStmt, err := db.conn.Prepare(query)
-	if err != nil {
-		return nil, fmt.Errorf("failed to prepare statement %s: %w", key, err)
+	if pool.ConnMaxLifetime != 0 {
+		db.conn.SetConnMaxLifetime(pool.ConnMaxLifetime)
+	}
+	if pool.ConnMaxIdleTime != 0 {
+		db.conn.SetConnMaxIdleTime(pool.ConnMaxIdleTime)
 	}
-	
-	db.preparedStmts[key] = newStmt
-	return newStmt, nil
 }
 
-// Close closes the database connection and all prepared statements
-func (db *DB) Close() error {
-	db.stmtMutex.Lock()
-	defer db.stmtMutex.Unlock()
-	
-	// Close all prepared statements
-	for _, stmt := range db.preparedStmts {
-		if stmt != nil {
-			stmt.Close()
+// PoolStats returns the connection pool statistics
+func (db *DB) PoolStats() sql.DBStats {
+	return db.conn.Stats()
+}
+
+// GetOrCreatePreparedStmt gets or creates a prepared statement. table is the
+// table the statement touches, so DDL on it can invalidate the statement.
+//
+// The statement is pinned: eviction or invalidation will not close it until
+// release is called. Call release once Query, QueryRow or Exec has returned;
+// rows already returned keep the statement alive on their own.
+func (db *DB) GetOrCreatePreparedStmt(table, key, query string) (stmt *sql.Stmt, release func(), err error) {
+	entry, exists := db.stmts.get(key)
+	if !exists {
+		// Prepare outside the cache lock so a slow round trip does not block other lookups
+		newStmt, err := db.conn.Prepare(query)
+		if err != nil {
+			return nil, nil, fmt.Errorf("failed to prepare statement %s: %w", key, err)
 		}
+		entry = db.stmts.add(table, key, newStmt)
 	}
-	db.preparedStmts = nil
-	
+
+	return entry.stmt, func() { db.stmts.release(entry) }, nil
+}
+
+// InvalidateTableStmts closes the cached statements bound to a table (after DDL)
+func (db *DB) InvalidateTableStmts(table string) {
+	db.stmts.invalidateTable(table)
+}
+
+// SetStmtCacheSize bounds the number of cached prepared statements
+func (db *DB) SetStmtCacheSize(size int) {
+	db.stmts.resize(size)
+}
+
+// StmtCacheStats returns prepared statement cache counters
+func (db *DB) StmtCacheStats() StmtCacheStats {
+	return db.stmts.stats()
+}
+
+// Close closes the database connection and all prepared statements
+func (db *DB) Close() error {
+	db.stmts.closeAll()
 	return db.conn.Close()
 }
 
 // Ping checks if the database connection is alive
 func (db *DB) Ping() error {
 	return db.conn.Ping()
-}
\ No newline at end of file
+}
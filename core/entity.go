@@ -3,29 +3,40 @@ package core
 import (
 	"fmt"
 	"reflect"
+	"sort"
+	"strconv"
 	"strings"
+	"sync"
 )
 
-// EntityMetadata holds metadata about an entity
+// EntityMetadata holds metadata about an entity. Name is the registered entity
+// type, used in prepared statement keys. Metadata must not be modified once
+// plan() has been called.
 type EntityMetadata struct {
-	TableName    string
-	PrimaryKey   string
-	Columns      map[string]ColumnMetadata
-	ColumnOrder  []string
+	Name        string
+	TableName   string
+	PrimaryKey  string
+	Columns     map[string]ColumnMetadata
+	ColumnOrder []string
+
+	planOnce     sync.Once
+	compiledPlan *entityPlan
 }
 
 // ColumnMetadata holds metadata about a column
 type ColumnMetadata struct {
-	Name         string
-	Type         string
-	IsPrimaryKey bool
+	Name            string
+	Type            string
+	IsPrimaryKey    bool
 	IsAutoIncrement bool
-	IsNullable   bool
-	DefaultValue interface{}
+	IsNullable      bool
+	DefaultValue    interface{}
 }
 
-// EntityRegistry manages entity metadata
+// EntityRegistry manages entity metadata. It is safe for concurrent use: Python
+// threads (e.g. the async executor) may register entities while others query.
 type EntityRegistry struct {
+	mu       sync.RWMutex
 	entities map[string]*EntityMetadata
 }
 
@@ -38,23 +49,29 @@ func NewEntityRegistry() *EntityRegistry {
 
 // RegisterEntity registers an entity with its metadata
 func (r *EntityRegistry) RegisterEntity(entityType reflect.Type, tableName string, metadata *EntityMetadata) {
+	r.mu.Lock()
+	defer r.mu.Unlock()
 	r.entities[entityType.Name()] = metadata
 }
 
 // RegisterEntityByName registers an entity by name (for high-level API)
 func (r *EntityRegistry) RegisterEntityByName(entityName string, metadata *EntityMetadata) {
+	r.mu.Lock()
+	defer r.mu.Unlock()
 	r.entities[entityName] = metadata
 }
 
 // GetEntity returns entity metadata by type name
 func (r *EntityRegistry) GetEntity(typeName string) (*EntityMetadata, bool) {
+	r.mu.RLock()
+	defer r.mu.RUnlock()
 	entity, exists := r.entities[typeName]
 	return entity, exists
 }
 
 // GetEntityGopy returns entity metadata by type name (gopy-compatible version)
 func (r *EntityRegistry) GetEntityGopy(typeName string) (*EntityMetadata, error) {
-	entity, exists := r.entities[typeName]
+	entity, exists := r.GetEntity(typeName)
 	if !exists {
 		return nil, fmt.Errorf("entity %s not found", typeName)
 	}
@@ -75,7 +92,7 @@ func ExtractEntityMetadata(entityType reflect.Type, tableName string) *EntityMet
 
 	for i := 0; i < entityType.NumField(); i++ {
 		field := entityType.Field(i)
-		
+
 		// Skip unexported fields
 		if !field.IsExported() {
 			continue
@@ -117,11 +134,27 @@ func (m *EntityMetadata) BuildSelectQuery() string {
 	return fmt.Sprintf("SELECT %s FROM %s", columns, m.TableName)
 }
 
+// BuildSelectByIDsQuery builds a SELECT matching a list of primary keys bound as one array ($1)
+func (m *EntityMetadata) BuildSelectByIDsQuery() string {
+	return m.BuildSelectQuery() + " WHERE " + m.PrimaryKey + " = ANY($1)"
+}
+
+// NonAutoColumns returns the columns supplied by the caller on INSERT, in ColumnOrder
+func (m *EntityMetadata) NonAutoColumns() []string {
+	columns := make([]string, 0, len(m.ColumnOrder))
+	for _, colName := range m.ColumnOrder {
+		if !m.Columns[colName].IsAutoIncrement {
+			columns = append(columns, colName)
+		}
+	}
+	return columns
+}
+
 // BuildInsertQuery builds an INSERT query for an entity
 func (m *EntityMetadata) BuildInsertQuery() string {
 	var columns []string
 	var placeholders []string
-	
+
 	i := 1
 	for _, colName := range m.ColumnOrder {
 		col := m.Columns[colName]
@@ -131,17 +164,187 @@ func (m *EntityMetadata) BuildInsertQuery() string {
 			i++
 		}
 	}
-	
+
 	return fmt.Sprintf("INSERT INTO %s (%s) VALUES (%s)",
 		m.TableName,
 		strings.Join(columns, ", "),
 		strings.Join(placeholders, ", "))
 }
 
+// BuildBatchInsertQuery builds a multi-row INSERT ... RETURNING query for rowCount rows.
+// Every row binds all NonAutoColumns, so the text only depends on rowCount.
+func (m *EntityMetadata) BuildBatchInsertQuery(rowCount int) string {
+	return m.BuildBatchInsertColumnsQuery(m.NonAutoColumns(), rowCount)
+}
+
+// BuildBatchInsertColumnsQuery builds a multi-row INSERT ... RETURNING of the given
+// columns only, so the others take their DEFAULT. Without columns, every row
+// inserts DEFAULT in the primary key.
+func (m *EntityMetadata) BuildBatchInsertColumnsQuery(columns []string, rowCount int) string {
+	var sb strings.Builder
+	m.writeBatchInsertColumns(&sb, columns, rowCount)
+	sb.WriteString(" RETURNING ")
+	sb.WriteString(m.PrimaryKey)
+	return sb.String()
+}
+
+// BuildBatchUpsertQuery builds a multi-row INSERT ... ON CONFLICT DO UPDATE ... RETURNING
+// query for rowCount rows (see BuildUpsertClause)
+func (m *EntityMetadata) BuildBatchUpsertQuery(rowCount int, conflictColumns, updateColumns []string) string {
+	var sb strings.Builder
+	m.writeBatchInsert(&sb, rowCount)
+	sb.WriteString(m.BuildUpsertClause(conflictColumns, updateColumns))
+	return sb.String()
+}
+
+// BuildUpsertClause builds " ON CONFLICT (...) DO UPDATE SET ... RETURNING pk". Without
+// update columns the first conflict column is rewritten with its own value, so that
+// RETURNING still yields the id of rows that already existed.
+func (m *EntityMetadata) BuildUpsertClause(conflictColumns, updateColumns []string) string {
+	if len(updateColumns) == 0 {
+		updateColumns = conflictColumns[:1]
+	}
+
+	var sb strings.Builder
+	sb.WriteString(" ON CONFLICT (")
+	sb.WriteString(strings.Join(conflictColumns, ", "))
+	sb.WriteString(") DO UPDATE SET ")
+	for i, colName := range updateColumns {
+		if i > 0 {
+			sb.WriteString(", ")
+		}
+		sb.WriteString(colName)
+		sb.WriteString(" = EXCLUDED.")
+		sb.WriteString(colName)
+	}
+	sb.WriteString(" RETURNING ")
+	sb.WriteString(m.PrimaryKey)
+	return sb.String()
+}
+
+// writeBatchInsert writes "INSERT INTO table (NonAutoColumns) VALUES (...), ..." for rowCount rows
+func (m *EntityMetadata) writeBatchInsert(sb *strings.Builder, rowCount int) {
+	m.writeBatchInsertColumns(sb, m.NonAutoColumns(), rowCount)
+}
+
+// writeBatchInsertColumns writes "INSERT INTO table (columns) VALUES (...), ..." for
+// rowCount rows, or "(pk) VALUES (DEFAULT), ..." without columns
+func (m *EntityMetadata) writeBatchInsertColumns(sb *strings.Builder, columns []string, rowCount int) {
+	sb.WriteString("INSERT INTO ")
+	sb.WriteString(m.TableName)
+	sb.WriteString(" (")
+	if len(columns) == 0 {
+		sb.WriteString(m.PrimaryKey)
+	}
+	sb.WriteString(strings.Join(columns, ", "))
+	sb.WriteString(") VALUES ")
+
+	param := 1
+	for row := 0; row < rowCount; row++ {
+		if row > 0 {
+			sb.WriteString(", ")
+		}
+		if len(columns) == 0 {
+			sb.WriteString("(DEFAULT)")
+			continue
+		}
+		sb.WriteByte('(')
+		for col := range columns {
+			if col > 0 {
+				sb.WriteString(", ")
+			}
+			sb.WriteByte('$')
+			sb.WriteString(strconv.Itoa(param))
+			param++
+		}
+		sb.WriteByte(')')
+	}
+}
+
+// columnConstraintKeywords start the constraint part of a column definition
+var columnConstraintKeywords = []string{
+	" NOT NULL", " NULL", " PRIMARY KEY", " UNIQUE", " DEFAULT", " REFERENCES",
+	" CHECK", " GENERATED", " CONSTRAINT", " COLLATE",
+}
+
+// serialCastTypes maps pseudo-types that only exist in CREATE TABLE to their storage type
+var serialCastTypes = map[string]string{
+	"SMALLSERIAL": "SMALLINT",
+	"SERIAL":      "INTEGER",
+	"BIGSERIAL":   "BIGINT",
+}
+
+// CastType returns the data type part of a column definition, usable in a cast:
+// "VARCHAR(255) NOT NULL" -> "VARCHAR(255)", "SERIAL PRIMARY KEY" -> "INTEGER"
+func (c ColumnMetadata) CastType() string {
+	def := strings.ToUpper(strings.TrimSpace(c.Type))
+	end := len(def)
+	for _, keyword := range columnConstraintKeywords {
+		if i := strings.Index(def, keyword); i >= 0 && i < end {
+			end = i
+		}
+	}
+	def = strings.TrimSpace(def[:end])
+
+	if storage, exists := serialCastTypes[def]; exists {
+		return storage
+	}
+	return def
+}
+
+// BuildBatchUpdateQuery builds an UPDATE ... FROM (VALUES ...) query updating columns
+// on rowCount rows. Each row binds the primary key followed by columns; the first
+// row casts its placeholders so PostgreSQL knows the type of every VALUES column.
+func (m *EntityMetadata) BuildBatchUpdateQuery(columns []string, rowCount int) string {
+	var sb strings.Builder
+	sb.WriteString("UPDATE ")
+	sb.WriteString(m.TableName)
+	sb.WriteString(" AS t SET ")
+	for i, colName := range columns {
+		if i > 0 {
+			sb.WriteString(", ")
+		}
+		sb.WriteString(colName)
+		sb.WriteString(" = v.")
+		sb.WriteString(colName)
+	}
+
+	rowColumns := append([]string{m.PrimaryKey}, columns...)
+	sb.WriteString(" FROM (VALUES ")
+	param := 1
+	for row := 0; row < rowCount; row++ {
+		if row > 0 {
+			sb.WriteString(", ")
+		}
+		sb.WriteByte('(')
+		for i, colName := range rowColumns {
+			if i > 0 {
+				sb.WriteString(", ")
+			}
+			sb.WriteByte('$')
+			sb.WriteString(strconv.Itoa(param))
+			if row == 0 {
+				sb.WriteString("::")
+				sb.WriteString(m.Columns[colName].CastType())
+			}
+			param++
+		}
+		sb.WriteByte(')')
+	}
+
+	sb.WriteString(") AS v (")
+	sb.WriteString(strings.Join(rowColumns, ", "))
+	sb.WriteString(") WHERE t.")
+	sb.WriteString(m.PrimaryKey)
+	sb.WriteString(" = v.")
+	sb.WriteString(m.PrimaryKey)
+	return sb.String()
+}
+
 // BuildUpdateQuery builds an UPDATE query for an entity
 func (m *EntityMetadata) BuildUpdateQuery() string {
 	var setParts []string
-	
+
 	i := 1
 	for _, colName := range m.ColumnOrder {
 		col := m.Columns[colName]
@@ -150,7 +353,7 @@ func (m *EntityMetadata) BuildUpdateQuery() string {
 			i++
 		}
 	}
-	
+
 	return fmt.Sprintf("UPDATE %s SET %s WHERE %s = $%d",
 		m.TableName,
 		strings.Join(setParts, ", "),
@@ -158,7 +361,50 @@ func (m *EntityMetadata) BuildUpdateQuery() string {
 		i)
 }
 
+// BuildPartialUpdateQuery builds an UPDATE of the given columns for one row. Unknown,
+// primary key and auto-increment columns are skipped; columns are sorted so the same
+// set of columns always produces the same SQL text.
+func (m *EntityMetadata) BuildPartialUpdateQuery(id int64, updates map[string]interface{}) (string, []interface{}, error) {
+	columns := make([]string, 0, len(updates))
+	for colName := range updates {
+		if col, exists := m.Columns[colName]; exists && !col.IsPrimaryKey && !col.IsAutoIncrement {
+			columns = append(columns, colName)
+		}
+	}
+	if len(columns) == 0 {
+		return "", nil, fmt.Errorf("no valid fields to update")
+	}
+	sort.Strings(columns)
+
+	args := make([]interface{}, 0, len(columns)+1)
+	for _, colName := range columns {
+		args = append(args, updates[colName])
+	}
+	args = append(args, id)
+	return m.BuildUpdateColumnsQuery(columns), args, nil
+}
+
+// BuildUpdateColumnsQuery builds an UPDATE of columns for one row: $i binds
+// columns[i-1] and the last parameter the primary key
+func (m *EntityMetadata) BuildUpdateColumnsQuery(columns []string) string {
+	setParts := make([]string, len(columns))
+	for i, colName := range columns {
+		setParts[i] = fmt.Sprintf("%s = $%d", colName, i+1)
+	}
+
+	return fmt.Sprintf("UPDATE %s SET %s WHERE %s = $%d",
+		m.TableName,
+		strings.Join(setParts, ", "),
+		m.PrimaryKey,
+		len(columns)+1)
+}
+
 // BuildDeleteQuery builds a DELETE query for an entity
 func (m *EntityMetadata) BuildDeleteQuery() string {
 	return fmt.Sprintf("DELETE FROM %s WHERE %s = $1", m.TableName, m.PrimaryKey)
-}
\ No newline at end of file
+}
+
+// BuildDeleteByIDsQuery builds a DELETE matching a list of primary keys bound as one array ($1)
+func (m *EntityMetadata) BuildDeleteByIDsQuery() string {
+	return fmt.Sprintf("DELETE FROM %s WHERE %s = ANY($1)", m.TableName, m.PrimaryKey)
+}
@@ -1,12 +1,16 @@
 package core
 
 import (
+	"bytes"
 	"encoding/json"
 	"fmt"
+	"time"
 )
 
 // TakeoAPI - Interface simplifiée pour les bindings gopy
-// Évite les types complexes qui posent des problèmes avec gopy
+// Évite les types complexes qui posent des problèmes avec gopy.
+// Les charges utiles JSON transitent en []byte dans les deux sens : pas de
+// conversion string <-> []byte côté Go ni str <-> bytes côté Python.
 type TakeoAPI struct {
 	manager *TakeoManager
 }
@@ -17,102 +21,465 @@ func NewTakeoAPI(host string, port int, user, password, database, sslmode string
 	if err != nil {
 		return nil, err
 	}
-	
+
 	return &TakeoAPI{
 		manager: manager,
 	}, nil
 }
 
-// RegisterEntity enregistre une entité (version simplifiée pour gopy)
-func (api *TakeoAPI) RegisterEntity(name, tableName string, columnsJSON string, primaryKey string) error {
+// RegisterEntity enregistre une entité (version simplifiée pour gopy). Les colonnes
+// gardent l'ordre de l'objet JSON, c'est-à-dire l'ordre de déclaration Python.
+func (api *TakeoAPI) RegisterEntity(name, tableName string, columnsJSON []byte, primaryKey string) error {
 	// Parser le JSON pour récupérer les définitions de colonnes
 	var columns map[string]string
-	if err := json.Unmarshal([]byte(columnsJSON), &columns); err != nil {
+	if err := json.Unmarshal(columnsJSON, &columns); err != nil {
 		return fmt.Errorf("failed to parse columns JSON: %v", err)
 	}
-	
-	return api.manager.RegisterEntity(name, tableName, columns, primaryKey)
+
+	columnOrder, err := jsonObjectKeys(columnsJSON)
+	if err != nil {
+		return fmt.Errorf("failed to parse columns JSON: %v", err)
+	}
+
+	return api.manager.RegisterEntityOrdered(name, tableName, columns, columnOrder, primaryKey)
+}
+
+// jsonObjectKeys retourne les clés d'un objet JSON dans leur ordre d'apparition
+// (une clé répétée garde sa première position)
+func jsonObjectKeys(data []byte) ([]string, error) {
+	decoder := json.NewDecoder(bytes.NewReader(data))
+	if _, err := decoder.Token(); err != nil {
+		return nil, err
+	}
+
+	var keys []string
+	seen := make(map[string]bool)
+	for decoder.More() {
+		token, err := decoder.Token()
+		if err != nil {
+			return nil, err
+		}
+		key, _ := token.(string)
+		if !seen[key] {
+			seen[key] = true
+			keys = append(keys, key)
+		}
+
+		var value json.RawMessage
+		if err := decoder.Decode(&value); err != nil {
+			return nil, err
+		}
+	}
+	return keys, nil
 }
 
 // Save sauvegarde une entité (version simplifiée)
-func (api *TakeoAPI) Save(entityType string, dataJSON string) (int64, error) {
+func (api *TakeoAPI) Save(entityType string, dataJSON []byte) (int64, error) {
 	// Parser le JSON pour récupérer les données d'entité
 	var entityData map[string]interface{}
-	if err := json.Unmarshal([]byte(dataJSON), &entityData); err != nil {
+	if err := json.Unmarshal(dataJSON, &entityData); err != nil {
 		return 0, fmt.Errorf("failed to parse entity JSON: %v", err)
 	}
-	
+
 	return api.manager.Save(entityType, entityData)
 }
 
 // SaveBatch sauvegarde plusieurs entités en batch (version optimisée)
-func (api *TakeoAPI) SaveBatch(entityType string, entitiesJSON string) (string, error) {
+func (api *TakeoAPI) SaveBatch(entityType string, entitiesJSON []byte) ([]byte, error) {
 	// Parser le JSON pour récupérer les données des entités
 	var entitiesData []map[string]interface{}
-	if err := json.Unmarshal([]byte(entitiesJSON), &entitiesData); err != nil {
-		return "", fmt.Errorf("failed to parse entities JSON: %v", err)
+	if err := json.Unmarshal(entitiesJSON, &entitiesData); err != nil {
+		return nil, fmt.Errorf("failed to parse entities JSON: %v", err)
 	}
-	
+
 	ids, err := api.manager.SaveBatch(entityType, entitiesData)
 	if err != nil {
-		return "", err
+		return nil, err
 	}
-	
+
 	// Retourner les IDs en JSON
 	idsJSON, err := json.Marshal(ids)
 	if err != nil {
-		return "", fmt.Errorf("failed to marshal IDs: %v", err)
+		return nil, fmt.Errorf("failed to marshal IDs: %v", err)
+	}
+
+	return idsJSON, nil
+}
+
+// UpsertBatch insère ou met à jour plusieurs entités (options JSON : UpsertOptions)
+// et retourne leurs IDs en JSON, dans l'ordre d'entrée
+func (api *TakeoAPI) UpsertBatch(entityType string, entitiesJSON, optionsJSON []byte) ([]byte, error) {
+	var entitiesData []map[string]interface{}
+	if err := json.Unmarshal(entitiesJSON, &entitiesData); err != nil {
+		return nil, fmt.Errorf("failed to parse entities JSON: %v", err)
+	}
+
+	var options UpsertOptions
+	if err := json.Unmarshal(optionsJSON, &options); err != nil {
+		return nil, fmt.Errorf("failed to parse upsert options JSON: %v", err)
+	}
+
+	ids, err := api.manager.UpsertBatch(entityType, entitiesData, options)
+	if err != nil {
+		return nil, err
+	}
+
+	idsJSON, err := json.Marshal(ids)
+	if err != nil {
+		return nil, fmt.Errorf("failed to marshal IDs: %v", err)
 	}
-	
-	return string(idsJSON), nil
+	return idsJSON, nil
+}
+
+// SetCopyThreshold définit la taille de batch au-delà de laquelle SaveBatch passe par COPY
+func (api *TakeoAPI) SetCopyThreshold(threshold int) {
+	api.manager.SetCopyThreshold(threshold)
 }
 
-// FindByID trouve une entité par ID (retourne JSON string pour simplicité)
-func (api *TakeoAPI) FindByID(entityType string, id int64) (string, error) {
+// EnableWriteBehind active le mode write-behind (délai en millisecondes, 0 = valeur par défaut)
+func (api *TakeoAPI) EnableWriteBehind(maxBatch int, maxDelayMs int64) error {
+	return api.manager.EnableWriteBehind(maxBatch, time.Duration(maxDelayMs)*time.Millisecond)
+}
+
+// EnqueueSave met une sauvegarde en file write-behind et retourne son ticket
+func (api *TakeoAPI) EnqueueSave(entityType string, dataJSON []byte) (int64, error) {
+	var entityData map[string]interface{}
+	if err := json.Unmarshal(dataJSON, &entityData); err != nil {
+		return 0, fmt.Errorf("failed to parse entity JSON: %v", err)
+	}
+
+	return api.manager.EnqueueSave(entityType, entityData)
+}
+
+// AwaitSave attend l'ID d'une sauvegarde en file (timeout en millisecondes, <= 0 = sans limite)
+func (api *TakeoAPI) AwaitSave(ticket int64, timeoutMs int64) (int64, error) {
+	return api.manager.AwaitSave(ticket, time.Duration(timeoutMs)*time.Millisecond)
+}
+
+// SaveDone indique si l'ID d'une sauvegarde en file est disponible
+func (api *TakeoAPI) SaveDone(ticket int64) bool {
+	return api.manager.SaveDone(ticket)
+}
+
+// ReleaseSave oublie le ticket d'une sauvegarde dont l'ID ne sera pas attendu
+func (api *TakeoAPI) ReleaseSave(ticket int64) {
+	api.manager.ReleaseSave(ticket)
+}
+
+// FlushWrites écrit immédiatement les sauvegardes en file write-behind
+func (api *TakeoAPI) FlushWrites() error {
+	return api.manager.FlushWrites()
+}
+
+// FindByID trouve une entité par ID (retourne un RowSet JSON : {"columns": [...], "rows": [[...]]})
+func (api *TakeoAPI) FindByID(entityType string, id int64) ([]byte, error) {
 	result, err := api.manager.FindByID(entityType, id)
 	if err != nil {
-		return "", err
+		return nil, err
 	}
-	
-	// Marshaller le résultat en JSON
-	jsonData, err := json.Marshal(result)
+
+	// Le RowSet est déjà encodé en JSON pendant le scan
+	return result.JSON(), nil
+}
+
+// FindByIDs trouve plusieurs entités à partir d'une liste JSON d'IDs (retourne un RowSet JSON)
+func (api *TakeoAPI) FindByIDs(entityType string, idsJSON []byte) ([]byte, error) {
+	var ids []int64
+	if err := json.Unmarshal(idsJSON, &ids); err != nil {
+		return nil, fmt.Errorf("failed to parse IDs JSON: %v", err)
+	}
+
+	results, err := api.manager.FindByIDs(entityType, ids)
 	if err != nil {
-		return "", fmt.Errorf("failed to marshal result: %v", err)
+		return nil, err
 	}
-	return string(jsonData), nil
+
+	return results.JSON(), nil
 }
 
-// FindAll trouve toutes les entités (retourne JSON string)
-func (api *TakeoAPI) FindAll(entityType string) (string, error) {
+// FindAll trouve toutes les entités (retourne un RowSet JSON positionnel)
+func (api *TakeoAPI) FindAll(entityType string) ([]byte, error) {
 	results, err := api.manager.FindAll(entityType)
 	if err != nil {
-		return "", err
+		return nil, err
+	}
+
+	return results.JSON(), nil
+}
+
+// FindQuery exécute une lecture filtrée décrite en JSON (voir Query) et retourne un RowSet JSON
+func (api *TakeoAPI) FindQuery(entityType string, queryJSON []byte) ([]byte, error) {
+	var query Query
+	if err := json.Unmarshal(queryJSON, &query); err != nil {
+		return nil, fmt.Errorf("failed to parse query JSON: %v", err)
 	}
-	
-	// Marshaller les résultats en JSON
-	jsonData, err := json.Marshal(results)
+
+	results, err := api.manager.FindQuery(entityType, &query)
 	if err != nil {
-		return "", fmt.Errorf("failed to marshal results: %v", err)
+		return nil, err
 	}
-	return string(jsonData), nil
+
+	return results.JSON(), nil
+}
+
+// FindQueryParallel exécute une Query JSON en parallel tranches de clé primaire
+// lues en même temps (voir TakeoManager.FindQueryParallel)
+func (api *TakeoAPI) FindQueryParallel(entityType string, queryJSON []byte, parallel int) ([]byte, error) {
+	var query Query
+	if err := json.Unmarshal(queryJSON, &query); err != nil {
+		return nil, fmt.Errorf("failed to parse query JSON: %v", err)
+	}
+
+	results, err := api.manager.FindQueryParallel(entityType, &query, parallel)
+	if err != nil {
+		return nil, err
+	}
+
+	return results.JSON(), nil
+}
+
+// FindColumns lit des colonnes entières en trame binaire colonnaire (voir TakeoManager.FindColumns)
+func (api *TakeoAPI) FindColumns(entityType string, columnsJSON []byte) ([]byte, error) {
+	var columns []string
+	if len(columnsJSON) > 0 {
+		if err := json.Unmarshal(columnsJSON, &columns); err != nil {
+			return nil, fmt.Errorf("failed to parse columns JSON: %v", err)
+		}
+	}
+
+	return api.manager.FindColumns(entityType, columns)
+}
+
+// OpenCursor ouvre un curseur de lecture par pages et retourne son identifiant
+func (api *TakeoAPI) OpenCursor(entityType string, batchSize int) (int64, error) {
+	return api.manager.OpenCursor(entityType, batchSize)
+}
+
+// FetchCursor retourne la page suivante d'un curseur en RowSet JSON (sans lignes quand il est épuisé)
+func (api *TakeoAPI) FetchCursor(cursorID int64) ([]byte, error) {
+	results, err := api.manager.FetchCursor(cursorID)
+	if err != nil {
+		return nil, err
+	}
+
+	return results.JSON(), nil
+}
+
+// OpenParallelCursor ouvre un curseur qui lit une Query JSON en parallel tranches de clé primaire
+func (api *TakeoAPI) OpenParallelCursor(entityType string, queryJSON []byte, parallel, batchSize int) (int64, error) {
+	var query Query
+	if err := json.Unmarshal(queryJSON, &query); err != nil {
+		return 0, fmt.Errorf("failed to parse query JSON: %v", err)
+	}
+
+	return api.manager.OpenParallelCursor(entityType, &query, parallel, batchSize)
+}
+
+// CloseCursor ferme un curseur avant qu'il soit épuisé
+func (api *TakeoAPI) CloseCursor(cursorID int64) error {
+	return api.manager.CloseCursor(cursorID)
 }
 
 // Update met à jour une entité
-func (api *TakeoAPI) Update(entityType string, id int64, updateJSON string) error {
+func (api *TakeoAPI) Update(entityType string, id int64, updateJSON []byte) error {
 	// Parser le JSON pour récupérer les mises à jour
 	var updates map[string]interface{}
-	if err := json.Unmarshal([]byte(updateJSON), &updates); err != nil {
+	if err := json.Unmarshal(updateJSON, &updates); err != nil {
 		return fmt.Errorf("failed to parse update JSON: %v", err)
 	}
-	
+
 	return api.manager.Update(entityType, id, updates)
 }
 
+// UpdateBatch met à jour plusieurs entités (JSON : [{"id": 1, "updates": {...}}, ...])
+// et retourne le nombre de lignes modifiées
+func (api *TakeoAPI) UpdateBatch(entityType string, updatesJSON []byte) (int64, error) {
+	var updates []UpdateData
+	if err := json.Unmarshal(updatesJSON, &updates); err != nil {
+		return 0, fmt.Errorf("failed to parse updates JSON: %v", err)
+	}
+
+	return api.manager.UpdateBatch(entityType, updates)
+}
+
 // Delete supprime une entité
 func (api *TakeoAPI) Delete(entityType string, id int64) error {
 	return api.manager.Delete(entityType, id)
 }
 
+// DeleteBatch supprime plusieurs entités à partir d'une liste JSON d'IDs et
+// retourne le nombre de lignes supprimées
+func (api *TakeoAPI) DeleteBatch(entityType string, idsJSON []byte) (int64, error) {
+	var ids []int64
+	if err := json.Unmarshal(idsJSON, &ids); err != nil {
+		return 0, fmt.Errorf("failed to parse IDs JSON: %v", err)
+	}
+
+	return api.manager.DeleteBatch(entityType, ids)
+}
+
+// DeleteWhere supprime les entités filtrées par le "where" d'une Query JSON et
+// retourne le nombre de lignes supprimées (tri, LIMIT et OFFSET sont ignorés)
+func (api *TakeoAPI) DeleteWhere(entityType string, queryJSON []byte) (int64, error) {
+	var query Query
+	if err := json.Unmarshal(queryJSON, &query); err != nil {
+		return 0, fmt.Errorf("failed to parse query JSON: %v", err)
+	}
+
+	return api.manager.DeleteWhere(entityType, query.Where)
+}
+
+// ApplyChanges écrit une unité de travail (JSON : liste d'EntityChanges) dans une
+// seule transaction et retourne les IDs insérés en JSON, un tableau par élément
+func (api *TakeoAPI) ApplyChanges(changesJSON []byte) ([]byte, error) {
+	var changes []EntityChanges
+	if err := json.Unmarshal(changesJSON, &changes); err != nil {
+		return nil, fmt.Errorf("failed to parse changes JSON: %v", err)
+	}
+
+	inserted, err := api.manager.ApplyChanges(changes)
+	if err != nil {
+		return nil, err
+	}
+
+	idsJSON, err := json.Marshal(inserted)
+	if err != nil {
+		return nil, fmt.Errorf("failed to marshal IDs: %v", err)
+	}
+	return idsJSON, nil
+}
+
+// BeginTransaction ouvre une transaction et retourne son identifiant pour les appels Tx*
+func (api *TakeoAPI) BeginTransaction() (int64, error) {
+	return api.manager.OpenTransaction()
+}
+
+// Commit valide une transaction ouverte par BeginTransaction
+func (api *TakeoAPI) Commit(txID int64) error {
+	return api.manager.CommitTransaction(txID)
+}
+
+// Rollback annule une transaction ouverte par BeginTransaction
+func (api *TakeoAPI) Rollback(txID int64) error {
+	return api.manager.RollbackTransaction(txID)
+}
+
+// TxSave sauvegarde une entité dans une transaction
+func (api *TakeoAPI) TxSave(txID int64, entityType string, dataJSON []byte) (int64, error) {
+	tx, err := api.manager.Transaction(txID)
+	if err != nil {
+		return 0, err
+	}
+
+	var entityData map[string]interface{}
+	if err := json.Unmarshal(dataJSON, &entityData); err != nil {
+		return 0, fmt.Errorf("failed to parse entity JSON: %v", err)
+	}
+
+	return tx.Save(entityType, entityData)
+}
+
+// TxSaveBatch sauvegarde plusieurs entités dans une transaction et retourne leurs IDs en JSON
+func (api *TakeoAPI) TxSaveBatch(txID int64, entityType string, entitiesJSON []byte) ([]byte, error) {
+	tx, err := api.manager.Transaction(txID)
+	if err != nil {
+		return nil, err
+	}
+
+	var entitiesData []map[string]interface{}
+	if err := json.Unmarshal(entitiesJSON, &entitiesData); err != nil {
+		return nil, fmt.Errorf("failed to parse entities JSON: %v", err)
+	}
+
+	ids, err := tx.SaveBatch(entityType, entitiesData)
+	if err != nil {
+		return nil, err
+	}
+
+	idsJSON, err := json.Marshal(ids)
+	if err != nil {
+		return nil, fmt.Errorf("failed to marshal IDs: %v", err)
+	}
+	return idsJSON, nil
+}
+
+// TxUpdate met à jour une entité dans une transaction
+func (api *TakeoAPI) TxUpdate(txID int64, entityType string, id int64, updateJSON []byte) error {
+	tx, err := api.manager.Transaction(txID)
+	if err != nil {
+		return err
+	}
+
+	var updates map[string]interface{}
+	if err := json.Unmarshal(updateJSON, &updates); err != nil {
+		return fmt.Errorf("failed to parse update JSON: %v", err)
+	}
+
+	return tx.Update(entityType, id, updates)
+}
+
+// TxUpdateBatch met à jour plusieurs entités dans une transaction (même JSON que
+// UpdateBatch) et retourne le nombre de lignes modifiées
+func (api *TakeoAPI) TxUpdateBatch(txID int64, entityType string, updatesJSON []byte) (int64, error) {
+	tx, err := api.manager.Transaction(txID)
+	if err != nil {
+		return 0, err
+	}
+
+	var updates []UpdateData
+	if err := json.Unmarshal(updatesJSON, &updates); err != nil {
+		return 0, fmt.Errorf("failed to parse updates JSON: %v", err)
+	}
+
+	return tx.UpdateBatch(entityType, updates)
+}
+
+// TxDelete supprime une entité dans une transaction
+func (api *TakeoAPI) TxDelete(txID int64, entityType string, id int64) error {
+	tx, err := api.manager.Transaction(txID)
+	if err != nil {
+		return err
+	}
+
+	return tx.Delete(entityType, id)
+}
+
+// TxDeleteBatch supprime plusieurs entités (liste JSON d'IDs) dans une transaction
+// et retourne le nombre de lignes supprimées
+func (api *TakeoAPI) TxDeleteBatch(txID int64, entityType string, idsJSON []byte) (int64, error) {
+	tx, err := api.manager.Transaction(txID)
+	if err != nil {
+		return 0, err
+	}
+
+	var ids []int64
+	if err := json.Unmarshal(idsJSON, &ids); err != nil {
+		return 0, fmt.Errorf("failed to parse IDs JSON: %v", err)
+	}
+
+	return tx.DeleteBatch(entityType, ids)
+}
+
+// TxFindQuery exécute une lecture filtrée (Query JSON) dans une transaction et retourne un RowSet JSON
+func (api *TakeoAPI) TxFindQuery(txID int64, entityType string, queryJSON []byte) ([]byte, error) {
+	tx, err := api.manager.Transaction(txID)
+	if err != nil {
+		return nil, err
+	}
+
+	var query Query
+	if err := json.Unmarshal(queryJSON, &query); err != nil {
+		return nil, fmt.Errorf("failed to parse query JSON: %v", err)
+	}
+
+	results, err := tx.FindQuery(entityType, &query)
+	if err != nil {
+		return nil, err
+	}
+
+	return results.JSON(), nil
+}
+
 // CreateTable crée la table pour une entité
 func (api *TakeoAPI) CreateTable(entityType string) error {
 	return api.manager.CreateTable(entityType)
@@ -123,6 +490,91 @@ func (api *TakeoAPI) DropTable(entityType string) error {
 	return api.manager.DropTable(entityType)
 }
 
+// ConfigurePool configure le pool de connexions (durées en millisecondes, 0 = inchangé)
+func (api *TakeoAPI) ConfigurePool(maxOpenConns, maxIdleConns int, connMaxLifetimeMs, connMaxIdleTimeMs int64) {
+	api.manager.ConfigurePool(PoolConfig{
+		MaxOpenConns:    maxOpenConns,
+		MaxIdleConns:    maxIdleConns,
+		ConnMaxLifetime: time.Duration(connMaxLifetimeMs) * time.Millisecond,
+		ConnMaxIdleTime: time.Duration(connMaxIdleTimeMs) * time.Millisecond,
+	})
+}
+
+// PoolStats retourne les statistiques du pool en JSON (durées en secondes)
+func (api *TakeoAPI) PoolStats() ([]byte, error) {
+	stats := api.manager.PoolStats()
+
+	return json.Marshal(map[string]interface{}{
+		"max_open_connections": stats.MaxOpenConnections,
+		"open_connections":     stats.OpenConnections,
+		"in_use":               stats.InUse,
+		"idle":                 stats.Idle,
+		"wait_count":           stats.WaitCount,
+		"wait_duration":        stats.WaitDuration.Seconds(),
+		"max_idle_closed":      stats.MaxIdleClosed,
+		"max_idle_time_closed": stats.MaxIdleTimeClosed,
+		"max_lifetime_closed":  stats.MaxLifetimeClosed,
+	})
+}
+
+// SetStmtCacheSize borne le nombre de prepared statements gardés en cache
+func (api *TakeoAPI) SetStmtCacheSize(size int) {
+	api.manager.SetStmtCacheSize(size)
+}
+
+// StmtCacheStats retourne les compteurs du cache de prepared statements en JSON
+func (api *TakeoAPI) StmtCacheStats() ([]byte, error) {
+	return json.Marshal(api.manager.StmtCacheStats())
+}
+
+// CacheEntity active le cache de résultats d'une entité (TTL en millisecondes, <= 0 le désactive)
+func (api *TakeoAPI) CacheEntity(entityType string, ttlMs int64) error {
+	return api.manager.CacheEntity(entityType, time.Duration(ttlMs)*time.Millisecond)
+}
+
+// SetResultCacheSize borne la taille du cache de résultats en octets
+func (api *TakeoAPI) SetResultCacheSize(bytes int64) {
+	api.manager.SetResultCacheSize(bytes)
+}
+
+// ResultCacheStats retourne les compteurs du cache de résultats en JSON
+func (api *TakeoAPI) ResultCacheStats() ([]byte, error) {
+	return json.Marshal(api.manager.ResultCacheStats())
+}
+
+// InvalidateResults vide le cache de résultats d'une entité
+func (api *TakeoAPI) InvalidateResults(entityType string) {
+	api.manager.InvalidateResults(entityType)
+}
+
+// EnableCacheSync active l'invalidation du cache de résultats entre processus (LISTEN/NOTIFY)
+func (api *TakeoAPI) EnableCacheSync(channel string) error {
+	return api.manager.EnableCacheSync(channel)
+}
+
+// InstallCacheTrigger installe le trigger de notification sur la table d'une entité
+func (api *TakeoAPI) InstallCacheTrigger(entityType string) error {
+	return api.manager.InstallCacheTrigger(entityType)
+}
+
+// Replicate charge une entité en mémoire (voir TakeoManager.Replicate); la
+// liste des colonnes indexées est un tableau JSON, l'intervalle en millisecondes
+func (api *TakeoAPI) Replicate(entityType string, indexColumnsJSON []byte, refreshColumn string, refreshMs int64) error {
+	var indexColumns []string
+	if len(indexColumnsJSON) > 0 {
+		if err := json.Unmarshal(indexColumnsJSON, &indexColumns); err != nil {
+			return fmt.Errorf("failed to parse index columns JSON: %v", err)
+		}
+	}
+
+	return api.manager.Replicate(entityType, indexColumns, refreshColumn, time.Duration(refreshMs)*time.Millisecond)
+}
+
+// Unreplicate retire la copie en mémoire d'une entité
+func (api *TakeoAPI) Unreplicate(entityType string) {
+	api.manager.Unreplicate(entityType)
+}
+
 // Close ferme la connexion
 func (api *TakeoAPI) Close() error {
 	return api.manager.Close()
@@ -131,4 +583,4 @@ func (api *TakeoAPI) Close() error {
 // Ping vérifie la connectivité
 func (api *TakeoAPI) Ping() error {
 	return api.manager.Ping()
-}
\ No newline at end of file
+}
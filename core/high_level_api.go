@@ -3,13 +3,32 @@ package core
 import (
 	"database/sql"
 	"fmt"
+	"sort"
+	"strconv"
 	"strings"
+	"sync"
+	"time"
+
+	"github.com/lib/pq"
 )
 
 // TakeoManager - Interface principale haut niveau pour l'utilisateur
 type TakeoManager struct {
-	db       *DB
-	registry *EntityRegistry
+	db            *DB
+	registry      *EntityRegistry
+	copyThreshold int
+	cursors       *cursorRegistry
+	transactions  *txRegistry
+	results       *resultCache
+
+	writeBehindMu sync.Mutex
+	writeBehind   *writeBehind
+
+	cacheSyncMu sync.Mutex
+	cacheSync   *cacheSync
+
+	replicasMu sync.RWMutex
+	replicas   map[string]*replica
 }
 
 // UpdateData structure pour les updates en batch
@@ -23,6 +42,8 @@ type TakeoTransaction struct {
 	tx       *sql.Tx
 	manager  *TakeoManager
 	finished bool
+	stmts    map[string]*sql.Stmt // prepared on tx, closed by Commit/Rollback
+	written  map[string]bool      // entities whose cached results Commit invalidates
 }
 
 // NewTakeoManager creates a new high-level ORM manager
@@ -44,31 +65,71 @@ func NewTakeoManager(host string, port int, user, password, database, sslmode st
 	registry := NewEntityRegistry()
 
 	return &TakeoManager{
-		db:       db,
-		registry: registry,
+		db:            db,
+		registry:      registry,
+		copyThreshold: DefaultCopyThreshold,
+		cursors:       newCursorRegistry(),
+		transactions:  newTxRegistry(),
+		results:       newResultCache(DefaultResultCacheBytes),
 	}, nil
 }
 
-// RegisterEntity enregistre une nouvelle entité avec ses métadonnées
+// RegisterEntity enregistre une nouvelle entité avec ses métadonnées. L'ordre des
+// colonnes est déterministe : la clé primaire puis les autres par ordre alphabétique.
 func (tm *TakeoManager) RegisterEntity(name, tableName string, columns map[string]string, primaryKey string) error {
+	columnOrder := make([]string, 0, len(columns))
+	for colName := range columns {
+		if colName != primaryKey {
+			columnOrder = append(columnOrder, colName)
+		}
+	}
+	sort.Strings(columnOrder)
+	if _, exists := columns[primaryKey]; exists {
+		columnOrder = append([]string{primaryKey}, columnOrder...)
+	}
+
+	return tm.RegisterEntityOrdered(name, tableName, columns, columnOrder, primaryKey)
+}
+
+// RegisterEntityOrdered enregistre une entité avec un ordre de colonnes explicite
+// (celui de la déclaration Python) et compile son plan de requêtes
+func (tm *TakeoManager) RegisterEntityOrdered(name, tableName string, columns map[string]string, columnOrder []string, primaryKey string) error {
+	if len(columnOrder) != len(columns) {
+		return fmt.Errorf("entity %s: column order lists %d columns, expected %d", name, len(columnOrder), len(columns))
+	}
+
 	metadata := &EntityMetadata{
+		Name:        name,
 		TableName:   tableName,
 		Columns:     make(map[string]ColumnMetadata),
 		PrimaryKey:  primaryKey,
-		ColumnOrder: make([]string, 0, len(columns)),
+		ColumnOrder: columnOrder,
 	}
 
 	// Convert string definitions to ColumnMetadata
-	for colName, colDef := range columns {
+	for _, colName := range columnOrder {
+		colDef, exists := columns[colName]
+		if !exists {
+			return fmt.Errorf("entity %s: unknown column %s in column order", name, colName)
+		}
 		metadata.Columns[colName] = ColumnMetadata{
 			Name:            colName,
 			Type:            colDef,
 			IsPrimaryKey:    colName == primaryKey,
 			IsAutoIncrement: colName == primaryKey, // Assume PK is auto-increment for now
 		}
-		metadata.ColumnOrder = append(metadata.ColumnOrder, colName)
 	}
 
+	// Compile SQL, statement keys and scan layout once, off the hot path
+	metadata.plan()
+
+	// Statements prepared for a previous registration may not match the new columns
+	if _, exists := tm.registry.GetEntity(name); exists && tm.db != nil {
+		tm.db.InvalidateTableStmts(tableName)
+	}
+	tm.results.invalidate(name)
+	tm.Unreplicate(name)
+
 	// Use direct registration by name for the high-level API
 	tm.registry.RegisterEntityByName(name, metadata)
 	return nil
@@ -80,32 +141,24 @@ func (tm *TakeoManager) Save(entityType string, entityData map[string]interface{
 	if !exists {
 		return 0, fmt.Errorf("entity %s not registered", entityType)
 	}
+	defer tm.entityWritten(entityType)
 
 	// Use prepared statement for better performance
-	query := metadata.BuildInsertQuery() + " RETURNING " + metadata.PrimaryKey
-	stmtKey := fmt.Sprintf("insert_%s", entityType)
-	
-	stmt, err := tm.db.GetOrCreatePreparedStmt(stmtKey, query)
+	plan := metadata.plan()
+	shape, args := plan.insert(metadata, entityData)
+	stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, shape.key, shape.sql)
 	if err != nil {
 		return 0, err
 	}
-
-	var queryValues []interface{}
-	for _, colName := range metadata.ColumnOrder {
-		col := metadata.Columns[colName]
-		if !col.IsAutoIncrement {
-			if val, exists := entityData[colName]; exists {
-				queryValues = append(queryValues, val)
-			}
-		}
-	}
+	defer release()
 
 	var id int64
-	err = stmt.QueryRow(queryValues...).Scan(&id)
+	err = stmt.QueryRow(args...).Scan(&id)
 	return id, err
 }
 
-// SaveBatch sauvegarde plusieurs entités en une transaction avec INSERT batch optimisé
+// SaveBatch sauvegarde plusieurs entités en une transaction avec INSERT batch optimisé.
+// Les IDs retournés sont dans l'ordre de entitiesData, quel que soit le découpage en chunks.
 func (tm *TakeoManager) SaveBatch(entityType string, entitiesData []map[string]interface{}) ([]int64, error) {
 	if len(entitiesData) == 0 {
 		return nil, nil
@@ -115,6 +168,7 @@ func (tm *TakeoManager) SaveBatch(entityType string, entitiesData []map[string]i
 	if !exists {
 		return nil, fmt.Errorf("entity %s not registered", entityType)
 	}
+	defer tm.entityWritten(entityType)
 
 	// Start transaction
 	tx, err := tm.db.conn.Begin()
@@ -123,55 +177,10 @@ func (tm *TakeoManager) SaveBatch(entityType string, entitiesData []map[string]i
 	}
 	defer tx.Rollback()
 
-	// Build batch INSERT with VALUES clause for better performance
-	nonAutoColumns := []string{}
-	for _, colName := range metadata.ColumnOrder {
-		col := metadata.Columns[colName]
-		if !col.IsAutoIncrement {
-			nonAutoColumns = append(nonAutoColumns, colName)
-		}
-	}
-
-	// Build batch INSERT query
-	tableName := metadata.TableName
-	columnsList := strings.Join(nonAutoColumns, ", ")
-	
-	// Create placeholders for batch insert: ($1, $2), ($3, $4), ...
-	var valuePlaceholders []string
-	var allValues []interface{}
-	
-	placeholderIndex := 1
-	for _, entityData := range entitiesData {
-		var rowPlaceholders []string
-		for _, colName := range nonAutoColumns {
-			if val, exists := entityData[colName]; exists {
-				allValues = append(allValues, val)
-				rowPlaceholders = append(rowPlaceholders, fmt.Sprintf("$%d", placeholderIndex))
-				placeholderIndex++
-			}
-		}
-		valuePlaceholders = append(valuePlaceholders, "("+strings.Join(rowPlaceholders, ", ")+")")
-	}
-
-	// Build final batch query
-	batchQuery := fmt.Sprintf("INSERT INTO %s (%s) VALUES %s RETURNING %s", 
-		tableName, columnsList, strings.Join(valuePlaceholders, ", "), metadata.PrimaryKey)
-
-	// Execute batch insert
-	rows, err := tx.Query(batchQuery, allValues...)
+	ids, err := saveBatchTx(tx, metadata, entitiesData, tm.copyThreshold)
 	if err != nil {
 		return nil, err
 	}
-	defer rows.Close()
-
-	var ids []int64
-	for rows.Next() {
-		var id int64
-		if err := rows.Scan(&id); err != nil {
-			return nil, err
-		}
-		ids = append(ids, id)
-	}
 
 	if err := tx.Commit(); err != nil {
 		return nil, err
@@ -180,134 +189,128 @@ func (tm *TakeoManager) SaveBatch(entityType string, entitiesData []map[string]i
 	return ids, nil
 }
 
-// FindByID trouve une entité par son ID
-func (tm *TakeoManager) FindByID(entityType string, id int64) (map[string]interface{}, error) {
+// SetCopyThreshold définit la taille de batch au-delà de laquelle SaveBatch
+// utilise COPY FROM STDIN (0 ou négatif désactive COPY)
+func (tm *TakeoManager) SetCopyThreshold(threshold int) {
+	tm.copyThreshold = threshold
+}
+
+// FindByID trouve une entité par son ID (RowSet vide si elle n'existe pas)
+func (tm *TakeoManager) FindByID(entityType string, id int64) (*RowSet, error) {
 	metadata, exists := tm.registry.GetEntity(entityType)
 	if !exists {
 		return nil, fmt.Errorf("entity %s not registered", entityType)
 	}
 
-	query := metadata.BuildSelectQuery() + " WHERE " + metadata.PrimaryKey + " = $1"
-	row := tm.db.conn.QueryRow(query, id)
-
-	result := make(map[string]interface{})
-	scanDests := make([]interface{}, len(metadata.ColumnOrder))
-
-	for i := range metadata.ColumnOrder {
-		var value interface{}
-		scanDests[i] = &value
+	if replica := tm.replicaOf(entityType); replica != nil {
+		if result, ok := replica.findByIDs([]int64{id}); ok {
+			return result, nil
+		}
 	}
 
-	if err := row.Scan(scanDests...); err != nil {
-		return nil, err
-	}
+	return tm.cachedRead(metadata, func() string { return "id:" + strconv.FormatInt(id, 10) }, func() (*RowSet, error) {
+		plan := metadata.plan()
+		stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, plan.findByIDKey, plan.findByIDSQL)
+		if err != nil {
+			return nil, err
+		}
+		defer release()
 
-	for i, colName := range metadata.ColumnOrder {
-		result[colName] = *scanDests[i].(*interface{})
-	}
+		rows, err := stmt.Query(id)
+		if err != nil {
+			return nil, err
+		}
+		defer rows.Close()
 
-	return result, nil
+		return scanRowSet(rows, metadata)
+	})
 }
 
-// FindAll trouve toutes les entités d'un type - OPTIMISÉ avec prepared statements
-func (tm *TakeoManager) FindAll(entityType string) ([]map[string]interface{}, error) {
+// FindByIDs trouve plusieurs entités en une seule requête préparée (pk = ANY($1)).
+// Les lignes sont dans l'ordre de la base et les IDs absents sont simplement ignorés.
+func (tm *TakeoManager) FindByIDs(entityType string, ids []int64) (*RowSet, error) {
 	metadata, exists := tm.registry.GetEntity(entityType)
 	if !exists {
 		return nil, fmt.Errorf("entity %s not registered", entityType)
 	}
 
-	// Use prepared statement for better performance
-	query := metadata.BuildSelectQuery()
-	stmtKey := fmt.Sprintf("findall_%s", entityType)
-	
-	stmt, err := tm.db.GetOrCreatePreparedStmt(stmtKey, query)
-	if err != nil {
-		return nil, err
-	}
-	
-	rows, err := stmt.Query()
-	if err != nil {
-		return nil, err
+	if len(ids) == 0 {
+		return newRowSet(metadata, 0), nil
 	}
-	defer rows.Close()
-
-	var results []map[string]interface{}
 
-	for rows.Next() {
-		result := make(map[string]interface{})
-		scanDests := make([]interface{}, len(metadata.ColumnOrder))
-
-		for i := range metadata.ColumnOrder {
-			var value interface{}
-			scanDests[i] = &value
+	if replica := tm.replicaOf(entityType); replica != nil {
+		if result, ok := replica.findByIDs(ids); ok {
+			return result, nil
 		}
+	}
 
-		if err := rows.Scan(scanDests...); err != nil {
+	return tm.cachedRead(metadata, func() string { return idsCacheKey(ids) }, func() (*RowSet, error) {
+		// The whole id list is a single array parameter, so one statement serves every size
+		plan := metadata.plan()
+		stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, plan.findByIDsKey, plan.findByIDsSQL)
+		if err != nil {
 			return nil, err
 		}
+		defer release()
 
-		for i, colName := range metadata.ColumnOrder {
-			result[colName] = *scanDests[i].(*interface{})
+		rows, err := stmt.Query(pq.Array(ids))
+		if err != nil {
+			return nil, err
 		}
+		defer rows.Close()
 
-		results = append(results, result)
-	}
+		return scanRowSet(rows, metadata)
+	})
+}
 
-	return results, rows.Err()
+// idsCacheKey est la clé de cache de FindByIDs (les IDs dans l'ordre reçu)
+func idsCacheKey(ids []int64) string {
+	key := make([]byte, 0, 4+len(ids)*8)
+	key = append(key, "ids:"...)
+	for i, id := range ids {
+		if i > 0 {
+			key = append(key, ',')
+		}
+		key = strconv.AppendInt(key, id, 10)
+	}
+	return string(key)
 }
 
-// FindWhere trouve des entités selon des conditions
-func (tm *TakeoManager) FindWhere(entityType string, conditions map[string]interface{}) ([]map[string]interface{}, error) {
+// FindAll trouve toutes les entités d'un type - OPTIMISÉ avec prepared statements
+func (tm *TakeoManager) FindAll(entityType string) (*RowSet, error) {
 	metadata, exists := tm.registry.GetEntity(entityType)
 	if !exists {
 		return nil, fmt.Errorf("entity %s not registered", entityType)
 	}
 
-	query := metadata.BuildSelectQuery() + " WHERE "
-	var conditionParts []string
-	var queryValues []interface{}
-	paramIndex := 1
-
-	for col, val := range conditions {
-		conditionParts = append(conditionParts, fmt.Sprintf("%s = $%d", col, paramIndex))
-		queryValues = append(queryValues, val)
-		paramIndex++
-	}
-
-	query += conditionParts[0]
-	for i := 1; i < len(conditionParts); i++ {
-		query += " AND " + conditionParts[i]
-	}
-
-	rows, err := tm.db.conn.Query(query, queryValues...)
-	if err != nil {
-		return nil, err
-	}
-	defer rows.Close()
-
-	var results []map[string]interface{}
-
-	for rows.Next() {
-		result := make(map[string]interface{})
-		scanDests := make([]interface{}, len(metadata.ColumnOrder))
-
-		for i := range metadata.ColumnOrder {
-			var value interface{}
-			scanDests[i] = &value
+	if replica := tm.replicaOf(entityType); replica != nil {
+		if result, ok := replica.findQuery(&Query{}); ok {
+			return result, nil
 		}
+	}
 
-		if err := rows.Scan(scanDests...); err != nil {
+	return tm.cachedRead(metadata, func() string { return "all" }, func() (*RowSet, error) {
+		// Use prepared statement for better performance
+		plan := metadata.plan()
+		stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, plan.findAllKey, plan.selectSQL)
+		if err != nil {
 			return nil, err
 		}
+		defer release()
 
-		for i, colName := range metadata.ColumnOrder {
-			result[colName] = *scanDests[i].(*interface{})
+		rows, err := stmt.Query()
+		if err != nil {
+			return nil, err
 		}
+		defer rows.Close()
 
-		results = append(results, result)
-	}
+		return scanRowSet(rows, metadata)
+	})
+}
 
-	return results, rows.Err()
+// FindWhere trouve des entités selon des égalités colonne = valeur
+func (tm *TakeoManager) FindWhere(entityType string, conditions map[string]interface{}) (*RowSet, error) {
+	return tm.FindQuery(entityType, &Query{Where: ConditionsFromMap(conditions)})
 }
 
 // Update met à jour une entité
@@ -316,90 +319,55 @@ func (tm *TakeoManager) Update(entityType string, id int64, updates map[string]i
 	if !exists {
 		return fmt.Errorf("entity %s not registered", entityType)
 	}
+	defer tm.entityWritten(entityType)
 
-	// Build dynamic UPDATE query based on fields to update
-	var setParts []string
-	var queryValues []interface{}
-	paramIndex := 1
-
-	// Add only the fields that are being updated
-	for colName, value := range updates {
-		if col, exists := metadata.Columns[colName]; exists {
-			if !col.IsPrimaryKey && !col.IsAutoIncrement {
-				setParts = append(setParts, fmt.Sprintf("%s = $%d", colName, paramIndex))
-				queryValues = append(queryValues, value)
-				paramIndex++
-			}
-		}
+	// One prepared statement per set of updated columns
+	shape, args, err := metadata.plan().partialUpdate(metadata, id, updates)
+	if err != nil {
+		return err
 	}
 
-	if len(setParts) == 0 {
-		return fmt.Errorf("no valid fields to update")
+	stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, shape.key, shape.sql)
+	if err != nil {
+		return err
 	}
+	defer release()
 
-	// Build the complete query
-	query := fmt.Sprintf("UPDATE %s SET %s WHERE %s = $%d",
-		metadata.TableName,
-		strings.Join(setParts, ", "),
-		metadata.PrimaryKey,
-		paramIndex)
-
-	// Add primary key value at the end
-	queryValues = append(queryValues, id)
-
-	_, err := tm.db.conn.Exec(query, queryValues...)
+	_, err = stmt.Exec(args...)
 	return err
 }
 
-// UpdateBatch met à jour plusieurs entités en batch
-func (tm *TakeoManager) UpdateBatch(entityType string, updates []UpdateData) error {
+// UpdateBatch met à jour plusieurs entités en une transaction et retourne le
+// nombre de lignes modifiées. Les lignes sont groupées par ensemble de colonnes
+// modifiées; chaque groupe est écrit par des UPDATE ... FROM (VALUES ...) découpés
+// sous MaxBindParams, soit quelques allers-retours au lieu d'un par ligne.
+func (tm *TakeoManager) UpdateBatch(entityType string, updates []UpdateData) (int64, error) {
 	if len(updates) == 0 {
-		return nil
+		return 0, nil
 	}
 
 	metadata, exists := tm.registry.GetEntity(entityType)
 	if !exists {
-		return fmt.Errorf("entity %s not registered", entityType)
+		return 0, fmt.Errorf("entity %s not registered", entityType)
 	}
+	defer tm.entityWritten(entityType)
 
 	// Start transaction
 	tx, err := tm.db.conn.Begin()
 	if err != nil {
-		return err
+		return 0, err
 	}
 	defer tx.Rollback()
 
-	// Prepare statement
-	query := metadata.BuildUpdateQuery()
-	stmt, err := tx.Prepare(query)
+	affected, err := updateBatchTx(tx, metadata, updates)
 	if err != nil {
-		return err
+		return 0, err
 	}
-	defer stmt.Close()
 
-	// Execute for each update
-	for _, update := range updates {
-		var queryValues []interface{}
-
-		// Add non-primary key values
-		for _, colName := range metadata.ColumnOrder {
-			col := metadata.Columns[colName]
-			if !col.IsPrimaryKey && !col.IsAutoIncrement {
-				if val, exists := update.Updates[colName]; exists {
-					queryValues = append(queryValues, val)
-				}
-			}
-		}
-
-		// Add primary key value at the end
-		queryValues = append(queryValues, update.ID)
-
-		if _, err := stmt.Exec(queryValues...); err != nil {
-			return err
-		}
+	if err := tx.Commit(); err != nil {
+		return 0, err
 	}
-
-	return tx.Commit()
+	return affected, nil
 }
 
 // Delete supprime une entité par ID
@@ -408,78 +376,72 @@ func (tm *TakeoManager) Delete(entityType string, id int64) error {
 	if !exists {
 		return fmt.Errorf("entity %s not registered", entityType)
 	}
+	defer tm.entityWritten(entityType)
+
+	plan := metadata.plan()
+	stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, plan.deleteKey, plan.deleteSQL)
+	if err != nil {
+		return err
+	}
+	defer release()
 
-	query := metadata.BuildDeleteQuery()
-	_, err := tm.db.conn.Exec(query, id)
+	_, err = stmt.Exec(id)
 	return err
 }
 
-// DeleteBatch supprime plusieurs entités par ID en batch
-func (tm *TakeoManager) DeleteBatch(entityType string, ids []int64) error {
+// DeleteBatch supprime plusieurs entités par ID en une seule requête préparée
+// (pk = ANY($1)) et retourne le nombre de lignes supprimées
+func (tm *TakeoManager) DeleteBatch(entityType string, ids []int64) (int64, error) {
 	if len(ids) == 0 {
-		return nil
+		return 0, nil
 	}
 
 	metadata, exists := tm.registry.GetEntity(entityType)
 	if !exists {
-		return fmt.Errorf("entity %s not registered", entityType)
+		return 0, fmt.Errorf("entity %s not registered", entityType)
 	}
+	defer tm.entityWritten(entityType)
 
-	// Start transaction
-	tx, err := tm.db.conn.Begin()
+	plan := metadata.plan()
+	stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, plan.deleteByIDsKey, plan.deleteByIDsSQL)
 	if err != nil {
-		return err
+		return 0, err
 	}
-	defer tx.Rollback()
+	defer release()
 
-	// Prepare statement
-	query := metadata.BuildDeleteQuery()
-	stmt, err := tx.Prepare(query)
+	result, err := stmt.Exec(pq.Array(ids))
 	if err != nil {
-		return err
-	}
-	defer stmt.Close()
-
-	// Execute for each ID
-	for _, id := range ids {
-		if _, err := stmt.Exec(id); err != nil {
-			return err
-		}
+		return 0, err
 	}
-
-	return tx.Commit()
+	return result.RowsAffected()
 }
 
-// DeleteWhere supprime des entités selon des conditions
-func (tm *TakeoManager) DeleteWhere(entityType string, conditions map[string]interface{}) (int64, error) {
+// DeleteWhere supprime les entités qui vérifient toutes les conditions et
+// retourne le nombre de lignes supprimées. Comme FindQuery, chaque forme de
+// requête est préparée une seule fois.
+func (tm *TakeoManager) DeleteWhere(entityType string, conditions []Condition) (int64, error) {
 	metadata, exists := tm.registry.GetEntity(entityType)
 	if !exists {
 		return 0, fmt.Errorf("entity %s not registered", entityType)
 	}
+	defer tm.entityWritten(entityType)
 
-	query := "DELETE FROM " + metadata.TableName + " WHERE "
-	var conditionParts []string
-	var queryValues []interface{}
-	paramIndex := 1
-
-	for col, val := range conditions {
-		conditionParts = append(conditionParts, fmt.Sprintf("%s = $%d", col, paramIndex))
-		queryValues = append(queryValues, val)
-		paramIndex++
+	query, args, err := metadata.BuildDeleteWhereQuery(conditions)
+	if err != nil {
+		return 0, err
 	}
 
-	query += conditionParts[0]
-	for i := 1; i < len(conditionParts); i++ {
-		query += " AND " + conditionParts[i]
+	stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, "delete_"+query, query)
+	if err != nil {
+		return 0, err
 	}
+	defer release()
 
-	result, err := tm.db.conn.Exec(query, queryValues...)
+	result, err := stmt.Exec(args...)
 	if err != nil {
 		return 0, err
 	}
-
-	rowsAffected, err := result.RowsAffected()
-	return rowsAffected, err
+	return result.RowsAffected()
 }
 
 // CreateTable crée la table pour une entité
@@ -499,8 +461,12 @@ func (tm *TakeoManager) CreateTable(entityType string) error {
 
 	query += strings.Join(columnDefs, ", ") + ")"
 
-	_, err := tm.db.conn.Exec(query)
-	return err
+	if _, err := tm.db.conn.Exec(query); err != nil {
+		return err
+	}
+	tm.db.InvalidateTableStmts(metadata.TableName)
+	tm.entityWritten(entityType)
+	return nil
 }
 
 // DropTable supprime la table d'une entité
@@ -511,8 +477,12 @@ func (tm *TakeoManager) DropTable(entityType string) error {
 	}
 
 	query := "DROP TABLE IF EXISTS " + metadata.TableName + " CASCADE"
-	_, err := tm.db.conn.Exec(query)
-	return err
+	if _, err := tm.db.conn.Exec(query); err != nil {
+		return err
+	}
+	tm.db.InvalidateTableStmts(metadata.TableName)
+	tm.entityWritten(entityType)
+	return nil
 }
 
 // BeginTransaction commence une nouvelle transaction
@@ -526,6 +496,8 @@ func (tm *TakeoManager) BeginTransaction() (*TakeoTransaction, error) {
 		tx:       tx,
 		manager:  tm,
 		finished: false,
+		stmts:    make(map[string]*sql.Stmt),
+		written:  make(map[string]bool),
 	}, nil
 }
 
@@ -539,30 +511,95 @@ func (tx *TakeoTransaction) Save(entityType string, entityData map[string]interf
 	if !exists {
 		return 0, fmt.Errorf("entity %s not registered", entityType)
 	}
+	tx.written[entityType] = true
 
-	query := metadata.BuildInsertQuery() + " RETURNING " + metadata.PrimaryKey
-	var queryValues []interface{}
-
-	for _, colName := range metadata.ColumnOrder {
-		col := metadata.Columns[colName]
-		if !col.IsAutoIncrement {
-			if val, exists := entityData[colName]; exists {
-				queryValues = append(queryValues, val)
-			}
-		}
+	shape, args := metadata.plan().insert(metadata, entityData)
+	stmt, err := tx.prepared(shape.key, shape.sql)
+	if err != nil {
+		return 0, err
 	}
 
 	var id int64
-	err := tx.tx.QueryRow(query, queryValues...).Scan(&id)
+	err = stmt.QueryRow(args...).Scan(&id)
 	return id, err
 }
 
-// Commit finalise la transaction
+// SaveBatch insère plusieurs entités dans la transaction (mêmes chemins VALUES/COPY
+// que TakeoManager.SaveBatch) et retourne leurs IDs dans l'ordre d'entrée
+func (tx *TakeoTransaction) SaveBatch(entityType string, entitiesData []map[string]interface{}) ([]int64, error) {
+	if tx.finished {
+		return nil, fmt.Errorf("transaction already finished")
+	}
+	if len(entitiesData) == 0 {
+		return nil, nil
+	}
+
+	metadata, exists := tx.manager.registry.GetEntity(entityType)
+	if !exists {
+		return nil, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	tx.written[entityType] = true
+	return saveBatchTx(tx.tx, metadata, entitiesData, tx.manager.copyThreshold)
+}
+
+// UpdateBatch met à jour plusieurs entités dans la transaction (voir TakeoManager.UpdateBatch)
+func (tx *TakeoTransaction) UpdateBatch(entityType string, updates []UpdateData) (int64, error) {
+	if tx.finished {
+		return 0, fmt.Errorf("transaction already finished")
+	}
+	if len(updates) == 0 {
+		return 0, nil
+	}
+
+	metadata, exists := tx.manager.registry.GetEntity(entityType)
+	if !exists {
+		return 0, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	tx.written[entityType] = true
+	return updateBatchTx(tx.tx, metadata, updates)
+}
+
+// DeleteBatch supprime plusieurs entités par ID dans la transaction (pk = ANY($1))
+func (tx *TakeoTransaction) DeleteBatch(entityType string, ids []int64) (int64, error) {
+	if tx.finished {
+		return 0, fmt.Errorf("transaction already finished")
+	}
+	if len(ids) == 0 {
+		return 0, nil
+	}
+
+	metadata, exists := tx.manager.registry.GetEntity(entityType)
+	if !exists {
+		return 0, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	tx.written[entityType] = true
+	result, err := tx.tx.Exec(metadata.plan().deleteByIDsSQL, pq.Array(ids))
+	if err != nil {
+		return 0, err
+	}
+	return result.RowsAffected()
+}
+
+// Commit finalise la transaction puis invalide le cache de résultats des
+// entités écrites (notifiées aux autres processus dans la transaction)
 func (tx *TakeoTransaction) Commit() error {
 	if tx.finished {
 		return fmt.Errorf("transaction already finished")
 	}
 	tx.finished = true
+	defer func() {
+		for entityType := range tx.written {
+			tx.manager.invalidateLocal(entityType)
+		}
+	}()
+
+	if err := tx.manager.notifyTx(tx.tx, tx.written); err != nil {
+		tx.tx.Rollback()
+		return err
+	}
 	return tx.tx.Commit()
 }
 
@@ -575,12 +612,111 @@ func (tx *TakeoTransaction) Rollback() error {
 	return tx.tx.Rollback()
 }
 
+// ConfigurePool configure le pool de connexions (champs à zéro inchangés)
+func (tm *TakeoManager) ConfigurePool(pool PoolConfig) {
+	tm.db.ConfigurePool(pool)
+}
+
+// PoolStats retourne les statistiques du pool de connexions
+func (tm *TakeoManager) PoolStats() sql.DBStats {
+	return tm.db.PoolStats()
+}
+
+// SetStmtCacheSize borne le nombre de prepared statements gardés en cache
+func (tm *TakeoManager) SetStmtCacheSize(size int) {
+	tm.db.SetStmtCacheSize(size)
+}
+
+// StmtCacheStats retourne les compteurs du cache de prepared statements
+func (tm *TakeoManager) StmtCacheStats() StmtCacheStats {
+	return tm.db.StmtCacheStats()
+}
+
+// CacheEntity active le cache de résultats pour une entité enregistrée : les
+// lectures FindByID, FindByIDs, FindAll et FindQuery gardent leur JSON encodé
+// pendant ttl, jusqu'à la prochaine écriture sur l'entité. ttl <= 0 le désactive.
+func (tm *TakeoManager) CacheEntity(entityType string, ttl time.Duration) error {
+	if _, exists := tm.registry.GetEntity(entityType); !exists {
+		return fmt.Errorf("entity %s not registered", entityType)
+	}
+	tm.results.configure(entityType, ttl)
+	return nil
+}
+
+// SetResultCacheSize borne la taille totale (en octets) du cache de résultats
+func (tm *TakeoManager) SetResultCacheSize(bytes int64) {
+	tm.results.resize(bytes)
+}
+
+// ResultCacheStats retourne les compteurs du cache de résultats
+func (tm *TakeoManager) ResultCacheStats() ResultCacheStats {
+	return tm.results.stats()
+}
+
+// InvalidateResults vide le cache de résultats d'une entité (et celui des autres
+// processus si EnableCacheSync est actif), par exemple après une écriture faite
+// hors de l'ORM
+func (tm *TakeoManager) InvalidateResults(entityType string) {
+	tm.entityWritten(entityType)
+}
+
+// cachedRead sert une lecture depuis le cache de résultats si l'entité y est
+// activée : un hit retourne le JSON déjà encodé sans toucher la base, un miss
+// exécute read et garde son résultat. key n'est calculée que si le cache est
+// actif; une clé vide désigne une lecture qui ne peut pas être mise en cache.
+func (tm *TakeoManager) cachedRead(metadata *EntityMetadata, key func() string, read func() (*RowSet, error)) (*RowSet, error) {
+	if !tm.results.enabled(metadata.Name) {
+		return read()
+	}
+
+	cacheKey := key()
+	if cacheKey == "" {
+		return read()
+	}
+	doc, count, generation, hit := tm.results.get(metadata.Name, cacheKey)
+	if hit {
+		return &RowSet{Columns: metadata.ColumnOrder, doc: doc, count: count}, nil
+	}
+
+	result, err := read()
+	if err != nil {
+		return nil, err
+	}
+	tm.results.put(metadata.Name, cacheKey, generation, result.JSON(), result.Len())
+	return result, nil
+}
+
 // Close ferme la connexion
 func (tm *TakeoManager) Close() error {
+	// Pending write-behind saves are written before the pool goes away
+	tm.writeBehindMu.Lock()
+	wb := tm.writeBehind
+	tm.writeBehindMu.Unlock()
+	if wb != nil {
+		wb.close()
+	}
+
+	tm.cacheSyncMu.Lock()
+	cs := tm.cacheSync
+	tm.cacheSync = nil
+	tm.cacheSyncMu.Unlock()
+	if cs != nil {
+		cs.close()
+	}
+
+	tm.replicasMu.Lock()
+	for _, replica := range tm.replicas {
+		replica.stopRefresh()
+	}
+	tm.replicas = nil
+	tm.replicasMu.Unlock()
+
+	tm.cursors.closeAll()
+	tm.transactions.rollbackAll()
 	return tm.db.Close()
 }
 
 // Ping vérifie la connectivité
 func (tm *TakeoManager) Ping() error {
 	return tm.db.Ping()
-}
\ No newline at end of file
+}
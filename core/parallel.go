@@ -0,0 +1,287 @@
+package core
+
+import (
+	"context"
+	"database/sql"
+	"fmt"
+	"sync"
+)
+
+// partitionQuery découpe q en au plus parallel requêtes sur des tranches
+// contiguës de la clé primaire entre son min et son max, dans l'ordre du tri de
+// q. Une requête avec LIMIT/OFFSET, triée autrement que par la clé primaire ou
+// sur une clé non entière n'est pas découpée.
+func (tm *TakeoManager) partitionQuery(metadata *EntityMetadata, q *Query, parallel int) ([]*Query, error) {
+	if parallel <= 1 || q.Limit != nil || q.Offset != nil {
+		return []*Query{q}, nil
+	}
+	if ColumnKindOf(metadata.Columns[metadata.PrimaryKey].Type) != KindInt64 {
+		return []*Query{q}, nil
+	}
+
+	desc := false
+	switch {
+	case len(q.OrderBy) == 0:
+	case len(q.OrderBy) == 1 && q.OrderBy[0].Column == metadata.PrimaryKey:
+		desc = q.OrderBy[0].Desc
+	default:
+		return []*Query{q}, nil
+	}
+
+	plan := metadata.plan()
+	stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, plan.pkRangeKey, plan.pkRangeSQL)
+	if err != nil {
+		return nil, err
+	}
+	defer release()
+
+	var low, high sql.NullInt64
+	if err := stmt.QueryRow().Scan(&low, &high); err != nil {
+		return nil, err
+	}
+	if !low.Valid {
+		// Empty table
+		return []*Query{q}, nil
+	}
+
+	return splitPKRange(metadata.PrimaryKey, q, low.Int64, high.Int64, parallel, desc), nil
+}
+
+// splitPKRange découpe [low, high] en au plus parallel tranches de même largeur
+// et retourne q restreinte à chacune (ordre décroissant si desc). Les tranches
+// ont toutes la même forme SQL, donc un seul prepared statement.
+func splitPKRange(primaryKey string, q *Query, low, high int64, parallel int, desc bool) []*Query {
+	// Unsigned arithmetic: high-low may not fit in an int64
+	span := uint64(high-low) + 1
+	if span != 0 && uint64(parallel) > span {
+		parallel = int(span)
+	}
+	step, remainder := span/uint64(parallel), span%uint64(parallel)
+	if span == 0 {
+		// The range covers every int64
+		step, remainder = ^uint64(0)/uint64(parallel), 0
+	}
+
+	parts := make([]*Query, parallel)
+	from := low
+	for i := range parts {
+		size := step
+		if uint64(i) < remainder {
+			size++
+		}
+		to := from + int64(size-1)
+		if i == len(parts)-1 {
+			to = high
+		}
+
+		where := make([]Condition, len(q.Where), len(q.Where)+2)
+		copy(where, q.Where)
+		where = append(where,
+			Condition{Column: primaryKey, Op: ">=", Value: from},
+			Condition{Column: primaryKey, Op: "<=", Value: to},
+		)
+
+		part := *q
+		part.Where = where
+		parts[i] = &part
+		from = to + 1
+	}
+
+	if desc {
+		for i, j := 0, len(parts)-1; i < j; i, j = i+1, j-1 {
+			parts[i], parts[j] = parts[j], parts[i]
+		}
+	}
+	return parts
+}
+
+// queryRows exécute une Query sur une connexion du pool
+func (tm *TakeoManager) queryRows(ctx context.Context, metadata *EntityMetadata, q *Query) (*sql.Rows, error) {
+	query, args, err := metadata.BuildFindQuery(q)
+	if err != nil {
+		return nil, err
+	}
+
+	stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, "query_"+query, query)
+	if err != nil {
+		return nil, err
+	}
+	defer release()
+	return stmt.QueryContext(ctx, args...)
+}
+
+// FindQueryParallel exécute q comme FindQuery, mais découpée en parallel
+// tranches de clé primaire lues en même temps, chacune sur sa connexion du pool
+// et dans son goroutine (scan et encodage compris). Les lignes sont les mêmes,
+// dans l'ordre de la clé primaire si q est triée par elle. Les requêtes qui ne
+// se découpent pas (voir partitionQuery) sont exécutées par FindQuery.
+func (tm *TakeoManager) FindQueryParallel(entityType string, q *Query, parallel int) (*RowSet, error) {
+	metadata, exists := tm.registry.GetEntity(entityType)
+	if !exists {
+		return nil, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	// Replicated entities are already in memory
+	if parallel <= 1 || tm.replicaOf(entityType) != nil {
+		return tm.FindQuery(entityType, q)
+	}
+
+	parts, err := tm.partitionQuery(metadata, q, parallel)
+	if err != nil {
+		return nil, err
+	}
+	if len(parts) == 1 {
+		return tm.FindQuery(entityType, parts[0])
+	}
+
+	ctx, cancel := context.WithCancel(context.Background())
+	defer cancel()
+
+	results := make([]*RowSet, len(parts))
+	errs := make([]error, len(parts))
+	var wg sync.WaitGroup
+	for i, part := range parts {
+		wg.Add(1)
+		go func(i int, part *Query) {
+			defer wg.Done()
+
+			rows, err := tm.queryRows(ctx, metadata, part)
+			if err == nil {
+				results[i], err = scanRowSet(rows, metadata)
+				rows.Close()
+			}
+			if err != nil {
+				errs[i] = err
+				cancel() // the other slices are useless now
+			}
+		}(i, part)
+	}
+	wg.Wait()
+
+	// Slices stopped by cancel() report context.Canceled, not the cause
+	var firstErr error
+	for _, err := range errs {
+		if err != nil && (firstErr == nil || firstErr == context.Canceled) {
+			firstErr = err
+		}
+	}
+	if firstErr != nil {
+		return nil, firstErr
+	}
+
+	merged := results[0]
+	for _, result := range results[1:] {
+		merged.appendRowSet(result)
+	}
+	return merged, nil
+}
+
+// scanPage est une page lue par un worker d'un scan parallèle, ou son erreur
+type scanPage struct {
+	rows *RowSet
+	err  error
+}
+
+// parallelScan lit les tranches d'un curseur parallèle dans des goroutines qui
+// envoient leurs pages au fil de l'eau : les pages de tranches différentes
+// arrivent dans un ordre quelconque
+type parallelScan struct {
+	pages  chan scanPage
+	cancel context.CancelFunc
+}
+
+func (tm *TakeoManager) startParallelScan(metadata *EntityMetadata, parts []*Query, batchSize int) *parallelScan {
+	ctx, cancel := context.WithCancel(context.Background())
+	s := &parallelScan{
+		pages:  make(chan scanPage, len(parts)),
+		cancel: cancel,
+	}
+
+	var wg sync.WaitGroup
+	for _, part := range parts {
+		wg.Add(1)
+		go func(part *Query) {
+			defer wg.Done()
+			s.scanPart(ctx, tm, metadata, part, batchSize)
+		}(part)
+	}
+	go func() {
+		wg.Wait()
+		close(s.pages)
+	}()
+
+	return s
+}
+
+// scanPart lit une tranche page par page (batchSize lignes) et envoie chaque page
+func (s *parallelScan) scanPart(ctx context.Context, tm *TakeoManager, metadata *EntityMetadata, part *Query, batchSize int) {
+	rows, err := tm.queryRows(ctx, metadata, part)
+	if err != nil {
+		s.send(ctx, scanPage{err: err})
+		return
+	}
+	defer rows.Close()
+
+	for {
+		page := newRowSet(metadata, batchSize)
+		if err := page.scan(rows, metadata, batchSize); err != nil {
+			s.send(ctx, scanPage{err: err})
+			return
+		}
+		if page.Len() == 0 || !s.send(ctx, scanPage{rows: page}) || page.Len() < batchSize {
+			return
+		}
+	}
+}
+
+// send envoie une page, sauf si le scan est arrêté
+func (s *parallelScan) send(ctx context.Context, page scanPage) bool {
+	select {
+	case s.pages <- page:
+		return true
+	case <-ctx.Done():
+		return false
+	}
+}
+
+// next retourne la page suivante d'une tranche quelconque (vide : scan terminé)
+func (s *parallelScan) next(metadata *EntityMetadata) (*RowSet, error) {
+	page, ok := <-s.pages
+	if !ok {
+		return newRowSet(metadata, 0), nil
+	}
+	return page.rows, page.err
+}
+
+// close arrête les workers et attend qu'ils aient rendu leurs connexions
+func (s *parallelScan) close() {
+	s.cancel()
+	for range s.pages {
+	}
+}
+
+// OpenParallelCursor ouvre un curseur (lu par FetchCursor, fermé par
+// CloseCursor) qui lit q en parallel tranches de clé primaire, chacune sur sa
+// connexion du pool. Les pages arrivent dès qu'une tranche en produit une, donc
+// sans ordre global.
+func (tm *TakeoManager) OpenParallelCursor(entityType string, q *Query, parallel, batchSize int) (int64, error) {
+	metadata, exists := tm.registry.GetEntity(entityType)
+	if !exists {
+		return 0, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	if batchSize <= 0 {
+		batchSize = DefaultCursorBatchSize
+	}
+
+	parts, err := tm.partitionQuery(metadata, q, parallel)
+	if err != nil {
+		return 0, err
+	}
+
+	return tm.cursors.add(&rowCursor{
+		metadata:  metadata,
+		batchSize: batchSize,
+		scan:      tm.startParallelScan(metadata, parts, batchSize),
+	}), nil
+}
@@ -0,0 +1,241 @@
+package core
+
+import (
+	"encoding/json"
+	"fmt"
+	"strings"
+	"sync"
+)
+
+// maxCachedBatchShapes bounds the multi-row INSERT texts kept per entity: batches
+// are chunked, so a handful of row counts cover almost every call
+const maxCachedBatchShapes = 32
+
+// maxCachedColumnShapes bounds the partial INSERT and UPDATE texts kept per
+// entity, one per set of written columns
+const maxCachedColumnShapes = 64
+
+// entityPlan is everything the hot paths need for one entity, compiled once from
+// its metadata: SQL text, prepared statement cache keys, the INSERT argument
+// layout and the scan layout. Hot paths read it and build no strings.
+type entityPlan struct {
+	selectSQL      string
+	findByIDSQL    string
+	findByIDsSQL   string
+	insertSQL      string // single-row INSERT ... RETURNING pk
+	deleteSQL      string
+	deleteByIDsSQL string
+	pkRangeSQL     string
+
+	findByIDKey    string
+	findByIDsKey   string
+	findAllKey     string
+	insertKey      string
+	deleteKey      string
+	deleteByIDsKey string
+	pkRangeKey     string
+
+	// INSERT argument i binds insertColumns[i] (the NonAutoColumns)
+	insertColumns []string
+
+	// ColumnKind of every column in ColumnOrder, and the RowSet JSON prefix
+	scanKinds    []ColumnKind
+	rowSetHeader []byte
+
+	batchMu      sync.Mutex
+	batchInserts map[int]string
+
+	// updatable[i] is set when ColumnOrder[i] can be written by an UPDATE
+	updatable []bool
+
+	// Partial single-row INSERT shapes by bitmask of insertColumns positions,
+	// UPDATE shapes by bitmask of ColumnOrder positions
+	fullInsert   *columnShape
+	shapeMu      sync.Mutex
+	insertShapes map[string]*columnShape
+	updateShapes map[string]*columnShape
+}
+
+// columnShape is a compiled single-row INSERT or UPDATE of some columns: argument
+// i binds columns[i] (for an UPDATE, the last argument binds the primary key)
+type columnShape struct {
+	columns []string
+	sql     string
+	key     string
+}
+
+// plan returns the compiled plan of the entity, compiling it on first use
+func (m *EntityMetadata) plan() *entityPlan {
+	m.planOnce.Do(func() {
+		m.compiledPlan = compilePlan(m)
+	})
+	return m.compiledPlan
+}
+
+func compilePlan(m *EntityMetadata) *entityPlan {
+	p := &entityPlan{
+		selectSQL:      m.BuildSelectQuery(),
+		findByIDsSQL:   m.BuildSelectByIDsQuery(),
+		insertSQL:      m.BuildInsertQuery() + " RETURNING " + m.PrimaryKey,
+		deleteSQL:      m.BuildDeleteQuery(),
+		deleteByIDsSQL: m.BuildDeleteByIDsQuery(),
+		pkRangeSQL:     "SELECT min(" + m.PrimaryKey + "), max(" + m.PrimaryKey + ") FROM " + m.TableName,
+
+		findByIDKey:    "findbyid_" + m.Name,
+		findByIDsKey:   "findbyids_" + m.Name,
+		findAllKey:     "findall_" + m.Name,
+		insertKey:      "insert_" + m.Name,
+		deleteKey:      "delete_" + m.Name,
+		deleteByIDsKey: "deletebyids_" + m.Name,
+		pkRangeKey:     "pkrange_" + m.Name,
+
+		insertColumns: m.NonAutoColumns(),
+		scanKinds:     make([]ColumnKind, len(m.ColumnOrder)),
+		batchInserts:  make(map[int]string),
+		updatable:     make([]bool, len(m.ColumnOrder)),
+		insertShapes:  make(map[string]*columnShape),
+		updateShapes:  make(map[string]*columnShape),
+	}
+	p.findByIDSQL = p.selectSQL + " WHERE " + m.PrimaryKey + " = $1"
+	p.fullInsert = &columnShape{columns: p.insertColumns, sql: p.insertSQL, key: p.insertKey}
+
+	for i, colName := range m.ColumnOrder {
+		col := m.Columns[colName]
+		p.scanKinds[i] = ColumnKindOf(col.Type)
+		p.updatable[i] = !col.IsPrimaryKey && !col.IsAutoIncrement
+	}
+
+	columns, _ := json.Marshal(m.ColumnOrder)
+	p.rowSetHeader = append([]byte(`{"columns":`), columns...)
+	p.rowSetHeader = append(p.rowSetHeader, `,"rows":[`...)
+
+	return p
+}
+
+// insert returns the single-row INSERT of the insertable columns present in
+// entityData and its arguments. Columns left out take their DEFAULT; entities
+// that set every column use insertSQL.
+func (p *entityPlan) insert(m *EntityMetadata, entityData map[string]interface{}) (*columnShape, []interface{}) {
+	var inline [8]byte
+	mask := columnMask(inline[:], len(p.insertColumns))
+
+	count := 0
+	for i, colName := range p.insertColumns {
+		if _, exists := entityData[colName]; exists {
+			mask[i/8] |= 1 << (i % 8)
+			count++
+		}
+	}
+
+	shape := p.fullInsert
+	if count < len(p.insertColumns) {
+		shape = p.shape(p.insertShapes, mask, func() *columnShape {
+			columns := maskedColumns(p.insertColumns, mask, count)
+			return &columnShape{
+				columns: columns,
+				sql:     m.BuildBatchInsertColumnsQuery(columns, 1),
+				key:     "insert_" + m.Name + "_" + strings.Join(columns, ","),
+			}
+		})
+	}
+
+	args := make([]interface{}, len(shape.columns))
+	for i, colName := range shape.columns {
+		args[i] = entityData[colName]
+	}
+	return shape, args
+}
+
+// batchInsertSQL returns BuildBatchInsertQuery(rowCount), cached per row count
+func (p *entityPlan) batchInsertSQL(m *EntityMetadata, rowCount int) string {
+	p.batchMu.Lock()
+	query, exists := p.batchInserts[rowCount]
+	p.batchMu.Unlock()
+	if exists {
+		return query
+	}
+
+	query = m.BuildBatchInsertQuery(rowCount)
+
+	p.batchMu.Lock()
+	if len(p.batchInserts) < maxCachedBatchShapes {
+		p.batchInserts[rowCount] = query
+	}
+	p.batchMu.Unlock()
+	return query
+}
+
+// partialUpdate returns the UPDATE of the updatable columns present in updates
+// (unknown, primary key and auto-increment columns are skipped) and its
+// arguments. Shapes are looked up by a bitmask of ColumnOrder positions, so a
+// known set of columns builds no SQL text.
+func (p *entityPlan) partialUpdate(m *EntityMetadata, id int64, updates map[string]interface{}) (*columnShape, []interface{}, error) {
+	var inline [8]byte
+	mask := columnMask(inline[:], len(m.ColumnOrder))
+
+	count := 0
+	for i, colName := range m.ColumnOrder {
+		if _, exists := updates[colName]; exists && p.updatable[i] {
+			mask[i/8] |= 1 << (i % 8)
+			count++
+		}
+	}
+	if count == 0 {
+		return nil, nil, fmt.Errorf("no valid fields to update")
+	}
+
+	shape := p.shape(p.updateShapes, mask, func() *columnShape {
+		columns := maskedColumns(m.ColumnOrder, mask, count)
+		return &columnShape{
+			columns: columns,
+			sql:     m.BuildUpdateColumnsQuery(columns),
+			key:     "update_" + m.Name + "_" + strings.Join(columns, ","),
+		}
+	})
+
+	args := make([]interface{}, len(shape.columns)+1)
+	for i, colName := range shape.columns {
+		args[i] = updates[colName]
+	}
+	args[len(shape.columns)] = id
+	return shape, args, nil
+}
+
+// shape returns the shape cached in shapes for mask, compiling it with compile
+// on first use
+func (p *entityPlan) shape(shapes map[string]*columnShape, mask []byte, compile func() *columnShape) *columnShape {
+	p.shapeMu.Lock()
+	shape := shapes[string(mask)]
+	p.shapeMu.Unlock()
+	if shape != nil {
+		return shape
+	}
+
+	shape = compile()
+	p.shapeMu.Lock()
+	if len(shapes) < maxCachedColumnShapes {
+		shapes[string(mask)] = shape
+	}
+	p.shapeMu.Unlock()
+	return shape
+}
+
+// columnMask returns a zeroed bitmask for columnCount columns, in inline when it fits
+func columnMask(inline []byte, columnCount int) []byte {
+	size := (columnCount + 7) / 8
+	if size <= len(inline) {
+		return inline[:size]
+	}
+	return make([]byte, size)
+}
+
+// maskedColumns returns the count columns whose bit is set in mask
+func maskedColumns(columns []string, mask []byte, count int) []string {
+	selected := make([]string, 0, count)
+	for i, colName := range columns {
+		if mask[i/8]&(1<<(i%8)) != 0 {
+			selected = append(selected, colName)
+		}
+	}
+	return selected
+}
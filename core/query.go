@@ -0,0 +1,227 @@
+package core
+
+import (
+	"encoding/json"
+	"fmt"
+	"sort"
+	"strconv"
+	"strings"
+
+	"github.com/lib/pq"
+)
+
+// Condition est un prédicat WHERE : Column Op Value
+type Condition struct {
+	Column string      `json:"column"`
+	Op     string      `json:"op"`
+	Value  interface{} `json:"value"`
+}
+
+// OrderBy est un critère de tri
+type OrderBy struct {
+	Column string `json:"column"`
+	Desc   bool   `json:"desc"`
+}
+
+// Query décrit une lecture filtrée. Limit et Offset nil signifient "absent".
+type Query struct {
+	Where   []Condition `json:"where"`
+	OrderBy []OrderBy   `json:"order_by"`
+	Limit   *int64      `json:"limit"`
+	Offset  *int64      `json:"offset"`
+}
+
+// queryOperators associe chaque opérateur accepté à son SQL. Les listes (IN)
+// sont liées comme un seul tableau via ANY($n), donc la taille de la liste ne
+// change pas la forme de la requête.
+var queryOperators = map[string]string{
+	"=":           "%s = %s",
+	"!=":          "%s <> %s",
+	"<":           "%s < %s",
+	"<=":          "%s <= %s",
+	">":           "%s > %s",
+	">=":          "%s >= %s",
+	"LIKE":        "%s LIKE %s",
+	"ILIKE":       "%s ILIKE %s",
+	"IN":          "%s = ANY(%s)",
+	"NOT IN":      "NOT (%s = ANY(%s))",
+	"IS NULL":     "%s IS NULL",
+	"IS NOT NULL": "%s IS NOT NULL",
+}
+
+// ConditionsFromMap convertit des égalités colonne -> valeur en conditions
+// triées par colonne, pour que la même map produise toujours le même SQL
+func ConditionsFromMap(conditions map[string]interface{}) []Condition {
+	result := make([]Condition, 0, len(conditions))
+	for col, val := range conditions {
+		result = append(result, Condition{Column: col, Op: "=", Value: val})
+	}
+	sortConditions(result)
+	return result
+}
+
+// sortConditions met les conditions dans l'ordre canonique (colonne, opérateur)
+func sortConditions(conditions []Condition) {
+	sort.SliceStable(conditions, func(i, j int) bool {
+		if conditions[i].Column != conditions[j].Column {
+			return conditions[i].Column < conditions[j].Column
+		}
+		return conditions[i].Op < conditions[j].Op
+	})
+}
+
+// buildWhereClause compile les conditions en " WHERE ..." (vide sans condition).
+// Les conditions sont triées sur place dans l'ordre canonique et les
+// paramètres numérotés à partir de firstParam.
+func (m *EntityMetadata) buildWhereClause(conditions []Condition, firstParam int) (string, []interface{}, error) {
+	if len(conditions) == 0 {
+		return "", nil, nil
+	}
+	sortConditions(conditions)
+
+	var sb strings.Builder
+	var args []interface{}
+	param := firstParam
+
+	sb.WriteString(" WHERE ")
+	for i, cond := range conditions {
+		if _, exists := m.Columns[cond.Column]; !exists {
+			return "", nil, fmt.Errorf("column %s not found on table %s", cond.Column, m.TableName)
+		}
+
+		op := strings.ToUpper(strings.TrimSpace(cond.Op))
+		if op == "" {
+			op = "="
+		}
+		format, exists := queryOperators[op]
+		if !exists {
+			return "", nil, fmt.Errorf("unsupported operator %q", cond.Op)
+		}
+
+		if i > 0 {
+			sb.WriteString(" AND ")
+		}
+
+		switch op {
+		case "IS NULL", "IS NOT NULL":
+			fmt.Fprintf(&sb, format, cond.Column)
+		case "IN", "NOT IN":
+			values, ok := cond.Value.([]interface{})
+			if !ok {
+				return "", nil, fmt.Errorf("operator %s on %s expects a list", op, cond.Column)
+			}
+			fmt.Fprintf(&sb, format, cond.Column, "$"+strconv.Itoa(param))
+			args = append(args, pq.Array(values))
+			param++
+		default:
+			fmt.Fprintf(&sb, format, cond.Column, "$"+strconv.Itoa(param))
+			args = append(args, cond.Value)
+			param++
+		}
+	}
+
+	return sb.String(), args, nil
+}
+
+// BuildFindQuery compile une Query en SQL canonique et ses arguments.
+// Deux requêtes de même forme (colonnes, opérateurs, tri, présence de
+// LIMIT/OFFSET) produisent exactement le même texte SQL, quelle que soit
+// la valeur des paramètres.
+func (m *EntityMetadata) BuildFindQuery(q *Query) (string, []interface{}, error) {
+	where, args, err := m.buildWhereClause(q.Where, 1)
+	if err != nil {
+		return "", nil, err
+	}
+
+	var sb strings.Builder
+	sb.WriteString(m.plan().selectSQL)
+	sb.WriteString(where)
+
+	for i, order := range q.OrderBy {
+		if _, exists := m.Columns[order.Column]; !exists {
+			return "", nil, fmt.Errorf("column %s not found on table %s", order.Column, m.TableName)
+		}
+		if i == 0 {
+			sb.WriteString(" ORDER BY ")
+		} else {
+			sb.WriteString(", ")
+		}
+		sb.WriteString(order.Column)
+		if order.Desc {
+			sb.WriteString(" DESC")
+		}
+	}
+
+	param := len(args) + 1
+	if q.Limit != nil {
+		sb.WriteString(" LIMIT $" + strconv.Itoa(param))
+		args = append(args, *q.Limit)
+		param++
+	}
+	if q.Offset != nil {
+		sb.WriteString(" OFFSET $" + strconv.Itoa(param))
+		args = append(args, *q.Offset)
+	}
+
+	return sb.String(), args, nil
+}
+
+// BuildDeleteWhereQuery compile des conditions en DELETE canonique. Au moins une
+// condition est exigée pour qu'un filtre vide ne vide pas la table.
+func (m *EntityMetadata) BuildDeleteWhereQuery(conditions []Condition) (string, []interface{}, error) {
+	if len(conditions) == 0 {
+		return "", nil, fmt.Errorf("delete on table %s requires at least one condition", m.TableName)
+	}
+
+	where, args, err := m.buildWhereClause(conditions, 1)
+	if err != nil {
+		return "", nil, err
+	}
+	return "DELETE FROM " + m.TableName + where, args, nil
+}
+
+// FindQuery exécute une lecture filtrée. Chaque forme de requête est préparée
+// une seule fois; les appels suivants ne coûtent qu'un bind + execute.
+func (tm *TakeoManager) FindQuery(entityType string, q *Query) (*RowSet, error) {
+	metadata, exists := tm.registry.GetEntity(entityType)
+	if !exists {
+		return nil, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	if replica := tm.replicaOf(entityType); replica != nil {
+		if result, ok := replica.findQuery(q); ok {
+			return result, nil
+		}
+	}
+
+	query, args, err := metadata.BuildFindQuery(q)
+	if err != nil {
+		return nil, err
+	}
+
+	read := func() (*RowSet, error) {
+		// The canonical SQL text is the shape key
+		stmt, release, err := tm.db.GetOrCreatePreparedStmt(metadata.TableName, "query_"+query, query)
+		if err != nil {
+			return nil, err
+		}
+		defer release()
+
+		rows, err := stmt.Query(args...)
+		if err != nil {
+			return nil, err
+		}
+		defer rows.Close()
+
+		return scanRowSet(rows, metadata)
+	}
+
+	// Dans le cache de résultats, une requête est identifiée par sa forme et ses valeurs
+	return tm.cachedRead(metadata, func() string {
+		encodedArgs, err := json.Marshal(args)
+		if err != nil {
+			return ""
+		}
+		return query + "\x00" + string(encodedArgs)
+	}, read)
+}
@@ -0,0 +1,628 @@
+package core
+
+import (
+	"fmt"
+	"math"
+	"sort"
+	"strconv"
+	"strings"
+	"sync"
+	"time"
+)
+
+// replicaNull est la clé d'index d'une valeur NULL (PostgreSQL refuse le
+// caractère NUL dans un texte, donc aucune valeur réelle ne la produit)
+const replicaNull = "\x00"
+
+// replicaRow est une ligne répliquée : son ID, son tableau JSON (ordre
+// ColumnOrder) et le texte de chacune de ses colonnes indexées
+type replicaRow struct {
+	id      int64
+	encoded []byte
+	keys    []string
+}
+
+// replicaSnapshot est un état immuable de la table : une lecture n'en prend
+// qu'une référence et chaque rafraîchissement en construit un nouveau
+type replicaSnapshot struct {
+	rows      []replicaRow
+	byID      map[int64]int
+	indexes   []map[string][]int // un index par colonne indexée : valeur -> positions
+	watermark string             // plus grande valeur de refreshColumn lue ("" : aucune)
+}
+
+// replica garde en mémoire une petite table entière, avec des index par hachage
+// sur quelques colonnes. FindByID, FindByIDs, FindAll et les FindQuery
+// d'égalité sur des colonnes indexées sont servis sans requête. Une écriture
+// (locale, ou notifiée par EnableCacheSync) rend la copie obsolète : la lecture
+// suivante la rafraîchit, de façon synchrone. Avec refreshColumn, seules les
+// lignes où refreshColumn >= la plus grande valeur déjà lue sont relues (plus un
+// count(*) qui détecte les suppressions); sans, chaque lecture après une écriture
+// recharge toute la table, ce qui coûte cher sur une table souvent écrite. Avec
+// un intervalle, un goroutine la rafraîchit en plus de la même façon.
+type replica struct {
+	manager       *TakeoManager
+	metadata      *EntityMetadata
+	indexColumns  []string
+	indexPos      []int // positions dans ColumnOrder
+	pkPos         int
+	refreshColumn string
+	refreshPos    int
+
+	loadMu sync.Mutex // sérialise les chargements
+
+	mu        sync.Mutex
+	snapshot  *replicaSnapshot
+	staleGen  uint64 // incrémenté par chaque écriture
+	loadedGen uint64 // staleGen au début du dernier rafraîchissement
+
+	stop    chan struct{}
+	stopped chan struct{}
+}
+
+func newReplica(manager *TakeoManager, metadata *EntityMetadata, indexColumns []string, refreshColumn string) (*replica, error) {
+	r := &replica{
+		manager:       manager,
+		metadata:      metadata,
+		indexColumns:  indexColumns,
+		pkPos:         -1,
+		refreshColumn: refreshColumn,
+		refreshPos:    -1,
+		staleGen:      1,
+	}
+
+	kinds := metadata.plan().scanKinds
+	position := make(map[string]int, len(metadata.ColumnOrder))
+	for i, colName := range metadata.ColumnOrder {
+		position[colName] = i
+	}
+
+	pos, exists := position[metadata.PrimaryKey]
+	if !exists || kinds[pos] != KindInt64 {
+		return nil, fmt.Errorf("entity %s: replication needs an integer primary key", metadata.Name)
+	}
+	r.pkPos = pos
+
+	for _, colName := range indexColumns {
+		pos, exists := position[colName]
+		if !exists {
+			return nil, fmt.Errorf("column %s not found on table %s", colName, metadata.TableName)
+		}
+		// Only kinds whose driver text matches the JSON value sent by Python
+		switch kinds[pos] {
+		case KindInt64, KindBool, KindString:
+		default:
+			return nil, fmt.Errorf("column %s (%s) cannot be indexed in a replica", colName, kinds[pos])
+		}
+		r.indexPos = append(r.indexPos, pos)
+	}
+
+	if refreshColumn != "" {
+		pos, exists := position[refreshColumn]
+		if !exists {
+			return nil, fmt.Errorf("column %s not found on table %s", refreshColumn, metadata.TableName)
+		}
+		if kinds[pos] == KindObject || kinds[pos] == KindBytes {
+			return nil, fmt.Errorf("column %s (%s) cannot be used to refresh a replica", refreshColumn, kinds[pos])
+		}
+		r.refreshPos = pos
+	}
+
+	return r, nil
+}
+
+// markStale rend la copie obsolète : la prochaine lecture la rafraîchit
+func (r *replica) markStale() {
+	r.mu.Lock()
+	r.staleGen++
+	r.mu.Unlock()
+}
+
+// current retourne l'état de la table, rafraîchie si elle est obsolète
+func (r *replica) current() (*replicaSnapshot, error) {
+	r.mu.Lock()
+	snapshot, stale := r.snapshot, r.staleGen != r.loadedGen
+	r.mu.Unlock()
+	if !stale {
+		return snapshot, nil
+	}
+
+	if err := r.refresh(false); err != nil {
+		return nil, err
+	}
+
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	return r.snapshot, nil
+}
+
+// load recharge toute la table; sans force, seulement si elle est obsolète
+// (un autre appel a pu la recharger pendant l'attente du verrou)
+func (r *replica) load(force bool) error {
+	r.loadMu.Lock()
+	defer r.loadMu.Unlock()
+
+	_, generation, stale := r.state()
+	if !force && !stale {
+		return nil
+	}
+	return r.loadAll(generation)
+}
+
+// state retourne l'état courant, la génération d'écriture et si l'état est obsolète
+func (r *replica) state() (*replicaSnapshot, uint64, bool) {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+	return r.snapshot, r.staleGen, r.staleGen != r.loadedGen
+}
+
+// loadAll lit toute la table, loadMu tenu
+func (r *replica) loadAll(generation uint64) error {
+	plan := r.metadata.plan()
+	query := plan.selectSQL
+	if r.refreshColumn != "" {
+		query += " ORDER BY " + r.refreshColumn
+	}
+
+	snapshot, err := r.fetch("replica_"+r.metadata.Name, query, nil)
+	if err != nil {
+		return err
+	}
+
+	r.mu.Lock()
+	r.snapshot = snapshot
+	r.loadedGen = generation
+	r.mu.Unlock()
+	return nil
+}
+
+// refresh relit les lignes modifiées depuis le dernier chargement (refreshColumn
+// >= watermark), ou toute la table sans refreshColumn; sans force, seulement si
+// la copie est obsolète. Si le nombre de lignes ne correspond plus à count(*),
+// des lignes ont été supprimées : la table est alors rechargée entièrement.
+func (r *replica) refresh(force bool) error {
+	if r.refreshColumn == "" {
+		return r.load(force)
+	}
+
+	r.loadMu.Lock()
+	defer r.loadMu.Unlock()
+
+	base, generation, stale := r.state()
+	if !force && !stale {
+		return nil
+	}
+	if base == nil || base.watermark == "" {
+		return r.loadAll(generation)
+	}
+
+	query := r.metadata.plan().selectSQL + " WHERE " + r.refreshColumn + " >= $1 ORDER BY " + r.refreshColumn
+	snapshot, err := r.fetch("replica_since_"+r.metadata.Name, query, base, base.watermark)
+	if err != nil {
+		return err
+	}
+
+	// Counted after the changed rows: a row inserted in between only costs a full load
+	count, err := r.count()
+	if err != nil {
+		return err
+	}
+	if count != int64(len(snapshot.rows)) {
+		return r.loadAll(generation)
+	}
+
+	r.mu.Lock()
+	r.snapshot = snapshot
+	r.loadedGen = generation
+	r.mu.Unlock()
+	return nil
+}
+
+// count retourne le nombre de lignes de la table
+func (r *replica) count() (int64, error) {
+	stmt, release, err := r.manager.db.GetOrCreatePreparedStmt(
+		r.metadata.TableName, "replica_count_"+r.metadata.Name, "SELECT count(*) FROM "+r.metadata.TableName)
+	if err != nil {
+		return 0, err
+	}
+	defer release()
+
+	var count int64
+	err = stmt.QueryRow().Scan(&count)
+	return count, err
+}
+
+// fetch exécute query et applique ses lignes sur base (nil : table complète)
+func (r *replica) fetch(key, query string, base *replicaSnapshot, args ...interface{}) (*replicaSnapshot, error) {
+	stmt, release, err := r.manager.db.GetOrCreatePreparedStmt(r.metadata.TableName, key, query)
+	if err != nil {
+		return nil, err
+	}
+	defer release()
+
+	rows, err := stmt.Query(args...)
+	if err != nil {
+		return nil, err
+	}
+	defer rows.Close()
+
+	scanner := getRowScanner(r.metadata)
+	defer putRowScanner(scanner)
+
+	// Every row of one fetch is encoded into a single buffer
+	var buf []byte
+	var changed []replicaRow
+	var ends []int
+	watermark := ""
+	if base != nil {
+		watermark = base.watermark
+	}
+
+	for rows.Next() {
+		scanner.reset()
+		if err := rows.Scan(scanner.dests...); err != nil {
+			return nil, err
+		}
+
+		id, err := strconv.ParseInt(string(scanner.raw[r.pkPos]), 10, 64)
+		if err != nil {
+			return nil, fmt.Errorf("entity %s: invalid primary key %q", r.metadata.Name, scanner.raw[r.pkPos])
+		}
+
+		if buf, err = scanner.appendRow(buf); err != nil {
+			return nil, err
+		}
+		ends = append(ends, len(buf))
+
+		row := replicaRow{id: id, keys: make([]string, len(r.indexPos))}
+		for i, pos := range r.indexPos {
+			if raw := scanner.raw[pos]; raw != nil {
+				row.keys[i] = string(raw)
+			} else {
+				row.keys[i] = replicaNull
+			}
+		}
+		changed = append(changed, row)
+
+		// Rows are ordered by refreshColumn, NULLs last
+		if r.refreshPos >= 0 && scanner.raw[r.refreshPos] != nil {
+			watermark = string(scanner.raw[r.refreshPos])
+		}
+	}
+	if err := rows.Err(); err != nil {
+		return nil, err
+	}
+
+	start := 0
+	for i, end := range ends {
+		changed[i].encoded = buf[start:end:end]
+		start = end
+	}
+
+	return r.build(base, changed, watermark), nil
+}
+
+// build construit un nouvel état : les lignes de base, remplacées ou complétées
+// par changed, et leurs index
+func (r *replica) build(base *replicaSnapshot, changed []replicaRow, watermark string) *replicaSnapshot {
+	snapshot := &replicaSnapshot{watermark: watermark}
+	if base != nil {
+		snapshot.rows = make([]replicaRow, len(base.rows), len(base.rows)+len(changed))
+		copy(snapshot.rows, base.rows)
+	}
+
+	snapshot.byID = make(map[int64]int, len(snapshot.rows)+len(changed))
+	for i, row := range snapshot.rows {
+		snapshot.byID[row.id] = i
+	}
+	for _, row := range changed {
+		if i, exists := snapshot.byID[row.id]; exists {
+			snapshot.rows[i] = row
+			continue
+		}
+		snapshot.byID[row.id] = len(snapshot.rows)
+		snapshot.rows = append(snapshot.rows, row)
+	}
+
+	snapshot.indexes = make([]map[string][]int, len(r.indexPos))
+	for i := range snapshot.indexes {
+		index := make(map[string][]int)
+		for pos, row := range snapshot.rows {
+			index[row.keys[i]] = append(index[row.keys[i]], pos)
+		}
+		snapshot.indexes[i] = index
+	}
+	return snapshot
+}
+
+// rowSet encode les lignes aux positions données
+func (r *replica) rowSet(snapshot *replicaSnapshot, positions []int) *RowSet {
+	result := newRowSet(r.metadata, len(positions))
+	for _, pos := range positions {
+		result.appendEncoded(snapshot.rows[pos].encoded)
+	}
+	return result
+}
+
+// findByIDs retourne les lignes des IDs présents, dans l'ordre de ids
+func (r *replica) findByIDs(ids []int64) (*RowSet, bool) {
+	snapshot, err := r.current()
+	if err != nil {
+		return nil, false
+	}
+
+	positions := make([]int, 0, len(ids))
+	for _, id := range ids {
+		if pos, exists := snapshot.byID[id]; exists {
+			positions = append(positions, pos)
+		}
+	}
+	return r.rowSet(snapshot, positions), true
+}
+
+// replicaFilter est une condition d'égalité (= ou IN) sur la clé primaire
+// (column -1) ou sur une colonne indexée
+type replicaFilter struct {
+	column int
+	keys   []string
+}
+
+func (f *replicaFilter) matches(row *replicaRow) bool {
+	var value string
+	if f.column < 0 {
+		value = strconv.FormatInt(row.id, 10)
+	} else {
+		value = row.keys[f.column]
+	}
+	for _, key := range f.keys {
+		if key == value {
+			return true
+		}
+	}
+	return false
+}
+
+// findQuery sert q si toutes ses conditions sont des égalités (= ou IN) sur la
+// clé primaire ou des colonnes indexées, sans tri. ok est false sinon : la
+// requête passe alors par la base.
+func (r *replica) findQuery(q *Query) (result *RowSet, ok bool) {
+	if len(q.OrderBy) > 0 {
+		return nil, false
+	}
+
+	filters := make([]replicaFilter, 0, len(q.Where))
+	for _, cond := range q.Where {
+		filter, ok := r.filterFor(cond)
+		if !ok {
+			return nil, false
+		}
+		filters = append(filters, filter)
+	}
+
+	snapshot, err := r.current()
+	if err != nil {
+		return nil, false
+	}
+
+	var positions []int
+	if len(filters) == 0 {
+		positions = make([]int, len(snapshot.rows))
+		for i := range positions {
+			positions[i] = i
+		}
+	} else {
+		// Candidates come from the first filter's index, in load order
+		first := &filters[0]
+		for _, key := range first.keys {
+			if first.column < 0 {
+				id, _ := strconv.ParseInt(key, 10, 64)
+				if pos, exists := snapshot.byID[id]; exists {
+					positions = append(positions, pos)
+				}
+			} else {
+				positions = append(positions, snapshot.indexes[first.column][key]...)
+			}
+		}
+		if len(first.keys) > 1 {
+			positions = uniqueSorted(positions)
+		}
+
+		matched := positions[:0]
+		for _, pos := range positions {
+			row := &snapshot.rows[pos]
+			keep := true
+			for i := 1; i < len(filters) && keep; i++ {
+				keep = filters[i].matches(row)
+			}
+			if keep {
+				matched = append(matched, pos)
+			}
+		}
+		positions = matched
+	}
+
+	if q.Offset != nil && *q.Offset > 0 {
+		if *q.Offset >= int64(len(positions)) {
+			positions = nil
+		} else {
+			positions = positions[*q.Offset:]
+		}
+	}
+	if q.Limit != nil && *q.Limit >= 0 && *q.Limit < int64(len(positions)) {
+		positions = positions[:*q.Limit]
+	}
+
+	return r.rowSet(snapshot, positions), true
+}
+
+// filterFor traduit une condition en replicaFilter si la copie peut la servir
+func (r *replica) filterFor(cond Condition) (replicaFilter, bool) {
+	filter := replicaFilter{column: -1}
+	if cond.Column != r.metadata.PrimaryKey {
+		for i, colName := range r.indexColumns {
+			if colName == cond.Column {
+				filter.column = i
+			}
+		}
+		if filter.column < 0 {
+			return filter, false
+		}
+	}
+
+	var values []interface{}
+	switch strings.ToUpper(strings.TrimSpace(cond.Op)) {
+	case "", "=":
+		values = []interface{}{cond.Value}
+	case "IN":
+		list, ok := cond.Value.([]interface{})
+		if !ok {
+			return filter, false
+		}
+		values = list
+	default:
+		return filter, false
+	}
+
+	filter.keys = make([]string, 0, len(values))
+	for _, value := range values {
+		key, ok := replicaKey(value)
+		if !ok {
+			return filter, false
+		}
+		if filter.column < 0 {
+			// Primary key values must be integers, as in the database
+			if _, err := strconv.ParseInt(key, 10, 64); err != nil {
+				return filter, false
+			}
+		}
+		filter.keys = append(filter.keys, key)
+	}
+	return filter, true
+}
+
+// replicaKey retourne le texte que le driver produit pour value dans une colonne
+// entière, booléenne ou texte. NULL et les autres types ne sont pas servis.
+func replicaKey(value interface{}) (string, bool) {
+	switch v := value.(type) {
+	case string:
+		return v, true
+	case bool:
+		return strconv.FormatBool(v), true
+	case float64:
+		if v == math.Trunc(v) && math.Abs(v) < 1<<53 {
+			return strconv.FormatInt(int64(v), 10), true
+		}
+		return strconv.FormatFloat(v, 'g', -1, 64), true
+	case int:
+		return strconv.Itoa(v), true
+	case int64:
+		return strconv.FormatInt(v, 10), true
+	}
+	return "", false
+}
+
+// uniqueSorted trie positions et en retire les doublons
+func uniqueSorted(positions []int) []int {
+	sort.Ints(positions)
+	unique := positions[:0]
+	for i, pos := range positions {
+		if i == 0 || pos != positions[i-1] {
+			unique = append(unique, pos)
+		}
+	}
+	return unique
+}
+
+// run rafraîchit la copie toutes les interval jusqu'à stopRefresh
+func (r *replica) run(interval time.Duration) {
+	defer close(r.stopped)
+
+	ticker := time.NewTicker(interval)
+	defer ticker.Stop()
+
+	for {
+		select {
+		case <-ticker.C:
+			// On failure the previous state is kept and the next tick retries
+			r.refresh(true)
+		case <-r.stop:
+			return
+		}
+	}
+}
+
+// startRefresh lance le rafraîchissement périodique
+func (r *replica) startRefresh(interval time.Duration) {
+	r.stop = make(chan struct{})
+	r.stopped = make(chan struct{})
+	go r.run(interval)
+}
+
+// stopRefresh arrête le rafraîchissement périodique s'il est actif
+func (r *replica) stopRefresh() {
+	if r.stop == nil {
+		return
+	}
+	close(r.stop)
+	<-r.stopped
+}
+
+// Replicate charge toute la table d'une entité en mémoire et construit un index
+// par hachage sur chaque colonne de indexColumns (entières, booléennes ou texte).
+// FindByID, FindByIDs, FindAll et les FindQuery d'égalité (= ou IN) sur la clé
+// primaire ou ces colonnes sont ensuite servis sans requête. Les écritures faites
+// par ce manager (ou notifiées via EnableCacheSync) rafraîchissent la table à la
+// lecture suivante, comme le fait aussi un intervalle > 0 périodiquement :
+// seulement les lignes où refreshColumn >= la plus grande valeur lue si
+// refreshColumn est fourni (par exemple updated_at), entièrement sinon. Sans
+// refreshColumn, chaque écriture coûte donc un rechargement complet.
+func (tm *TakeoManager) Replicate(entityType string, indexColumns []string, refreshColumn string, interval time.Duration) error {
+	metadata, exists := tm.registry.GetEntity(entityType)
+	if !exists {
+		return fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	r, err := newReplica(tm, metadata, indexColumns, refreshColumn)
+	if err != nil {
+		return err
+	}
+	if err := r.load(true); err != nil {
+		return err
+	}
+	if interval > 0 {
+		r.startRefresh(interval)
+	}
+
+	tm.replicasMu.Lock()
+	if tm.replicas == nil {
+		tm.replicas = make(map[string]*replica)
+	}
+	previous := tm.replicas[entityType]
+	tm.replicas[entityType] = r
+	tm.replicasMu.Unlock()
+
+	if previous != nil {
+		previous.stopRefresh()
+	}
+	return nil
+}
+
+// Unreplicate retire la copie en mémoire d'une entité; ses lectures repassent
+// par la base
+func (tm *TakeoManager) Unreplicate(entityType string) {
+	tm.replicasMu.Lock()
+	r := tm.replicas[entityType]
+	delete(tm.replicas, entityType)
+	tm.replicasMu.Unlock()
+
+	if r != nil {
+		r.stopRefresh()
+	}
+}
+
+// replicaOf retourne la copie en mémoire d'une entité, ou nil
+func (tm *TakeoManager) replicaOf(entityType string) *replica {
+	tm.replicasMu.RLock()
+	defer tm.replicasMu.RUnlock()
+	return tm.replicas[entityType]
+}
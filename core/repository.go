@@ -52,7 +52,7 @@ func (r *Repository) FindByID(entityType reflect.Type, id interface{}, result in
 	}
 
 	query := metadata.BuildSelectQuery() + " WHERE " + metadata.PrimaryKey + " = $1"
-	
+
 	row := r.db.conn.QueryRow(query, id)
 	return r.scanRowToEntity(row, result, metadata)
 }
@@ -69,7 +69,7 @@ func (r *Repository) FindAll(entityType reflect.Type, results interface{}) error
 	}
 
 	query := metadata.BuildSelectQuery()
-	
+
 	rows, err := r.db.conn.Query(query)
 	if err != nil {
 		return err
@@ -117,7 +117,7 @@ func (r *Repository) Delete(entityType reflect.Type, id interface{}) error {
 // extractValues extracts field values from an entity based on metadata
 func (r *Repository) extractValues(entity interface{}, metadata *EntityMetadata, includePrimaryKey bool) []interface{} {
 	var values []interface{}
-	
+
 	entityValue := reflect.ValueOf(entity)
 	if entityValue.Kind() == reflect.Ptr {
 		entityValue = entityValue.Elem()
@@ -173,7 +173,7 @@ func (r *Repository) findFieldNameByColumn(entityType reflect.Type, columnName s
 		if dbTag == columnName {
 			return field.Name
 		}
-		
+
 		// If no db tag, use lowercase field name
 		if dbTag == "" && strings.ToLower(field.Name) == columnName {
 			return field.Name
@@ -221,7 +221,7 @@ func (r *Repository) scanRowsToEntities(rows *sql.Rows, results interface{}, met
 	for rows.Next() {
 		// Create new instance
 		newElem := reflect.New(elemType).Elem()
-		
+
 		// Prepare scan destinations
 		scanDests := make([]interface{}, len(metadata.ColumnOrder))
 		for i, colName := range metadata.ColumnOrder {
@@ -243,4 +243,4 @@ func (r *Repository) scanRowsToEntities(rows *sql.Rows, results interface{}, met
 	}
 
 	return rows.Err()
-}
\ No newline at end of file
+}
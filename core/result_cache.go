@@ -0,0 +1,239 @@
+package core
+
+import (
+	"container/list"
+	"sync"
+	"time"
+)
+
+// DefaultResultCacheBytes is the default byte budget of the result cache
+const DefaultResultCacheBytes = 64 << 20
+
+// ResultCacheStats reports result cache usage
+type ResultCacheStats struct {
+	Entries       int    `json:"entries"`
+	Bytes         int64  `json:"bytes"`
+	Capacity      int64  `json:"capacity"`
+	Hits          uint64 `json:"hits"`
+	Misses        uint64 `json:"misses"`
+	Evictions     uint64 `json:"evictions"`
+	Expirations   uint64 `json:"expirations"`
+	Invalidations uint64 `json:"invalidations"`
+}
+
+// resultEntry is an encoded RowSet document cached for one entity
+type resultEntry struct {
+	entity  string
+	key     string
+	doc     []byte
+	rows    int
+	expires time.Time
+}
+
+func (e *resultEntry) size() int64 {
+	return int64(len(e.doc) + len(e.key))
+}
+
+// cachedEntity is the cache state of one entity opted in with CacheEntity
+type cachedEntity struct {
+	ttl time.Duration
+	// generation is bumped by every write: a read that missed before the write
+	// cannot store its (possibly stale) result afterwards
+	generation uint64
+	items      map[string]*list.Element
+}
+
+// resultCache is a second-level cache of encoded read results (FindByID,
+// FindByIDs, FindAll and FindQuery shapes) for the entities that opted in. It is
+// an LRU bounded by the total size of the cached documents, with a TTL per
+// entity, and is invalidated per entity by every write.
+type resultCache struct {
+	mu            sync.Mutex
+	capacity      int64
+	size          int64
+	order         *list.List // front = most recently used
+	entities      map[string]*cachedEntity
+	hits          uint64
+	misses        uint64
+	evictions     uint64
+	expirations   uint64
+	invalidations uint64
+}
+
+func newResultCache(capacity int64) *resultCache {
+	if capacity <= 0 {
+		capacity = DefaultResultCacheBytes
+	}
+	return &resultCache{
+		capacity: capacity,
+		order:    list.New(),
+		entities: make(map[string]*cachedEntity),
+	}
+}
+
+// configure enables caching for entity with ttl, or disables it when ttl <= 0
+func (c *resultCache) configure(entity string, ttl time.Duration) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	state, exists := c.entities[entity]
+	if ttl <= 0 {
+		if exists {
+			c.dropLocked(state)
+			delete(c.entities, entity)
+		}
+		return
+	}
+	if !exists {
+		state = &cachedEntity{items: make(map[string]*list.Element)}
+		c.entities[entity] = state
+	}
+	state.ttl = ttl
+}
+
+// enabled reports whether entity results are cached (false on a nil cache)
+func (c *resultCache) enabled(entity string) bool {
+	if c == nil {
+		return false
+	}
+	c.mu.Lock()
+	_, exists := c.entities[entity]
+	c.mu.Unlock()
+	return exists
+}
+
+// get returns the cached document for key. On a miss, generation must be passed
+// back to put with the result.
+func (c *resultCache) get(entity, key string) (doc []byte, rows int, generation uint64, hit bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	state, exists := c.entities[entity]
+	if !exists {
+		return nil, 0, 0, false
+	}
+
+	if elem, exists := state.items[key]; exists {
+		entry := elem.Value.(*resultEntry)
+		if time.Now().Before(entry.expires) {
+			c.hits++
+			c.order.MoveToFront(elem)
+			return entry.doc, entry.rows, state.generation, true
+		}
+		c.removeLocked(elem)
+		c.expirations++
+	}
+
+	c.misses++
+	return nil, 0, state.generation, false
+}
+
+// put caches doc unless entity was written (or reconfigured) since the miss
+func (c *resultCache) put(entity, key string, generation uint64, doc []byte, rows int) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	state, exists := c.entities[entity]
+	if !exists || state.generation != generation {
+		return
+	}
+
+	entry := &resultEntry{
+		entity:  entity,
+		key:     key,
+		doc:     append([]byte(nil), doc...),
+		rows:    rows,
+		expires: time.Now().Add(state.ttl),
+	}
+	if entry.size() > c.capacity {
+		return
+	}
+
+	if elem, exists := state.items[key]; exists {
+		c.removeLocked(elem)
+	}
+	state.items[key] = c.order.PushFront(entry)
+	c.size += entry.size()
+
+	for c.size > c.capacity {
+		c.removeLocked(c.order.Back())
+		c.evictions++
+	}
+}
+
+// invalidate drops every cached result of entity
+func (c *resultCache) invalidate(entity string) {
+	if c == nil {
+		return
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	if state, exists := c.entities[entity]; exists {
+		c.dropLocked(state)
+		c.invalidations++
+	}
+}
+
+// invalidateAll drops every cached result
+func (c *resultCache) invalidateAll() {
+	if c == nil {
+		return
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	for _, state := range c.entities {
+		c.dropLocked(state)
+		c.invalidations++
+	}
+}
+
+// dropLocked removes every entry of state and bumps its generation
+func (c *resultCache) dropLocked(state *cachedEntity) {
+	state.generation++
+	for _, elem := range state.items {
+		c.removeLocked(elem)
+	}
+}
+
+func (c *resultCache) removeLocked(elem *list.Element) {
+	entry := c.order.Remove(elem).(*resultEntry)
+	delete(c.entities[entry.entity].items, entry.key)
+	c.size -= entry.size()
+}
+
+// resize changes the byte budget, evicting entries if needed
+func (c *resultCache) resize(capacity int64) {
+	if capacity <= 0 {
+		capacity = DefaultResultCacheBytes
+	}
+
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	c.capacity = capacity
+	for c.size > c.capacity {
+		c.removeLocked(c.order.Back())
+		c.evictions++
+	}
+}
+
+// stats returns a snapshot of the cache counters
+func (c *resultCache) stats() ResultCacheStats {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	return ResultCacheStats{
+		Entries:       c.order.Len(),
+		Bytes:         c.size,
+		Capacity:      c.capacity,
+		Hits:          c.hits,
+		Misses:        c.misses,
+		Evictions:     c.evictions,
+		Expirations:   c.expirations,
+		Invalidations: c.invalidations,
+	}
+}
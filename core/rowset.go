@@ -0,0 +1,362 @@
+package core
+
+import (
+	"database/sql"
+	"encoding/base64"
+	"encoding/json"
+	"sync"
+	"unicode/utf8"
+)
+
+// RowSet est le format de résultat positionnel envoyé à Python : la liste des
+// colonnes une seule fois, puis chaque ligne comme tableau dans cet ordre.
+// Les lignes sont encodées en JSON au fil du scan, directement dans le document
+// final : {"columns": [...], "rows": [[...], ...]}.
+type RowSet struct {
+	Columns []string
+	buf     []byte
+	count   int
+	start   int    // début des lignes dans buf (après l'en-tête)
+	doc     []byte // document déjà complet (cache de résultats), prioritaire sur buf
+}
+
+// newRowSet crée un RowSet vide pour une entité (colonnes dans ColumnOrder);
+// capacity est le nombre de lignes attendu
+func newRowSet(metadata *EntityMetadata, capacity int) *RowSet {
+	header := metadata.plan().rowSetHeader
+	buf := make([]byte, 0, len(header)+2+capacity*16*len(metadata.ColumnOrder))
+	buf = append(buf, header...)
+
+	return &RowSet{Columns: metadata.ColumnOrder, buf: buf, start: len(header)}
+}
+
+// Len retourne le nombre de lignes
+func (rs *RowSet) Len() int {
+	return rs.count
+}
+
+// JSON retourne le document JSON complet (sans copie : le RowSet ne doit plus
+// recevoir de lignes ensuite)
+func (rs *RowSet) JSON() []byte {
+	if rs.doc != nil {
+		return rs.doc
+	}
+	return append(rs.buf, ']', '}')
+}
+
+// MarshalJSON implémente json.Marshaler
+func (rs *RowSet) MarshalJSON() ([]byte, error) {
+	return rs.JSON(), nil
+}
+
+// appendValues ajoute une ligne de valeurs Go quelconques (encodées par encoding/json)
+func (rs *RowSet) appendValues(values []interface{}) error {
+	rs.startRow()
+	for i, value := range values {
+		if i > 0 {
+			rs.buf = append(rs.buf, ',')
+		}
+		encoded, err := json.Marshal(value)
+		if err != nil {
+			return err
+		}
+		rs.buf = append(rs.buf, encoded...)
+	}
+	rs.buf = append(rs.buf, ']')
+	return nil
+}
+
+func (rs *RowSet) startRow() {
+	if rs.count > 0 {
+		rs.buf = append(rs.buf, ',')
+	}
+	rs.buf = append(rs.buf, '[')
+	rs.count++
+}
+
+// scan ajoute au plus limit lignes de rows (limit <= 0 : toutes). Les colonnes
+// doivent être dans l'ordre ColumnOrder de metadata.
+func (rs *RowSet) scan(rows *sql.Rows, metadata *EntityMetadata, limit int) error {
+	scanner := getRowScanner(metadata)
+	defer putRowScanner(scanner)
+
+	for (limit <= 0 || rs.count < limit) && rows.Next() {
+		scanner.reset()
+		if err := rows.Scan(scanner.dests...); err != nil {
+			return err
+		}
+		if err := rs.appendScanned(scanner); err != nil {
+			return err
+		}
+	}
+	return rows.Err()
+}
+
+// scanRowSet lit toutes les lignes restantes dans un RowSet
+func scanRowSet(rows *sql.Rows, metadata *EntityMetadata) (*RowSet, error) {
+	result := newRowSet(metadata, 0)
+	if err := result.scan(rows, metadata, 0); err != nil {
+		return nil, err
+	}
+	return result, nil
+}
+
+// appendScanned ajoute la ligne que scanner vient de lire
+func (rs *RowSet) appendScanned(scanner *rowScanner) error {
+	if rs.count > 0 {
+		rs.buf = append(rs.buf, ',')
+	}
+	rs.count++
+
+	var err error
+	rs.buf, err = scanner.appendRow(rs.buf)
+	return err
+}
+
+// appendEncoded ajoute une ligne déjà encodée en tableau JSON
+func (rs *RowSet) appendEncoded(row []byte) {
+	if rs.count > 0 {
+		rs.buf = append(rs.buf, ',')
+	}
+	rs.count++
+	rs.buf = append(rs.buf, row...)
+}
+
+// appendRowSet ajoute les lignes de other (même entité, construit par newRowSet)
+func (rs *RowSet) appendRowSet(other *RowSet) {
+	if other.count == 0 {
+		return
+	}
+	if rs.count > 0 {
+		rs.buf = append(rs.buf, ',')
+	}
+	rs.count += other.count
+	rs.buf = append(rs.buf, other.buf[other.start:]...)
+}
+
+// appendRow encode en tableau JSON la ligne que scanner vient de lire, colonne
+// par colonne selon son ColumnKind
+func (scanner *rowScanner) appendRow(dst []byte) ([]byte, error) {
+	dst = append(dst, '[')
+	for i, kind := range scanner.kinds {
+		if i > 0 {
+			dst = append(dst, ',')
+		}
+
+		if kind == KindObject {
+			encoded, err := json.Marshal(scanner.values[i])
+			if err != nil {
+				return dst, err
+			}
+			dst = append(dst, encoded...)
+			continue
+		}
+
+		raw := scanner.raw[i]
+		if raw == nil {
+			dst = append(dst, "null"...)
+			continue
+		}
+
+		switch kind {
+		case KindInt64, KindFloat64, KindBool:
+			// The driver's text form is already JSON, except NaN/Infinity and
+			// columns whose declared type does not match the database
+			if isJSONScalar(raw) {
+				dst = append(dst, raw...)
+			} else {
+				dst = appendJSONString(dst, raw)
+			}
+		case KindBytes:
+			dst = appendBase64(dst, raw)
+		case KindDecimal:
+			// Exact text: a JSON number would be parsed as a float in Python
+			dst = appendJSONString(dst, raw)
+		default:
+			dst = appendJSONString(dst, raw)
+		}
+	}
+	return append(dst, ']'), nil
+}
+
+// rowScanner contient les destinations de rows.Scan pour une entité : un
+// sql.RawBytes par colonne typée (réutilisé d'une ligne à l'autre, sans
+// interface{} par valeur), un interface{} pour les colonnes KindObject
+type rowScanner struct {
+	kinds  []ColumnKind
+	raw    []sql.RawBytes
+	values []interface{}
+	dests  []interface{}
+}
+
+// emptyRawBytes est non nil : une chaîne vide scannée dedans reste non nil,
+// alors qu'un NULL remet la destination à nil
+var emptyRawBytes = sql.RawBytes{}
+
+var rowScannerPool = sync.Pool{
+	New: func() interface{} { return &rowScanner{} },
+}
+
+// getRowScanner prend un scanner dans le pool et le prépare pour metadata
+func getRowScanner(metadata *EntityMetadata) *rowScanner {
+	scanner := rowScannerPool.Get().(*rowScanner)
+
+	n := len(metadata.ColumnOrder)
+	if cap(scanner.dests) < n {
+		scanner.raw = make([]sql.RawBytes, n)
+		scanner.values = make([]interface{}, n)
+		scanner.dests = make([]interface{}, n)
+	}
+	scanner.kinds = metadata.plan().scanKinds
+	scanner.raw = scanner.raw[:n]
+	scanner.values = scanner.values[:n]
+	scanner.dests = scanner.dests[:n]
+
+	for i, kind := range scanner.kinds {
+		if kind == KindObject {
+			scanner.dests[i] = &scanner.values[i]
+		} else {
+			scanner.dests[i] = &scanner.raw[i]
+		}
+	}
+	return scanner
+}
+
+// reset prépare les destinations avant rows.Scan. Chaque RawBytes garde son
+// buffer d'une ligne à l'autre : une colonne reçoit toujours le même type Go du
+// driver, donc un buffer qui pointe dans la mémoire du driver n'est jamais
+// réécrit, seulement remplacé.
+func (scanner *rowScanner) reset() {
+	for i, raw := range scanner.raw {
+		if raw == nil {
+			scanner.raw[i] = emptyRawBytes
+		}
+	}
+}
+
+// putRowScanner rend un scanner au pool. Les RawBytes peuvent pointer dans la
+// mémoire du driver : ils ne survivent pas à la requête.
+func putRowScanner(scanner *rowScanner) {
+	for i := range scanner.raw {
+		scanner.raw[i] = nil
+		scanner.values[i] = nil
+	}
+	rowScannerPool.Put(scanner)
+}
+
+// isJSONScalar indique si b est un nombre JSON, true ou false
+func isJSONScalar(b []byte) bool {
+	switch string(b) {
+	case "true", "false":
+		return true
+	}
+
+	i := 0
+	if i < len(b) && b[i] == '-' {
+		i++
+	}
+	if i >= len(b) {
+		return false
+	}
+	if b[i] == '0' {
+		i++
+	} else if b[i] >= '1' && b[i] <= '9' {
+		for i < len(b) && b[i] >= '0' && b[i] <= '9' {
+			i++
+		}
+	} else {
+		return false
+	}
+	if i < len(b) && b[i] == '.' {
+		i++
+		start := i
+		for i < len(b) && b[i] >= '0' && b[i] <= '9' {
+			i++
+		}
+		if i == start {
+			return false
+		}
+	}
+	if i < len(b) && (b[i] == 'e' || b[i] == 'E') {
+		i++
+		if i < len(b) && (b[i] == '+' || b[i] == '-') {
+			i++
+		}
+		start := i
+		for i < len(b) && b[i] >= '0' && b[i] <= '9' {
+			i++
+		}
+		if i == start {
+			return false
+		}
+	}
+	return i == len(b)
+}
+
+const hexDigits = "0123456789abcdef"
+
+// appendJSONString ajoute b en chaîne JSON (UTF-8 invalide remplacé par U+FFFD,
+// comme encoding/json)
+func appendJSONString(dst, b []byte) []byte {
+	dst = append(dst, '"')
+	start := 0
+	for i := 0; i < len(b); {
+		if c := b[i]; c < utf8.RuneSelf {
+			if c >= 0x20 && c != '"' && c != '\\' {
+				i++
+				continue
+			}
+			dst = append(dst, b[start:i]...)
+			switch c {
+			case '"', '\\':
+				dst = append(dst, '\\', c)
+			case '\n':
+				dst = append(dst, '\\', 'n')
+			case '\r':
+				dst = append(dst, '\\', 'r')
+			case '\t':
+				dst = append(dst, '\\', 't')
+			default:
+				dst = append(dst, '\\', 'u', '0', '0', hexDigits[c>>4], hexDigits[c&0xF])
+			}
+			i++
+			start = i
+			continue
+		}
+
+		r, size := utf8.DecodeRune(b[i:])
+		if r == utf8.RuneError && size == 1 {
+			dst = append(dst, b[start:i]...)
+			dst = append(dst, "\ufffd"...)
+			i += size
+			start = i
+			continue
+		}
+		// U+2028 and U+2029 are valid JSON but escaped by encoding/json; keep the same output
+		if r == '\u2028' || r == '\u2029' {
+			dst = append(dst, b[start:i]...)
+			dst = append(dst, '\\', 'u', '2', '0', '2', hexDigits[r&0xF])
+			i += size
+			start = i
+			continue
+		}
+		i += size
+	}
+	dst = append(dst, b[start:]...)
+	return append(dst, '"')
+}
+
+// appendBase64 ajoute b en chaîne JSON base64 (format de encoding/json pour []byte)
+func appendBase64(dst, b []byte) []byte {
+	dst = append(dst, '"')
+	n := len(dst)
+	size := base64.StdEncoding.EncodedLen(len(b))
+	if cap(dst)-n < size+1 {
+		grown := make([]byte, n, 2*cap(dst)+size+1)
+		copy(grown, dst)
+		dst = grown
+	}
+	dst = dst[:n+size]
+	base64.StdEncoding.Encode(dst[n:], b)
+	return append(dst, '"')
+}
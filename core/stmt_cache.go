@@ -0,0 +1,211 @@
+package core
+
+import (
+	"container/list"
+	"database/sql"
+	"sync"
+)
+
+// DefaultStmtCacheSize is the default number of prepared statements kept per DB
+const DefaultStmtCacheSize = 256
+
+// StmtCacheStats reports prepared statement cache usage
+type StmtCacheStats struct {
+	Size      int    `json:"size"`
+	Capacity  int    `json:"capacity"`
+	Hits      uint64 `json:"hits"`
+	Misses    uint64 `json:"misses"`
+	Evictions uint64 `json:"evictions"`
+}
+
+// stmtEntry is a cached statement and the table it reads or writes. refs counts
+// the callers between get/add and release: a statement dropped from the cache
+// while pinned is only closed by its last release.
+type stmtEntry struct {
+	key     string
+	table   string
+	stmt    *sql.Stmt
+	refs    int
+	removed bool
+	closed  bool
+}
+
+// stmtCache is a size-bounded LRU of prepared statements. Evicted statements
+// are closed once no caller uses them, which releases their server-side plans
+// on every pooled connection.
+type stmtCache struct {
+	mu        sync.Mutex
+	capacity  int
+	order     *list.List // front = most recently used
+	items     map[string]*list.Element
+	hits      uint64
+	misses    uint64
+	evictions uint64
+}
+
+func newStmtCache(capacity int) *stmtCache {
+	if capacity <= 0 {
+		capacity = DefaultStmtCacheSize
+	}
+	return &stmtCache{
+		capacity: capacity,
+		order:    list.New(),
+		items:    make(map[string]*list.Element),
+	}
+}
+
+// get returns a cached statement, pinned until release, and marks it as
+// recently used
+func (c *stmtCache) get(key string) (*stmtEntry, bool) {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	elem, exists := c.items[key]
+	if !exists {
+		c.misses++
+		return nil, false
+	}
+	c.hits++
+	c.order.MoveToFront(elem)
+	entry := elem.Value.(*stmtEntry)
+	entry.refs++
+	return entry, true
+}
+
+// add caches a statement and returns it pinned until release. If another caller
+// cached the same key first, stmt is closed and the cached one is returned instead.
+func (c *stmtCache) add(table, key string, stmt *sql.Stmt) *stmtEntry {
+	c.mu.Lock()
+	if elem, exists := c.items[key]; exists {
+		c.order.MoveToFront(elem)
+		cached := elem.Value.(*stmtEntry)
+		cached.refs++
+		c.mu.Unlock()
+		if stmt != nil {
+			stmt.Close()
+		}
+		return cached
+	}
+
+	entry := &stmtEntry{key: key, table: table, stmt: stmt, refs: 1}
+	c.items[key] = c.order.PushFront(entry)
+	evicted := c.evictLocked()
+	c.mu.Unlock()
+
+	closeEntries(evicted)
+	return entry
+}
+
+// release unpins a statement returned by get or add, and closes it if it was
+// dropped from the cache in the meantime
+func (c *stmtCache) release(entry *stmtEntry) {
+	c.mu.Lock()
+	entry.refs--
+	closeNow := entry.refs == 0 && entry.removed && !entry.closed
+	if closeNow {
+		entry.closed = true
+	}
+	c.mu.Unlock()
+
+	if closeNow {
+		closeEntries([]*stmtEntry{entry})
+	}
+}
+
+// removeLocked drops elem from the cache; callers hold mu. It returns the entry
+// if it must be closed now, or nil if a caller still uses it.
+func (c *stmtCache) removeLocked(elem *list.Element) *stmtEntry {
+	entry := c.order.Remove(elem).(*stmtEntry)
+	delete(c.items, entry.key)
+	entry.removed = true
+	if entry.refs > 0 {
+		return nil
+	}
+	entry.closed = true
+	return entry
+}
+
+// evictLocked drops least recently used entries above capacity; callers hold mu
+// and close the returned entries once the lock is released
+func (c *stmtCache) evictLocked() []*stmtEntry {
+	var evicted []*stmtEntry
+	for c.order.Len() > c.capacity {
+		if entry := c.removeLocked(c.order.Back()); entry != nil {
+			evicted = append(evicted, entry)
+		}
+		c.evictions++
+	}
+	return evicted
+}
+
+// resize changes the capacity, evicting entries if needed
+func (c *stmtCache) resize(capacity int) {
+	if capacity <= 0 {
+		capacity = DefaultStmtCacheSize
+	}
+
+	c.mu.Lock()
+	c.capacity = capacity
+	evicted := c.evictLocked()
+	c.mu.Unlock()
+
+	closeEntries(evicted)
+}
+
+// invalidateTable drops and closes every statement bound to table
+func (c *stmtCache) invalidateTable(table string) {
+	var removed []*stmtEntry
+
+	c.mu.Lock()
+	for elem := c.order.Front(); elem != nil; {
+		next := elem.Next()
+		if elem.Value.(*stmtEntry).table == table {
+			if entry := c.removeLocked(elem); entry != nil {
+				removed = append(removed, entry)
+			}
+		}
+		elem = next
+	}
+	c.mu.Unlock()
+
+	closeEntries(removed)
+}
+
+// closeAll drops and closes every cached statement
+func (c *stmtCache) closeAll() {
+	var removed []*stmtEntry
+
+	c.mu.Lock()
+	for c.order.Len() > 0 {
+		if entry := c.removeLocked(c.order.Front()); entry != nil {
+			removed = append(removed, entry)
+		}
+	}
+	c.mu.Unlock()
+
+	closeEntries(removed)
+}
+
+// stats returns a snapshot of the cache counters
+func (c *stmtCache) stats() StmtCacheStats {
+	c.mu.Lock()
+	defer c.mu.Unlock()
+
+	return StmtCacheStats{
+		Size:      c.order.Len(),
+		Capacity:  c.capacity,
+		Hits:      c.hits,
+		Misses:    c.misses,
+		Evictions: c.evictions,
+	}
+}
+
+// closeEntries closes statements outside the cache lock. database/sql defers
+// the actual close until rows already returned by the statement are closed.
+func closeEntries(entries []*stmtEntry) {
+	for _, entry := range entries {
+		if entry.stmt != nil {
+			entry.stmt.Close()
+		}
+	}
+}
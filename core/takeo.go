@@ -88,7 +88,7 @@ func (orm *TakeoORM) RegisterEntityByName(
 	// Create a dummy type for registration
 	dummyType := reflect.TypeOf(struct{}{})
 	orm.registry.RegisterEntity(dummyType, tableName, metadata)
-	orm.registry.entities[typeName] = metadata
+	orm.registry.RegisterEntityByName(typeName, metadata)
 }
 
 // CreateEntity creates a new entity record
@@ -151,7 +151,7 @@ func (orm *TakeoORM) CreateEntitiesBatch(typeName string, entitiesData []map[str
 				}
 			}
 		}
-		
+
 		if _, err := stmt.Exec(queryValues...); err != nil {
 			return err
 		}
@@ -168,12 +168,12 @@ func (orm *TakeoORM) FindEntityByID(typeName string, id interface{}) (map[string
 	}
 
 	query := metadata.BuildSelectQuery() + " WHERE " + metadata.PrimaryKey + " = $1"
-	
+
 	row := orm.db.conn.QueryRow(query, id)
-	
+
 	result := make(map[string]interface{})
 	scanDests := make([]interface{}, len(metadata.ColumnOrder))
-	
+
 	for i := range metadata.ColumnOrder {
 		var value interface{}
 		scanDests[i] = &value
@@ -198,7 +198,7 @@ func (orm *TakeoORM) FindAllEntities(typeName string) ([]map[string]interface{},
 	}
 
 	query := metadata.BuildSelectQuery()
-	
+
 	rows, err := orm.db.conn.Query(query)
 	if err != nil {
 		return nil, err
@@ -210,7 +210,7 @@ func (orm *TakeoORM) FindAllEntities(typeName string) ([]map[string]interface{},
 	for rows.Next() {
 		result := make(map[string]interface{})
 		scanDests := make([]interface{}, len(metadata.ColumnOrder))
-		
+
 		for i := range metadata.ColumnOrder {
 			var value interface{}
 			scanDests[i] = &value
@@ -303,4 +303,4 @@ func (orm *TakeoORM) DeleteEntitiesBatch(typeName string, ids []interface{}) err
 	}
 
 	return tx.Commit()
-}
\ No newline at end of file
+}
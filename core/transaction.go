@@ -0,0 +1,189 @@
+package core
+
+import (
+	"database/sql"
+	"fmt"
+	"sync"
+)
+
+// txRegistry associe des identifiants numériques (passables via gopy) aux transactions ouvertes
+type txRegistry struct {
+	mu     sync.Mutex
+	nextID int64
+	txs    map[int64]*TakeoTransaction
+}
+
+func newTxRegistry() *txRegistry {
+	return &txRegistry{txs: make(map[int64]*TakeoTransaction)}
+}
+
+func (r *txRegistry) add(tx *TakeoTransaction) int64 {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+
+	r.nextID++
+	r.txs[r.nextID] = tx
+	return r.nextID
+}
+
+func (r *txRegistry) get(id int64) (*TakeoTransaction, error) {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+
+	tx, exists := r.txs[id]
+	if !exists {
+		return nil, fmt.Errorf("transaction %d not found", id)
+	}
+	return tx, nil
+}
+
+// remove retire la transaction du registre (nil si elle n'y est plus)
+func (r *txRegistry) remove(id int64) *TakeoTransaction {
+	r.mu.Lock()
+	defer r.mu.Unlock()
+
+	tx := r.txs[id]
+	delete(r.txs, id)
+	return tx
+}
+
+// rollbackAll annule toutes les transactions encore ouvertes
+func (r *txRegistry) rollbackAll() {
+	r.mu.Lock()
+	txs := r.txs
+	r.txs = make(map[int64]*TakeoTransaction)
+	r.mu.Unlock()
+
+	for _, tx := range txs {
+		if !tx.finished {
+			tx.Rollback()
+		}
+	}
+}
+
+// OpenTransaction commence une transaction et retourne son identifiant
+func (tm *TakeoManager) OpenTransaction() (int64, error) {
+	tx, err := tm.BeginTransaction()
+	if err != nil {
+		return 0, err
+	}
+	return tm.transactions.add(tx), nil
+}
+
+// Transaction retourne une transaction ouverte par OpenTransaction
+func (tm *TakeoManager) Transaction(txID int64) (*TakeoTransaction, error) {
+	return tm.transactions.get(txID)
+}
+
+// CommitTransaction valide une transaction ouverte et la retire du registre
+func (tm *TakeoManager) CommitTransaction(txID int64) error {
+	tx := tm.transactions.remove(txID)
+	if tx == nil {
+		return fmt.Errorf("transaction %d not found", txID)
+	}
+	return tx.Commit()
+}
+
+// RollbackTransaction annule une transaction ouverte et la retire du registre
+func (tm *TakeoManager) RollbackTransaction(txID int64) error {
+	tx := tm.transactions.remove(txID)
+	if tx == nil {
+		return fmt.Errorf("transaction %d not found", txID)
+	}
+	return tx.Rollback()
+}
+
+// prepared retourne le statement préparé sur la transaction pour key, en le
+// préparant au premier usage. Ces statements sont fermés au Commit/Rollback.
+func (tx *TakeoTransaction) prepared(key, query string) (*sql.Stmt, error) {
+	if stmt, exists := tx.stmts[key]; exists {
+		return stmt, nil
+	}
+
+	stmt, err := tx.tx.Prepare(query)
+	if err != nil {
+		return nil, err
+	}
+	tx.stmts[key] = stmt
+	return stmt, nil
+}
+
+// Update met à jour une entité dans la transaction
+func (tx *TakeoTransaction) Update(entityType string, id int64, updates map[string]interface{}) error {
+	if tx.finished {
+		return fmt.Errorf("transaction already finished")
+	}
+
+	metadata, exists := tx.manager.registry.GetEntity(entityType)
+	if !exists {
+		return fmt.Errorf("entity %s not registered", entityType)
+	}
+	tx.written[entityType] = true
+
+	// The SQL text only depends on the set of updated columns
+	shape, args, err := metadata.plan().partialUpdate(metadata, id, updates)
+	if err != nil {
+		return err
+	}
+
+	stmt, err := tx.prepared(shape.key, shape.sql)
+	if err != nil {
+		return err
+	}
+
+	_, err = stmt.Exec(args...)
+	return err
+}
+
+// Delete supprime une entité par ID dans la transaction
+func (tx *TakeoTransaction) Delete(entityType string, id int64) error {
+	if tx.finished {
+		return fmt.Errorf("transaction already finished")
+	}
+
+	metadata, exists := tx.manager.registry.GetEntity(entityType)
+	if !exists {
+		return fmt.Errorf("entity %s not registered", entityType)
+	}
+	tx.written[entityType] = true
+
+	plan := metadata.plan()
+	stmt, err := tx.prepared(plan.deleteKey, plan.deleteSQL)
+	if err != nil {
+		return err
+	}
+
+	_, err = stmt.Exec(id)
+	return err
+}
+
+// FindQuery exécute une lecture filtrée dans la transaction (voir TakeoManager.FindQuery) :
+// elle voit les écritures non encore validées de la transaction
+func (tx *TakeoTransaction) FindQuery(entityType string, q *Query) (*RowSet, error) {
+	if tx.finished {
+		return nil, fmt.Errorf("transaction already finished")
+	}
+
+	metadata, exists := tx.manager.registry.GetEntity(entityType)
+	if !exists {
+		return nil, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	query, args, err := metadata.BuildFindQuery(q)
+	if err != nil {
+		return nil, err
+	}
+
+	stmt, err := tx.prepared("query_"+query, query)
+	if err != nil {
+		return nil, err
+	}
+
+	rows, err := stmt.Query(args...)
+	if err != nil {
+		return nil, err
+	}
+	defer rows.Close()
+
+	return scanRowSet(rows, metadata)
+}
@@ -0,0 +1,190 @@
+package core
+
+import (
+	"database/sql"
+	"fmt"
+	"strings"
+
+	"github.com/lib/pq"
+)
+
+// UpsertOptions décrit la cible ON CONFLICT d'un upsert. Sans UpdateColumns,
+// toutes les colonnes insérées hors ConflictColumns sont mises à jour.
+type UpsertOptions struct {
+	ConflictColumns []string `json:"conflict_columns"`
+	UpdateColumns   []string `json:"update_columns"`
+}
+
+// resolveUpsertColumns valide les options d'upsert contre les colonnes insérées
+func (m *EntityMetadata) resolveUpsertColumns(options UpsertOptions) (conflict, update []string, err error) {
+	if len(options.ConflictColumns) == 0 {
+		return nil, nil, fmt.Errorf("upsert on table %s requires conflict columns", m.TableName)
+	}
+
+	insertable := make(map[string]bool)
+	for _, colName := range m.plan().insertColumns {
+		insertable[colName] = true
+	}
+
+	isConflict := make(map[string]bool, len(options.ConflictColumns))
+	for _, colName := range options.ConflictColumns {
+		if !insertable[colName] {
+			return nil, nil, fmt.Errorf("conflict column %s is not an insertable column of table %s", colName, m.TableName)
+		}
+		isConflict[colName] = true
+	}
+
+	if options.UpdateColumns == nil {
+		for _, colName := range m.plan().insertColumns {
+			if !isConflict[colName] {
+				update = append(update, colName)
+			}
+		}
+		return options.ConflictColumns, update, nil
+	}
+
+	for _, colName := range options.UpdateColumns {
+		if !insertable[colName] {
+			return nil, nil, fmt.Errorf("update column %s is not an insertable column of table %s", colName, m.TableName)
+		}
+	}
+	return options.ConflictColumns, options.UpdateColumns, nil
+}
+
+// dedupeByConflictKey fusionne les lignes qui partagent la même clé de conflit (la
+// dernière gagne) : PostgreSQL refuse qu'un même INSERT ... ON CONFLICT DO UPDATE
+// touche deux fois la même ligne. index[i] est la position de entitiesData[i] dans
+// unique. Une clé contenant NULL ne provoque jamais de conflit et n'est pas fusionnée.
+func dedupeByConflictKey(entitiesData []map[string]interface{}, conflictColumns []string) (unique []map[string]interface{}, index []int) {
+	positions := make(map[string]int, len(entitiesData))
+	unique = make([]map[string]interface{}, 0, len(entitiesData))
+	index = make([]int, len(entitiesData))
+	keyValues := make([]interface{}, len(conflictColumns))
+
+	for i, entityData := range entitiesData {
+		hasNull := false
+		for j, colName := range conflictColumns {
+			keyValues[j] = entityData[colName]
+			hasNull = hasNull || keyValues[j] == nil
+		}
+
+		if !hasNull {
+			key := fmt.Sprintf("%#v", keyValues)
+			if pos, exists := positions[key]; exists {
+				unique[pos] = entityData
+				index[i] = pos
+				continue
+			}
+			positions[key] = len(unique)
+		}
+
+		index[i] = len(unique)
+		unique = append(unique, entityData)
+	}
+
+	return unique, index
+}
+
+// UpsertBatch insère ou met à jour plusieurs entités en une transaction via
+// INSERT ... ON CONFLICT DO UPDATE ... RETURNING, et retourne leurs IDs dans
+// l'ordre de entitiesData. Les batches au-delà du seuil COPY sont d'abord copiés
+// dans une table temporaire puis fusionnés en une seule requête.
+func (tm *TakeoManager) UpsertBatch(entityType string, entitiesData []map[string]interface{}, options UpsertOptions) ([]int64, error) {
+	if len(entitiesData) == 0 {
+		return nil, nil
+	}
+
+	metadata, exists := tm.registry.GetEntity(entityType)
+	if !exists {
+		return nil, fmt.Errorf("entity %s not registered", entityType)
+	}
+	defer tm.entityWritten(entityType)
+
+	conflict, update, err := metadata.resolveUpsertColumns(options)
+	if err != nil {
+		return nil, err
+	}
+
+	unique, index := dedupeByConflictKey(entitiesData, conflict)
+
+	// Start transaction
+	tx, err := tm.db.conn.Begin()
+	if err != nil {
+		return nil, err
+	}
+	defer tx.Rollback()
+
+	var uniqueIDs []int64
+	if tm.copyThreshold > 0 && len(unique) > tm.copyThreshold {
+		uniqueIDs, err = upsertCopy(tx, metadata, unique, conflict, update)
+	} else {
+		uniqueIDs, err = insertValues(tx, metadata.plan().insertColumns, unique, func(rowCount int) string {
+			return metadata.BuildBatchUpsertQuery(rowCount, conflict, update)
+		})
+	}
+	if err != nil {
+		return nil, err
+	}
+	if len(uniqueIDs) != len(unique) {
+		return nil, fmt.Errorf("upsert returned %d ids, expected %d", len(uniqueIDs), len(unique))
+	}
+
+	if err := tx.Commit(); err != nil {
+		return nil, err
+	}
+
+	ids := make([]int64, len(entitiesData))
+	for i, pos := range index {
+		ids[i] = uniqueIDs[pos]
+	}
+	return ids, nil
+}
+
+// upsertCopy copie le batch dans une table temporaire (supprimée au commit) via
+// COPY FROM STDIN, puis le fusionne dans la table par un seul
+// INSERT ... SELECT ... ON CONFLICT. La colonne takeo_ord garde l'ordre d'entrée
+// pour que les IDs retournés correspondent à entitiesData.
+func upsertCopy(tx *sql.Tx, metadata *EntityMetadata, entitiesData []map[string]interface{}, conflictColumns, updateColumns []string) ([]int64, error) {
+	nonAutoColumns := metadata.plan().insertColumns
+	columnList := strings.Join(nonAutoColumns, ", ")
+	tempTable := "takeo_upsert_" + strings.ReplaceAll(metadata.TableName, ".", "_")
+
+	// CREATE TABLE AS copies the column types but none of the constraints
+	_, err := tx.Exec(fmt.Sprintf("CREATE TEMP TABLE %s ON COMMIT DROP AS SELECT 0::bigint AS takeo_ord, %s FROM %s WITH NO DATA",
+		tempTable, columnList, metadata.TableName))
+	if err != nil {
+		return nil, err
+	}
+
+	copyStmt, err := tx.Prepare(pq.CopyIn(tempTable, append([]string{"takeo_ord"}, nonAutoColumns...)...))
+	if err != nil {
+		return nil, err
+	}
+	defer copyStmt.Close()
+
+	row := make([]interface{}, len(nonAutoColumns)+1)
+	for i, entityData := range entitiesData {
+		row[0] = int64(i)
+		for j, colName := range nonAutoColumns {
+			row[j+1] = entityData[colName]
+		}
+		if _, err := copyStmt.Exec(row...); err != nil {
+			return nil, err
+		}
+	}
+
+	// Flush the COPY buffer
+	if _, err := copyStmt.Exec(); err != nil {
+		return nil, err
+	}
+
+	mergeStmt, err := tx.Prepare(fmt.Sprintf("INSERT INTO %s (%s) SELECT %s FROM %s ORDER BY takeo_ord%s",
+		metadata.TableName, columnList, columnList, tempTable,
+		metadata.BuildUpsertClause(conflictColumns, updateColumns)))
+	if err != nil {
+		return nil, err
+	}
+	defer mergeStmt.Close()
+
+	return scanIDs(mergeStmt, nil, make([]int64, 0, len(entitiesData)))
+}
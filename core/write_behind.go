@@ -0,0 +1,378 @@
+package core
+
+import (
+	"errors"
+	"fmt"
+	"sync"
+	"time"
+
+	"github.com/lib/pq"
+)
+
+// Valeurs par défaut du mode write-behind
+const (
+	DefaultWriteBehindMaxBatch = 500
+	DefaultWriteBehindMaxDelay = 50 * time.Millisecond
+)
+
+// pendingSave est une sauvegarde en attente; done est fermé une fois l'ID (ou
+// l'erreur) connu
+type pendingSave struct {
+	data map[string]interface{}
+	done chan struct{}
+	id   int64
+	err  error
+}
+
+// writeBehindQueue accumule les sauvegardes d'un type d'entité jusqu'au prochain flush
+type writeBehindQueue struct {
+	saves []*pendingSave
+	timer *time.Timer
+}
+
+// writeBehind regroupe les Save unitaires en SaveBatch : une file est écrite dès
+// qu'elle atteint maxBatch lignes, ou maxDelay après sa première ligne. Chaque
+// sauvegarde est identifiée par un ticket (passable via gopy) qui permet d'en
+// attendre l'ID.
+type writeBehind struct {
+	manager  *TakeoManager
+	maxBatch int
+	maxDelay time.Duration
+
+	// saveBatch écrit un lot (TakeoManager.SaveBatch)
+	saveBatch func(entityType string, entitiesData []map[string]interface{}) ([]int64, error)
+
+	mu         sync.Mutex
+	queues     map[string]*writeBehindQueue
+	tickets    map[int64]*pendingSave
+	nextTicket int64
+	closed     bool
+
+	// Lots retirés des files mais pas encore écrits; flush attend qu'il n'y en ait plus
+	inFlight int
+	written  *sync.Cond
+}
+
+func newWriteBehind(manager *TakeoManager, maxBatch int, maxDelay time.Duration) *writeBehind {
+	if maxBatch <= 0 {
+		maxBatch = DefaultWriteBehindMaxBatch
+	}
+	if maxDelay <= 0 {
+		maxDelay = DefaultWriteBehindMaxDelay
+	}
+	wb := &writeBehind{
+		manager:   manager,
+		maxBatch:  maxBatch,
+		maxDelay:  maxDelay,
+		saveBatch: manager.SaveBatch,
+		queues:    make(map[string]*writeBehindQueue),
+		tickets:   make(map[int64]*pendingSave),
+	}
+	wb.written = sync.NewCond(&wb.mu)
+	return wb
+}
+
+// enqueue met une sauvegarde en file et retourne son ticket. Le producteur qui
+// remplit une file l'écrit lui-même, ce qui freine les producteurs trop rapides.
+func (wb *writeBehind) enqueue(entityType string, data map[string]interface{}) (int64, error) {
+	save := &pendingSave{data: data, done: make(chan struct{})}
+
+	wb.mu.Lock()
+	if wb.closed {
+		wb.mu.Unlock()
+		return 0, fmt.Errorf("write-behind buffer is closed")
+	}
+
+	wb.nextTicket++
+	ticket := wb.nextTicket
+	wb.tickets[ticket] = save
+
+	queue, exists := wb.queues[entityType]
+	if !exists {
+		queue = &writeBehindQueue{}
+		wb.queues[entityType] = queue
+	}
+	queue.saves = append(queue.saves, save)
+	if len(queue.saves) == 1 {
+		queue.timer = time.AfterFunc(wb.maxDelay, func() { wb.flushEntity(entityType) })
+	}
+
+	var saves []*pendingSave
+	if len(queue.saves) >= wb.maxBatch {
+		saves = wb.takeLocked(queue)
+	}
+	wb.mu.Unlock()
+
+	if saves != nil {
+		wb.write(entityType, saves)
+	}
+	return ticket, nil
+}
+
+// takeLocked vide une file et arrête son timer; l'appelant tient mu et doit
+// ensuite appeler write
+func (wb *writeBehind) takeLocked(queue *writeBehindQueue) []*pendingSave {
+	saves := queue.saves
+	queue.saves = nil
+	if queue.timer != nil {
+		queue.timer.Stop()
+		queue.timer = nil
+	}
+	wb.inFlight++
+	return saves
+}
+
+// flushEntity écrit la file d'un type d'entité (appelé par son timer)
+func (wb *writeBehind) flushEntity(entityType string) {
+	wb.mu.Lock()
+	queue, exists := wb.queues[entityType]
+	if !exists || len(queue.saves) == 0 {
+		wb.mu.Unlock()
+		return
+	}
+	saves := wb.takeLocked(queue)
+	wb.mu.Unlock()
+
+	wb.write(entityType, saves)
+}
+
+// write insère un lot via SaveBatch et publie l'ID (ou l'erreur) de chaque sauvegarde
+func (wb *writeBehind) write(entityType string, saves []*pendingSave) error {
+	defer func() {
+		wb.mu.Lock()
+		wb.inFlight--
+		wb.written.Broadcast()
+		wb.mu.Unlock()
+	}()
+
+	return wb.writeBatch(entityType, saves)
+}
+
+// writeBatch écrit saves en un SaveBatch. Si une ligne est refusée (contrainte,
+// donnée invalide), le lot est coupé en deux et chaque moitié réécrite : seules
+// les sauvegardes fautives reçoivent l'erreur. Les autres erreurs (connexion,
+// entité inconnue) concernent tout le lot.
+func (wb *writeBehind) writeBatch(entityType string, saves []*pendingSave) error {
+	entitiesData := make([]map[string]interface{}, len(saves))
+	for i, save := range saves {
+		entitiesData[i] = save.data
+	}
+
+	ids, err := wb.saveBatch(entityType, entitiesData)
+	if err == nil && len(ids) != len(saves) {
+		err = fmt.Errorf("write-behind flush returned %d ids, expected %d", len(ids), len(saves))
+	}
+
+	if err != nil && len(saves) > 1 && isRowError(err) {
+		// SaveBatch runs in one transaction, so nothing of the failed batch was written
+		half := len(saves) / 2
+		firstErr := wb.writeBatch(entityType, saves[:half])
+		if err := wb.writeBatch(entityType, saves[half:]); firstErr == nil {
+			firstErr = err
+		}
+		return firstErr
+	}
+
+	for i, save := range saves {
+		if err != nil {
+			save.err = err
+		} else {
+			save.id = ids[i]
+		}
+		save.data = nil
+		close(save.done)
+	}
+	return err
+}
+
+// isRowError indique si err vient des valeurs d'une ligne (classes SQLSTATE 22
+// « data exception » et 23 « integrity constraint violation »)
+func isRowError(err error) bool {
+	var pqErr *pq.Error
+	if !errors.As(err, &pqErr) {
+		return false
+	}
+	class := pqErr.Code.Class()
+	return class == "22" || class == "23"
+}
+
+// flush écrit toutes les files immédiatement et attend les écritures en cours.
+// Retourne la première erreur rencontrée (chaque ticket garde aussi la sienne).
+func (wb *writeBehind) flush() error {
+	wb.mu.Lock()
+	batches := make(map[string][]*pendingSave)
+	for entityType, queue := range wb.queues {
+		if len(queue.saves) > 0 {
+			batches[entityType] = wb.takeLocked(queue)
+		}
+	}
+	wb.mu.Unlock()
+
+	var firstErr error
+	for entityType, saves := range batches {
+		if err := wb.write(entityType, saves); err != nil && firstErr == nil {
+			firstErr = err
+		}
+	}
+
+	wb.mu.Lock()
+	for wb.inFlight > 0 {
+		wb.written.Wait()
+	}
+	wb.mu.Unlock()
+	return firstErr
+}
+
+// close refuse les nouvelles sauvegardes puis vide les files
+func (wb *writeBehind) close() error {
+	wb.mu.Lock()
+	wb.closed = true
+	wb.mu.Unlock()
+
+	return wb.flush()
+}
+
+// handOver refuse les nouvelles sauvegardes et transmet les tickets en cours (et
+// la numérotation) à next, qui le remplace : AwaitSave sur un ticket émis avant
+// le remplacement trouve toujours son résultat. L'appelant vide ensuite wb par flush.
+func (wb *writeBehind) handOver(next *writeBehind) {
+	wb.mu.Lock()
+	defer wb.mu.Unlock()
+
+	wb.closed = true
+	for ticket, save := range wb.tickets {
+		next.tickets[ticket] = save
+	}
+	next.nextTicket = wb.nextTicket
+}
+
+// await attend le résultat d'un ticket (timeout <= 0 : sans limite) puis l'oublie
+func (wb *writeBehind) await(ticket int64, timeout time.Duration) (int64, error) {
+	wb.mu.Lock()
+	save, exists := wb.tickets[ticket]
+	wb.mu.Unlock()
+	if !exists {
+		return 0, fmt.Errorf("save ticket %d not found", ticket)
+	}
+
+	if timeout > 0 {
+		timer := time.NewTimer(timeout)
+		defer timer.Stop()
+		select {
+		case <-save.done:
+		case <-timer.C:
+			return 0, fmt.Errorf("save ticket %d: timed out", ticket)
+		}
+	} else {
+		<-save.done
+	}
+
+	wb.release(ticket)
+	return save.id, save.err
+}
+
+// done indique si le résultat d'un ticket est disponible
+func (wb *writeBehind) done(ticket int64) bool {
+	wb.mu.Lock()
+	save, exists := wb.tickets[ticket]
+	wb.mu.Unlock()
+	if !exists {
+		return true
+	}
+
+	select {
+	case <-save.done:
+		return true
+	default:
+		return false
+	}
+}
+
+// release oublie un ticket dont le résultat ne sera pas attendu (la sauvegarde a
+// quand même lieu)
+func (wb *writeBehind) release(ticket int64) {
+	wb.mu.Lock()
+	delete(wb.tickets, ticket)
+	wb.mu.Unlock()
+}
+
+// EnableWriteBehind active le mode write-behind (maxBatch lignes ou maxDelay au
+// plus avant écriture; 0 = valeur par défaut). Un buffer déjà actif est remplacé
+// puis vidé; ses tickets restent valables.
+func (tm *TakeoManager) EnableWriteBehind(maxBatch int, maxDelay time.Duration) error {
+	wb := newWriteBehind(tm, maxBatch, maxDelay)
+
+	tm.writeBehindMu.Lock()
+	previous := tm.writeBehind
+	if previous != nil {
+		previous.handOver(wb)
+	}
+	tm.writeBehind = wb
+	tm.writeBehindMu.Unlock()
+
+	if previous != nil {
+		return previous.flush()
+	}
+	return nil
+}
+
+// writeBuffer retourne le buffer write-behind actif
+func (tm *TakeoManager) writeBuffer() (*writeBehind, error) {
+	tm.writeBehindMu.Lock()
+	defer tm.writeBehindMu.Unlock()
+
+	if tm.writeBehind == nil {
+		return nil, fmt.Errorf("write-behind is not enabled")
+	}
+	return tm.writeBehind, nil
+}
+
+// EnqueueSave met une sauvegarde en file et retourne un ticket pour AwaitSave
+func (tm *TakeoManager) EnqueueSave(entityType string, entityData map[string]interface{}) (int64, error) {
+	if _, exists := tm.registry.GetEntity(entityType); !exists {
+		return 0, fmt.Errorf("entity %s not registered", entityType)
+	}
+
+	wb, err := tm.writeBuffer()
+	if err != nil {
+		return 0, err
+	}
+	return wb.enqueue(entityType, entityData)
+}
+
+// AwaitSave attend l'ID d'une sauvegarde en file (timeout <= 0 : sans limite)
+func (tm *TakeoManager) AwaitSave(ticket int64, timeout time.Duration) (int64, error) {
+	wb, err := tm.writeBuffer()
+	if err != nil {
+		return 0, err
+	}
+	return wb.await(ticket, timeout)
+}
+
+// SaveDone indique si l'ID d'une sauvegarde en file est disponible
+func (tm *TakeoManager) SaveDone(ticket int64) bool {
+	wb, err := tm.writeBuffer()
+	if err != nil {
+		return true
+	}
+	return wb.done(ticket)
+}
+
+// ReleaseSave oublie le ticket d'une sauvegarde dont l'ID ne sera pas attendu
+func (tm *TakeoManager) ReleaseSave(ticket int64) {
+	if wb, err := tm.writeBuffer(); err == nil {
+		wb.release(ticket)
+	}
+}
+
+// FlushWrites écrit immédiatement toutes les sauvegardes en file
+func (tm *TakeoManager) FlushWrites() error {
+	tm.writeBehindMu.Lock()
+	wb := tm.writeBehind
+	tm.writeBehindMu.Unlock()
+
+	if wb == nil {
+		return nil
+	}
+	return wb.flush()
+}
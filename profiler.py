@@ -126,7 +126,7 @@ def profile_takeo_orm():
         entity_to_dict_time = (time.perf_counter() - start) * 1000000
 
         # 2. JSON serialization
-        from takeo.orm import json_dumps
+        from takeo.orm import json_dumps, _to_go_bytes
 
         start = time.perf_counter()
         entity_json = json_dumps(entity_data)
@@ -134,7 +134,9 @@ def profile_takeo_orm():
 
         # 3. Go API call
         start = time.perf_counter()
-        save_result = userRepo._api.Save(userRepo.entity_class.__name__, entity_json)
+        save_result = userRepo._api.Save(
+            userRepo.entity_class.__name__, _to_go_bytes(entity_json)
+        )
         go_api_time = (time.perf_counter() - start) * 1000
 
         # 4. Result processing
@@ -175,14 +177,14 @@ def profile_takeo_orm():
         result_json = userRepo._api.FindAll(userRepo.entity_class.__name__)
         go_read_time = (time.perf_counter() - start) * 1000
 
-        from takeo.orm import json_loads
+        from takeo.orm import json_loads, _from_go_bytes
 
         start = time.perf_counter()
-        parsed_data = json_loads(result_json)
+        parsed_data = json_loads(_from_go_bytes(result_json))
         json_parse_time = (time.perf_counter() - start) * 1000000
 
         start = time.perf_counter()
-        entities = [userRepo._dict_to_entity(item) for item in parsed_data]
+        entities = userRepo._rows_to_entities(parsed_data)
         entity_creation_time = (time.perf_counter() - start) * 1000000
 
         print(f"   Total read time: {read_time:.2f}ms")
@@ -40,6 +40,9 @@ setup(
             "flake8>=3.8",
             "mypy>=0.910",
         ],
+        "numpy": [
+            "numpy>=1.20",
+        ],
         "docs": [
             "sphinx>=4.0",
             "sphinx-rtd-theme>=1.0",
@@ -5,6 +5,9 @@ TypeORM-like API with optimized Go bindings
 
 # Import des classes principales
 from .orm import Entity, PrimaryGeneratedColumn, Column, createConnection, Repository
+from .async_orm import createAsyncConnection, AsyncRepository
+from .session import Session
+from .transaction import Transaction
 
 __version__ = "0.1.0"
 __author__ = "Takeo-ORM Team"
@@ -17,4 +20,8 @@ __all__ = [
     "Column",
     "createConnection",
     "Repository",
+    "createAsyncConnection",
+    "AsyncRepository",
+    "Session",
+    "Transaction",
 ]
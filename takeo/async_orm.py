@@ -0,0 +1,185 @@
+"""
+Takeo-ORM - asyncio API
+Runs the Go calls on a thread pool so the event loop never blocks on a round trip
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Type
+
+from .orm import TakeoPyTypeORM, Repository
+
+
+# Nombre de threads par défaut quand max_open_conns n'est pas fixé
+DEFAULT_MAX_WORKERS = 16
+
+
+class AsyncTakeoPyTypeORM:
+    """Connexion asyncio : chaque appel Go tourne sur un thread de l'executor.
+
+    Les bindings gopy relâchent le GIL pendant l'appel Go, donc plusieurs
+    coroutines peuvent avoir une requête en vol en même temps sur le pool Go.
+    """
+
+    def __init__(self, connection: TakeoPyTypeORM, executor: ThreadPoolExecutor):
+        self._connection = connection
+        self._executor = executor
+        self._repositories = {}
+
+    def getRepository(self, entity_class: Type) -> "AsyncRepository":
+        """Obtient le repository asynchrone pour une entité"""
+        class_name = entity_class.__name__
+
+        if class_name not in self._repositories:
+            repository = self._connection.getRepository(entity_class)
+            self._repositories[class_name] = AsyncRepository(repository, self._executor)
+
+        return self._repositories[class_name]
+
+    async def poolStats(self) -> Dict[str, Any]:
+        """Statistiques du pool de connexions Go"""
+        return await _run(self._executor, self._connection.poolStats)
+
+    async def stmtCacheStats(self) -> Dict[str, Any]:
+        """Compteurs du cache de prepared statements Go"""
+        return await _run(self._executor, self._connection.stmtCacheStats)
+
+    async def resultCacheStats(self) -> Dict[str, Any]:
+        """Compteurs du cache de résultats Go"""
+        return await _run(self._executor, self._connection.resultCacheStats)
+
+    async def replicate(self, entity_class: Type, **options):
+        """Charge une entité en mémoire côté Go (voir TakeoPyTypeORM.replicate)"""
+        await _run(
+            self._executor,
+            functools.partial(self._connection.replicate, entity_class, **options),
+        )
+
+    async def flush(self):
+        """Écrit immédiatement les sauvegardes en file (mode write-behind)"""
+        await _run(self._executor, self._connection.flush)
+
+    async def close(self):
+        """Ferme la connexion puis arrête l'executor"""
+        await _run(self._executor, self._connection.close)
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncTakeoPyTypeORM":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+
+class AsyncRepository:
+    """Repository asyncio : mêmes opérations que Repository, en awaitable"""
+
+    def __init__(self, repository: Repository, executor: ThreadPoolExecutor):
+        self._repository = repository
+        self._executor = executor
+        self.entity_class = repository.entity_class
+
+    async def save(self, entity) -> Any:
+        """Sauvegarde une entité"""
+        return await _run(self._executor, self._repository.save, entity)
+
+    async def saveBatch(self, entities: List[Any]) -> List[Any]:
+        """Sauvegarde multiple entités en une seule transaction"""
+        return await _run(self._executor, self._repository.saveBatch, entities)
+
+    async def upsertBatch(
+        self,
+        entities: List[Any],
+        conflict_columns: List[str],
+        update_columns: Optional[List[str]] = None,
+    ) -> List[Any]:
+        """Insère ou met à jour plusieurs entités (voir Repository.upsertBatch)"""
+        return await _run(
+            self._executor,
+            self._repository.upsertBatch,
+            entities,
+            conflict_columns,
+            update_columns,
+        )
+
+    async def findOne(self, id: int) -> Optional[Any]:
+        """Trouve une entité par ID"""
+        return await _run(self._executor, self._repository.findOne, id)
+
+    async def findByIds(self, ids: List[int]) -> List[Optional[Any]]:
+        """Trouve plusieurs entités par ID (ordre de ids, None si absente)"""
+        return await _run(self._executor, self._repository.findByIds, ids)
+
+    async def find(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        order_by: Any = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        parallel: Optional[int] = None,
+    ) -> List[Any]:
+        """Trouve les entités, filtrées et triées si demandé (voir Repository.find)"""
+        return await _run(
+            self._executor, self._repository.find, where, order_by, limit, offset, parallel
+        )
+
+    async def update(self, id: int, update_data: Dict[str, Any]):
+        """Met à jour une entité"""
+        return await _run(self._executor, self._repository.update, id, update_data)
+
+    async def updateBatch(self, updates) -> int:
+        """Met à jour plusieurs entités en une transaction (voir Repository.updateBatch)"""
+        return await _run(self._executor, self._repository.updateBatch, updates)
+
+    async def delete(self, id: int):
+        """Supprime une entité"""
+        return await _run(self._executor, self._repository.delete, id)
+
+    async def deleteMany(self, ids: List[int]) -> int:
+        """Supprime plusieurs entités par ID, retourne le nombre supprimé"""
+        return await _run(self._executor, self._repository.deleteMany, ids)
+
+    async def deleteWhere(self, where: Dict[str, Any]) -> int:
+        """Supprime les entités filtrées, retourne le nombre supprimé"""
+        return await _run(self._executor, self._repository.deleteWhere, where)
+
+
+async def _run(executor: ThreadPoolExecutor, func, *args):
+    """Exécute un appel bloquant sur l'executor sans bloquer la boucle"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, functools.partial(func, *args))
+
+
+async def createAsyncConnection(
+    host: str,
+    port: int,
+    user: str,
+    password: str,
+    database: str,
+    sslmode: str = "disable",
+    max_workers: Optional[int] = None,
+    **options,
+) -> AsyncTakeoPyTypeORM:
+    """Crée une connexion Takeo-ORM asyncio.
+
+    max_workers borne le nombre d'appels Go simultanés; par défaut il suit
+    max_open_conns pour ne pas faire attendre les threads sur le pool Go.
+    Les autres options sont celles de createConnection.
+    """
+    if max_workers is None:
+        max_workers = options.get("max_open_conns") or DEFAULT_MAX_WORKERS
+
+    executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="takeo")
+    try:
+        connection = await _run(
+            executor,
+            functools.partial(
+                TakeoPyTypeORM, host, port, user, password, database, sslmode, **options
+            ),
+        )
+    except BaseException:
+        executor.shutdown(wait=False)
+        raise
+
+    return AsyncTakeoPyTypeORM(connection, executor)
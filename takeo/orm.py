@@ -3,34 +3,89 @@ Takeo-ORM - TypeORM-like API for Python
 High-performance ORM with Go backend and TypeORM-inspired syntax
 """
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+import array
+import inspect
+import sys
+import typing
+from decimal import Decimal
+from typing import Dict, List, Any, Optional, Tuple, Type, Iterator
+from .core import core, go
+
+
+def _json_default(value):
+    """Types non JSON : Decimal part en texte exact (colonnes NUMERIC)"""
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
 try:
     import orjson
 
-    # Optimize: avoid decode() when possible, work with bytes directly when Go API accepts it
-    def json_dumps(obj):
-        # Return bytes directly - Go can handle bytes
-        result = orjson.dumps(obj)
-        # Only decode if we need string (for now, keep compatibility)
-        return result.decode("utf-8")
+    # The Go API takes and returns []byte: keep JSON as bytes end to end
+    def json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, default=_json_default)
 
     def json_loads(s):
-        # Handle both bytes and str input
-        if isinstance(s, str):
-            s = s.encode("utf-8")
+        # orjson parses bytes, bytearray, memoryview and str without copying
         return orjson.loads(s)
 
 except ImportError:
     import json
 
-    def json_dumps(obj):
-        return json.dumps(obj)
+    def json_dumps(obj) -> bytes:
+        return json.dumps(obj, default=_json_default).encode("utf-8")
 
     def json_loads(s):
         return json.loads(s)
 
 
-from typing import Dict, List, Any, Optional, Type
-from .core import core
+def _to_go_bytes(data: bytes):
+    """Passe un buffer Python à un paramètre Go []byte"""
+    return go.Slice_byte.from_bytes(data)
+
+
+def _from_go_bytes(result) -> bytes:
+    """Convertit un retour Go []byte (handle gopy) en bytes Python"""
+    if result is None:
+        return b""
+    return bytes(result)
+
+
+# Colonnes numériques d'une trame colonnaire (voir TakeoManager.FindColumns côté Go)
+_NUMPY_DTYPES = {"int64": "<i8", "float64": "<f8", "bool": "?"}
+_ARRAY_TYPECODES = {"int64": "q", "float64": "d", "bool": "b"}
+
+
+def _decode_columnar_frame(frame: bytes) -> Dict[str, Any]:
+    """Décode une trame colonnaire en dict colonne -> tableau NumPy (ou array.array)"""
+    header_size = int.from_bytes(frame[:4], "little")
+    header = json_loads(bytes(frame[4 : 4 + header_size]))
+    body = memoryview(frame)[4 + header_size :]
+
+    columns = {}
+    for column in header["columns"]:
+        kind = column["kind"]
+        chunk = body[column["offset"] : column["offset"] + column["length"]]
+
+        if kind not in _NUMPY_DTYPES:
+            # Non-numeric columns are a JSON array
+            columns[column["name"]] = json_loads(bytes(chunk))
+        elif np is not None:
+            columns[column["name"]] = np.frombuffer(chunk, dtype=_NUMPY_DTYPES[kind])
+        else:
+            values = array.array(_ARRAY_TYPECODES[kind])
+            values.frombytes(chunk)
+            if sys.byteorder == "big" and values.itemsize > 1:
+                values.byteswap()
+            columns[column["name"]] = values
+
+    return columns
 
 
 # Métadonnées de colonnes
@@ -61,32 +116,153 @@ class ColumnMeta:
 
 
 # Décorateurs TypeORM-style
-def Entity(table_name: str):
-    """Décorateur @Entity pour marquer une classe comme entité"""
+def Entity(
+    table_name: str,
+    compiled: bool = False,
+    slots: bool = False,
+    cache_ttl: Optional[float] = None,
+):
+    """Décorateur @Entity pour marquer une classe comme entité.
+
+    compiled=True génère une fois (via exec) des conversions entité <-> ligne
+    propres à la classe, utilisées par Repository à la place des chemins
+    génériques. Les entités lues depuis la base sont alors créées sans appeler
+    __init__ : seules les colonnes sont assignées.
+    slots=True recrée la classe avec __slots__ sur ses colonnes (pas de __dict__,
+    moins de mémoire par instance); __init__ ne peut alors assigner que des colonnes.
+    cache_ttl (en secondes) active le cache de résultats côté Go pour cette entité :
+    findOne, findByIds, find et findAll y gardent leurs lignes encodées pendant
+    cache_ttl, jusqu'à la prochaine écriture sur l'entité.
+
+    Les colonnes NUMERIC/DECIMAL arrivent de Go en texte exact; celles annotées
+    Decimal (price: Decimal = Column("NUMERIC(12, 2)")) sont converties en Decimal.
+    """
 
     def decorator(cls):
-        cls._takeo_table_name = table_name
-        cls._takeo_columns = {}
-        cls._takeo_primary_key = None
+        columns = {}
+        primary_key = None
+        annotations = cls.__dict__.get("__annotations__", {})
 
         # Extraire les métadonnées des colonnes
         for attr_name, attr_value in cls.__dict__.items():
             if isinstance(attr_value, ColumnMeta):
-                cls._takeo_columns[attr_name] = {
+                columns[attr_name] = {
                     "name": attr_name,
                     "type": attr_value.sql_type,
                     "primary": attr_value.primary,
                     "nullable": attr_value.nullable,
                     "unique": attr_value.unique,
+                    "decimal": _is_decimal_annotation(annotations.get(attr_name)),
                 }
                 if attr_value.primary:
-                    cls._takeo_primary_key = attr_name
+                    primary_key = attr_name
+
+        if slots:
+            cls = _with_slots(cls, columns)
+
+        cls._takeo_table_name = table_name
+        cls._takeo_columns = columns
+        cls._takeo_primary_key = primary_key
+        cls._takeo_cache_ttl = cache_ttl
+
+        if compiled:
+            cls._takeo_to_row = _compile_to_row(cls)
+            cls._takeo_row_loaders = {}
 
         return cls
 
     return decorator
 
 
+def _is_decimal_annotation(annotation) -> bool:
+    """Indique si une annotation est Decimal ou Optional[Decimal] (aussi en chaîne)"""
+    if isinstance(annotation, str):
+        return annotation in ("Decimal", "decimal.Decimal", "Optional[Decimal]", "Decimal | None")
+    return annotation is Decimal or Decimal in typing.get_args(annotation)
+
+
+def _with_slots(cls, columns: Dict[str, Dict[str, Any]]):
+    """Recrée cls avec __slots__ : les ColumnMeta de classe entreraient en conflit avec les slots"""
+    namespace = {
+        name: value
+        for name, value in cls.__dict__.items()
+        if name not in columns and name not in ("__dict__", "__weakref__")
+    }
+    namespace["__slots__"] = tuple(columns)
+    slotted = type(cls)(cls.__name__, cls.__bases__, namespace)
+    # __qualname__ is not in cls.__dict__: keep it so nested entities still pickle
+    slotted.__qualname__ = cls.__qualname__
+
+    # Zero-argument super() reads the __class__ cell of the method: point it at
+    # the new class, as dataclasses does for slots=True
+    for value in slotted.__dict__.values():
+        if isinstance(value, (classmethod, staticmethod)):
+            functions = (value.__func__,)
+        elif isinstance(value, property):
+            functions = (value.fget, value.fset, value.fdel)
+        else:
+            functions = (value,)
+        for function in functions:
+            _rebind_class_cell(function, cls, slotted)
+    return slotted
+
+
+def _rebind_class_cell(function, old_cls, new_cls):
+    """Remplace old_cls par new_cls dans la cellule __class__ d'une fonction"""
+    function = inspect.unwrap(function)
+    code = getattr(function, "__code__", None)
+    if code is None or "__class__" not in code.co_freevars:
+        return
+    cell = function.__closure__[code.co_freevars.index("__class__")]
+    if cell.cell_contents is old_cls:
+        cell.cell_contents = new_cls
+
+
+def _compile_to_row(cls):
+    """Génère entity -> dict colonne -> valeur (colonnes None omises, comme _entity_to_dict)"""
+    lines = ["def to_row(entity):", "    row = {}"]
+    for attr_name, col_meta in cls._takeo_columns.items():
+        lines.append(f"    value = getattr(entity, {attr_name!r}, None)")
+        lines.append("    if value is not None:")
+        lines.append(f"        row[{col_meta['name']!r}] = value")
+    lines.append("    return row")
+
+    namespace = {}
+    exec("\n".join(lines), namespace)
+    return namespace["to_row"]
+
+
+def _compile_row_loader(cls, columns: Tuple[str, ...]):
+    """Génère rows -> entités pour un ordre de colonnes donné (sans appeler __init__)"""
+    reverse_mapping = {
+        col_meta["name"]: attr_name for attr_name, col_meta in cls._takeo_columns.items()
+    }
+    decimal_attrs = {
+        attr_name for attr_name, col_meta in cls._takeo_columns.items() if col_meta.get("decimal")
+    }
+
+    lines = [
+        "def load_rows(rows):",
+        "    entities = []",
+        "    append = entities.append",
+        "    for row in rows:",
+        "        entity = new(cls)",
+    ]
+    for index, column_name in enumerate(columns):
+        attr_name = reverse_mapping.get(column_name)
+        if attr_name in decimal_attrs:
+            lines.append(f"        value = row[{index}]")
+            lines.append(f"        entity.{attr_name} = value if value is None else Decimal(value)")
+        elif attr_name is not None:
+            lines.append(f"        entity.{attr_name} = row[{index}]")
+    lines.append("        append(entity)")
+    lines.append("    return entities")
+
+    namespace = {"new": object.__new__, "cls": cls, "Decimal": Decimal}
+    exec("\n".join(lines), namespace)
+    return namespace["load_rows"]
+
+
 def PrimaryGeneratedColumn(type_def: str = "SERIAL PRIMARY KEY"):
     """Décorateur @PrimaryGeneratedColumn pour clé primaire auto-générée"""
     return ColumnMeta(type_def, primary=True)
@@ -113,17 +289,79 @@ class TakeoPyTypeORM:
         password: str,
         database: str,
         sslmode: str = "disable",
+        copy_threshold: Optional[int] = None,
+        max_open_conns: Optional[int] = None,
+        max_idle_conns: Optional[int] = None,
+        conn_max_lifetime: Optional[float] = None,
+        conn_max_idle_time: Optional[float] = None,
+        stmt_cache_size: Optional[int] = None,
+        write_behind: bool = False,
+        write_behind_max_batch: Optional[int] = None,
+        write_behind_max_delay: Optional[float] = None,
+        identity_map: bool = False,
+        result_cache_size: Optional[int] = None,
+        cache_sync: bool = False,
+        cache_sync_channel: Optional[str] = None,
     ):
         self._api = core.NewTakeoAPI(host, port, user, password, database, sslmode)
         self._repositories = {}
 
+        # Cache de premier niveau partagé par les repositories de la connexion
+        self._identity_map = IdentityMap() if identity_map else None
+
+        # Nombre maximum de prepared statements gardés côté Go (LRU)
+        if stmt_cache_size is not None:
+            self._api.SetStmtCacheSize(stmt_cache_size)
+
+        # Taille en octets du cache de résultats Go (entités déclarées avec cache_ttl)
+        if result_cache_size is not None:
+            self._api.SetResultCacheSize(result_cache_size)
+
+        # Invalidation du cache de résultats entre processus par LISTEN/NOTIFY
+        # (même canal pour tous les processus qui partagent la base)
+        if cache_sync:
+            error = self._api.EnableCacheSync(cache_sync_channel or "")
+            if error:
+                raise Exception(f"EnableCacheSync error: {error}")
+
+        # Pool de connexions Go (durées en secondes, None = défaut database/sql)
+        pool_settings = (
+            max_open_conns,
+            max_idle_conns,
+            conn_max_lifetime,
+            conn_max_idle_time,
+        )
+        if any(setting is not None for setting in pool_settings):
+            self._api.ConfigurePool(
+                max_open_conns or 0,
+                max_idle_conns or 0,
+                int((conn_max_lifetime or 0) * 1000),
+                int((conn_max_idle_time or 0) * 1000),
+            )
+
+        # Taille de batch au-delà de laquelle saveBatch passe par COPY (0 = désactivé)
+        if copy_threshold is not None:
+            self._api.SetCopyThreshold(copy_threshold)
+
+        # Mode write-behind : Repository.saveDeferred met les sauvegardes en file et
+        # Go les écrit par SaveBatch (taille max du lot, délai max en secondes)
+        if write_behind:
+            error = self._api.EnableWriteBehind(
+                write_behind_max_batch or 0,
+                int((write_behind_max_delay or 0) * 1000),
+            )
+            if error:
+                raise Exception(f"EnableWriteBehind error: {error}")
+
     def getRepository(self, entity_class: Type) -> "Repository":
         """Obtient le repository pour une entité (style TypeORM)"""
         class_name = entity_class.__name__
 
         if class_name not in self._repositories:
             self._register_entity_if_needed(entity_class)
-            self._repositories[class_name] = Repository(entity_class, self._api)
+            self._repositories[class_name] = Repository(
+                entity_class, self._api, self._identity_map
+            )
 
         return self._repositories[class_name]
 
@@ -140,42 +378,179 @@ class TakeoPyTypeORM:
             self._api.RegisterEntity(
                 entity_class.__name__,
                 entity_class._takeo_table_name,
-                columns_json,
+                _to_go_bytes(columns_json),
                 entity_class._takeo_primary_key or "id",
             )
 
+            cache_ttl = getattr(entity_class, "_takeo_cache_ttl", None)
+            if cache_ttl:
+                error = self._api.CacheEntity(
+                    entity_class.__name__, int(cache_ttl * 1000)
+                )
+                if error:
+                    raise Exception(f"CacheEntity error: {error}")
+
             entity_class._takeo_registered = True
 
+    def poolStats(self) -> Dict[str, Any]:
+        """Statistiques du pool de connexions (open, in_use, idle, wait_count, wait_duration...)"""
+        result = self._api.PoolStats()
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"PoolStats error: {error}")
+        return json_loads(_from_go_bytes(result))
+
+    def stmtCacheStats(self) -> Dict[str, Any]:
+        """Compteurs du cache de prepared statements (size, capacity, hits, misses, evictions)"""
+        result = self._api.StmtCacheStats()
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"StmtCacheStats error: {error}")
+        return json_loads(_from_go_bytes(result))
+
+    def resultCacheStats(self) -> Dict[str, Any]:
+        """Compteurs du cache de résultats (entries, bytes, capacity, hits, misses,
+        evictions, expirations, invalidations)"""
+        result = self._api.ResultCacheStats()
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"ResultCacheStats error: {error}")
+        return json_loads(_from_go_bytes(result))
+
+    def invalidateResultCache(self, entity_class: Type) -> None:
+        """Vide le cache de résultats d'une entité (après une écriture faite hors de l'ORM);
+        avec cache_sync, les autres processus sont aussi notifiés"""
+        self._api.InvalidateResults(entity_class.__name__)
+
+    def replicate(
+        self,
+        entity_class: Type,
+        refresh: Optional[float] = None,
+        index_on: Optional[List[str]] = None,
+        refresh_column: Optional[str] = None,
+    ) -> None:
+        """Charge toute la table de l'entité en mémoire côté Go, avec un index par
+        hachage sur chaque colonne de index_on (entières, booléennes ou texte).
+
+        findOne, findByIds, findAll et les find d'égalité (valeur ou liste) sur la
+        clé primaire ou ces colonnes sont ensuite servis sans requête. Les écritures
+        de la connexion (ou notifiées avec cache_sync) rafraîchissent la table à la
+        lecture suivante; refresh (en secondes) la rafraîchit aussi périodiquement.
+        Un rafraîchissement ne relit que les lignes modifiées si refresh_column (par
+        exemple "updated_at", mis à jour par chaque écriture) est fourni, et toute
+        la table sinon : à éviter sur une table souvent écrite.
+        """
+        self._register_entity_if_needed(entity_class)
+        error = self._api.Replicate(
+            entity_class.__name__,
+            _to_go_bytes(json_dumps(list(index_on or []))),
+            refresh_column or "",
+            int((refresh or 0) * 1000),
+        )
+        if error:
+            raise Exception(f"Replicate error: {error}")
+
+    def unreplicate(self, entity_class: Type) -> None:
+        """Retire la copie en mémoire d'une entité; ses lectures repassent par la base"""
+        self._api.Unreplicate(entity_class.__name__)
+
+    def installCacheTrigger(self, entity_class: Type) -> None:
+        """Installe sur la table de l'entité un trigger NOTIFY (requiert cache_sync) :
+        les écritures faites hors de Takeo invalident aussi les caches"""
+        self._register_entity_if_needed(entity_class)
+        error = self._api.InstallCacheTrigger(entity_class.__name__)
+        if error:
+            raise Exception(f"InstallCacheTrigger error: {error}")
+
+    def transaction(self) -> "Transaction":
+        """Ouvre une transaction (voir takeo.transaction.Transaction)"""
+        from .transaction import Transaction
+
+        return Transaction(self)
+
+    def session(self) -> "Session":
+        """Ouvre une unité de travail (voir takeo.session.Session)"""
+        from .session import Session
+
+        return Session(self)
+
+    def clearIdentityMap(self):
+        """Oublie les entités du cache de premier niveau (option identity_map)"""
+        if self._identity_map is not None:
+            self._identity_map.clear()
+
+    def flush(self):
+        """Écrit immédiatement les sauvegardes en file (mode write-behind)"""
+        error = self._api.FlushWrites()
+        if error:
+            raise Exception(f"Flush error: {error}")
+
     def close(self):
-        """Ferme la connexion"""
+        """Ferme la connexion (les sauvegardes en file sont écrites avant)"""
         self._api.Close()
 
 
 class Repository:
     """Repository TypeORM-style pour opérations CRUD"""
 
-    def __init__(self, entity_class: Type, api):
+    def __init__(self, entity_class: Type, api, identity_map: Optional["IdentityMap"] = None):
         self.entity_class = entity_class
         self._api = api
+        self._identity_map = identity_map
+
+        # Column mappings, computed once per repository
+        self._column_mapping = {
+            attr_name: col_meta["name"]
+            for attr_name, col_meta in entity_class._takeo_columns.items()
+        }
+        self._reverse_column_mapping = {
+            column_name: attr_name for attr_name, column_name in self._column_mapping.items()
+        }
+        self._decimal_columns = {
+            col_meta["name"]
+            for col_meta in entity_class._takeo_columns.values()
+            if col_meta.get("decimal")
+        }
+
+        # Generated converters (@Entity(compiled=True)), None for the generic paths
+        self._to_row = getattr(entity_class, "_takeo_to_row", None)
+        self._row_loaders = getattr(entity_class, "_takeo_row_loaders", None)
 
     def save(self, entity) -> Any:
         """Sauvegarde une entité (style TypeORM)"""
         entity_data = self._entity_to_dict(entity)
         entity_json = json_dumps(entity_data)
 
-        save_result = self._api.Save(self.entity_class.__name__, entity_json)
+        save_result = self._api.Save(
+            self.entity_class.__name__, _to_go_bytes(entity_json)
+        )
         if isinstance(save_result, tuple):
             result, error = save_result
             if error:
                 raise Exception(f"Save error: {error}")
-            # Mettre à jour l'ID de l'entité
-            if hasattr(entity, self.entity_class._takeo_primary_key):
-                setattr(entity, self.entity_class._takeo_primary_key, result)
-            return entity
+            # Mettre à jour l'ID de l'entité (un slot non assigné n'existe pas encore)
+            setattr(entity, self.entity_class._takeo_primary_key, result)
         else:
-            if hasattr(entity, self.entity_class._takeo_primary_key):
-                setattr(entity, self.entity_class._takeo_primary_key, save_result)
-            return entity
+            setattr(entity, self.entity_class._takeo_primary_key, save_result)
+
+        if self._identity_map is not None:
+            self._identity_map.add(entity)
+        return entity
+
+    def saveDeferred(self, entity) -> "SaveFuture":
+        """Met la sauvegarde en file (mode write-behind) : Go la regroupe avec les
+        suivantes dans un SaveBatch. L'ID est affecté à l'entité par SaveFuture.result()"""
+        ticket = self._api.EnqueueSave(
+            self.entity_class.__name__, _to_go_bytes(json_dumps(self._entity_to_dict(entity)))
+        )
+        if isinstance(ticket, tuple):
+            ticket, error = ticket
+            if error:
+                raise Exception(f"Save error: {error}")
+        return SaveFuture(self._api, entity, ticket)
 
     def saveBatch(self, entities: List[Any]) -> List[Any]:
         """Sauvegarde multiple entités en une seule transaction - OPTIMISÉ"""
@@ -191,102 +566,409 @@ class Repository:
         # Single JSON serialization for all entities
         batch_json = json_dumps(entities_data)
 
-        # Single API call instead of N calls
-        try:
-            # Use SaveBatch if available, otherwise fallback to individual saves
-            if hasattr(self._api, "SaveBatch"):
-                batch_result = self._api.SaveBatch(
-                    self.entity_class.__name__, batch_json
-                )
-                # Parse batch results and update entity IDs
-                if isinstance(batch_result, str):
-                    ids = json_loads(batch_result)
-                    for i, entity_id in enumerate(ids):
-                        if i < len(entities) and hasattr(
-                            entities[i], self.entity_class._takeo_primary_key
-                        ):
-                            setattr(
-                                entities[i],
-                                self.entity_class._takeo_primary_key,
-                                entity_id,
-                            )
-            else:
-                # Fallback to individual saves (still faster due to optimized conversions)
-                for entity in entities:
-                    self.save(entity)
-        except Exception as e:
-            # Fallback to individual saves on error
+        # Single API call instead of N calls: Go chunks the batch to stay under
+        # PostgreSQL's bind-parameter limit, so errors here are real errors
+        batch_result = self._api.SaveBatch(
+            self.entity_class.__name__, _to_go_bytes(batch_json)
+        )
+        if isinstance(batch_result, tuple):
+            batch_result, error = batch_result
+            if error:
+                raise Exception(f"SaveBatch error: {error}")
+
+        # Parse batch results and update entity IDs (same order as input)
+        batch_result = _from_go_bytes(batch_result)
+        if batch_result:
+            ids = json_loads(batch_result)
+            primary_key = self.entity_class._takeo_primary_key
+            for entity, entity_id in zip(entities, ids):
+                setattr(entity, primary_key, entity_id)
+
+        if self._identity_map is not None:
             for entity in entities:
-                self.save(entity)
+                self._identity_map.add(entity)
+
+        return entities
+
+    def upsertBatch(
+        self,
+        entities: List[Any],
+        conflict_columns: List[str],
+        update_columns: Optional[List[str]] = None,
+    ) -> List[Any]:
+        """Insère ou met à jour plusieurs entités en une transaction (INSERT ... ON CONFLICT).
+
+        conflict_columns doit correspondre à une contrainte unique. Sans
+        update_columns, tous les autres champs sont mis à jour en cas de conflit.
+        Les IDs (nouveaux ou existants) sont assignés aux entités.
+        """
+        if not entities:
+            return []
+
+        entities_data = [self._entity_to_dict(entity) for entity in entities]
+        column_mapping = self._column_mapping
+        options = {
+            "conflict_columns": [column_mapping.get(name, name) for name in conflict_columns],
+            "update_columns": (
+                None
+                if update_columns is None
+                else [column_mapping.get(name, name) for name in update_columns]
+            ),
+        }
+
+        result = self._api.UpsertBatch(
+            self.entity_class.__name__,
+            _to_go_bytes(json_dumps(entities_data)),
+            _to_go_bytes(json_dumps(options)),
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"UpsertBatch error: {error}")
+
+        result = _from_go_bytes(result)
+        if result:
+            primary_key = self.entity_class._takeo_primary_key
+            for entity, entity_id in zip(entities, json_loads(result)):
+                setattr(entity, primary_key, entity_id)
+
+        # The written entities replace any tracked instance of the same rows
+        if self._identity_map is not None:
+            for entity in entities:
+                self._identity_map.add(entity)
 
         return entities
 
     def findOne(self, id: int) -> Optional[Any]:
         """Trouve une entité par ID (style TypeORM)"""
+        if self._identity_map is not None:
+            entity = self._identity_map.get(self.entity_class, id)
+            if entity is not None:
+                return entity
+
         result = self._api.FindByID(self.entity_class.__name__, id)
 
-        # Gestion flexible du résultat (tuple ou string directe)
+        # Gestion flexible du résultat (tuple ou buffer direct)
         if isinstance(result, tuple):
-            json_str, error = result
+            result, error = result
             if error:
                 raise Exception(f"FindOne error: {error}")
-            json_to_parse = json_str
-        else:
-            # Résultat direct en string JSON
-            json_to_parse = result
+        json_to_parse = _from_go_bytes(result)
 
         if json_to_parse:
             try:
-                data = json_loads(json_to_parse)
-                return self._dict_to_entity(data)
-            except json.JSONDecodeError as e:
+                entities = self._rows_to_entities(json_loads(json_to_parse))
+            except ValueError as e:
                 raise Exception(f"JSON decode error: {e}")
+            if entities:
+                return self._merge(entities)[0]
         return None
 
-    def find(self) -> List[Any]:
-        """Trouve toutes les entités (style TypeORM)"""
-        result = self._api.FindAll(self.entity_class.__name__)
+    def findByIds(self, ids: List[int]) -> List[Optional[Any]]:
+        """Trouve plusieurs entités par ID en une seule requête.
 
-        # Gestion flexible du résultat (tuple ou string directe)
+        Le résultat suit l'ordre de ids, avec None pour les IDs introuvables.
+        """
+        if not ids:
+            return []
+
+        # Only ids missing from the identity map go to the database
+        cached = {}
+        if self._identity_map is not None:
+            for id in ids:
+                entity = self._identity_map.get(self.entity_class, id)
+                if entity is not None:
+                    cached[id] = entity
+            if len(cached) == len(ids):
+                return [cached[id] for id in ids]
+        missing = [id for id in ids if id not in cached]
+
+        result = self._api.FindByIDs(
+            self.entity_class.__name__, _to_go_bytes(json_dumps(missing))
+        )
         if isinstance(result, tuple):
-            json_str, error = result
+            result, error = result
             if error:
-                raise Exception(f"Find error: {error}")
-            json_to_parse = json_str
+                raise Exception(f"FindByIds error: {error}")
+        json_to_parse = _from_go_bytes(result)
+
+        entities = []
+        if json_to_parse:
+            try:
+                entities = self._rows_to_entities(json_loads(json_to_parse))
+            except ValueError as e:
+                raise Exception(f"JSON decode error: {e}")
+
+        # The database returns rows in its own order: put them back in input order
+        primary_key = self.entity_class._takeo_primary_key
+        by_id = {getattr(entity, primary_key): entity for entity in self._merge(entities)}
+        by_id.update(cached)
+        return [by_id.get(id) for id in ids]
+
+    def find(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        order_by: Any = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        parallel: Optional[int] = None,
+    ) -> List[Any]:
+        """Trouve les entités (style TypeORM), filtrées et triées si demandé.
+
+        where: {"age": 30, "name": ("LIKE", "A%"), "id": ("IN", [1, 2]), "deleted_at": None}
+        order_by: "age", "-age" (DESC), une liste de ces valeurs ou {"age": "DESC"}
+        parallel: nombre de tranches de clé primaire lues en même temps côté Go, sur
+        autant de connexions du pool (sans effet avec limit/offset ou un tri autre
+        que la clé primaire)
+        """
+        if parallel is not None and parallel > 1:
+            query = self._build_query(where, order_by, limit, offset)
+            result = self._api.FindQueryParallel(
+                self.entity_class.__name__, _to_go_bytes(json_dumps(query)), parallel
+            )
+        elif where is None and order_by is None and limit is None and offset is None:
+            result = self._api.FindAll(self.entity_class.__name__)
         else:
-            # Résultat direct en string JSON
-            json_to_parse = result
+            query = self._build_query(where, order_by, limit, offset)
+            result = self._api.FindQuery(
+                self.entity_class.__name__, _to_go_bytes(json_dumps(query))
+            )
+
+        # Gestion flexible du résultat (tuple ou buffer direct)
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"Find error: {error}")
+        json_to_parse = _from_go_bytes(result)
 
         if json_to_parse:
             try:
-                data = json_loads(json_to_parse)
-                if isinstance(data, list):
-                    return [self._dict_to_entity(item) for item in data]
-            except json.JSONDecodeError as e:
+                return self._merge(self._rows_to_entities(json_loads(json_to_parse)))
+            except ValueError as e:
                 raise Exception(f"JSON decode error: {e}")
         return []
 
+    def findColumns(self, columns: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Lit des colonnes entières pour l'analytique, sans construire d'entités.
+
+        Retourne un dict colonne -> tableau NumPy (array.array sans NumPy) pour les
+        colonnes numériques, et une liste pour les autres colonnes.
+        """
+        column_names = [self._column_mapping.get(name, name) for name in columns or []]
+
+        result = self._api.FindColumns(
+            self.entity_class.__name__, _to_go_bytes(json_dumps(column_names))
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"FindColumns error: {error}")
+
+        return _decode_columnar_frame(_from_go_bytes(result))
+
+    def findIter(
+        self, batch_size: int = 1000, parallel: Optional[int] = None
+    ) -> Iterator[Any]:
+        """Itère sur toutes les entités par pages, sans charger la table en mémoire.
+
+        parallel lit autant de tranches de clé primaire en même temps côté Go;
+        les pages arrivent alors dans un ordre quelconque.
+        """
+        if parallel is not None and parallel > 1:
+            query = self._build_query(None, None, None, None)
+            cursor_id = self._api.OpenParallelCursor(
+                self.entity_class.__name__,
+                _to_go_bytes(json_dumps(query)),
+                parallel,
+                batch_size,
+            )
+        else:
+            cursor_id = self._api.OpenCursor(self.entity_class.__name__, batch_size)
+        if isinstance(cursor_id, tuple):
+            cursor_id, error = cursor_id
+            if error:
+                raise Exception(f"FindIter error: {error}")
+
+        try:
+            while True:
+                page = self._api.FetchCursor(cursor_id)
+                if isinstance(page, tuple):
+                    page, error = page
+                    if error:
+                        raise Exception(f"FindIter error: {error}")
+
+                # Empty page: the Go cursor is exhausted and already closed
+                page = _from_go_bytes(page)
+                entities = self._rows_to_entities(json_loads(page)) if page else None
+                if not entities:
+                    break
+                yield from self._merge(entities)
+        finally:
+            # Release the pooled connection if the caller stops early
+            self._api.CloseCursor(cursor_id)
+
     def update(self, id: int, update_data: Dict[str, Any]):
         """Met à jour une entité (style TypeORM)"""
         update_json = json_dumps(update_data)
-        result = self._api.Update(self.entity_class.__name__, id, update_json)
+        result = self._api.Update(
+            self.entity_class.__name__, id, _to_go_bytes(update_json)
+        )
         if result:
             raise Exception(f"Update error: {result}")
 
+        if self._identity_map is not None:
+            self._identity_map.update(self.entity_class, id, self._attribute_values(update_data))
+
+    def updateBatch(self, updates) -> int:
+        """Met à jour plusieurs entités en une transaction.
+
+        updates: {id: {"champ": valeur, ...}, ...} ou une liste de paires (id, dict).
+        Les lignes sont groupées par champs modifiés côté Go. Retourne le nombre
+        de lignes modifiées.
+        """
+        if not updates:
+            return 0
+
+        result = self._api.UpdateBatch(
+            self.entity_class.__name__, _to_go_bytes(json_dumps(self._update_payload(updates)))
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"UpdateBatch error: {error}")
+
+        if self._identity_map is not None:
+            items = updates.items() if isinstance(updates, dict) else updates
+            for id, update_data in items:
+                self._identity_map.update(
+                    self.entity_class, id, self._attribute_values(update_data)
+                )
+        return result
+
     def delete(self, id: int):
         """Supprime une entité (style TypeORM)"""
         result = self._api.Delete(self.entity_class.__name__, id)
         if result:
             raise Exception(f"Delete error: {result}")
 
+        if self._identity_map is not None:
+            self._identity_map.remove(self.entity_class, id)
+
+    def deleteMany(self, ids: List[int]) -> int:
+        """Supprime plusieurs entités par ID en une seule requête, retourne le nombre supprimé"""
+        if not ids:
+            return 0
+
+        result = self._api.DeleteBatch(
+            self.entity_class.__name__, _to_go_bytes(json_dumps(list(ids)))
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"DeleteMany error: {error}")
+
+        if self._identity_map is not None:
+            for id in ids:
+                self._identity_map.remove(self.entity_class, id)
+        return result
+
+    def deleteWhere(self, where: Dict[str, Any]) -> int:
+        """Supprime les entités filtrées (même syntaxe where que find), retourne le nombre supprimé"""
+        # An empty filter is rejected in Go rather than deleting the whole table
+        query = {"where": self._build_conditions(where)}
+        result = self._api.DeleteWhere(
+            self.entity_class.__name__, _to_go_bytes(json_dumps(query))
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"DeleteWhere error: {error}")
+
+        # The deleted ids are unknown: forget every tracked entity of this class
+        if self._identity_map is not None:
+            self._identity_map.evict(self.entity_class)
+        return result
+
+    def _merge(self, entities: List[Any]) -> List[Any]:
+        """Remplace les entités déjà présentes dans l'identity map par l'instance suivie"""
+        if self._identity_map is None:
+            return entities
+        return [self._identity_map.merge(entity) for entity in entities]
+
+    def _update_payload(self, updates) -> List[Dict[str, Any]]:
+        """Mises à jour au format UpdateData de Go : [{"id": 1, "updates": {colonne: valeur}}]"""
+        column_mapping = self._column_mapping
+
+        items = updates.items() if isinstance(updates, dict) else updates
+        return [
+            {
+                "id": id,
+                "updates": {
+                    column_mapping.get(name, name): value
+                    for name, value in update_data.items()
+                },
+            }
+            for id, update_data in items
+        ]
+
+    def _attribute_values(self, update_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Valeurs d'une mise à jour par nom d'attribut (accepte attributs ou colonnes)"""
+        values = {}
+        for name, value in update_data.items():
+            attr_name = name if name in self._column_mapping else self._reverse_column_mapping.get(name)
+            if attr_name is not None:
+                values[attr_name] = value
+        return values
+
+    def _build_query(
+        self,
+        where: Optional[Dict[str, Any]],
+        order_by: Any,
+        limit: Optional[int],
+        offset: Optional[int],
+    ) -> Dict[str, Any]:
+        """Construit la Query JSON attendue par TakeoAPI.FindQuery"""
+        column_names = self._column_mapping
+        conditions = self._build_conditions(where)
+
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        elif isinstance(order_by, dict):
+            order_by = [
+                f"-{attr_name}" if direction.upper() == "DESC" else attr_name
+                for attr_name, direction in order_by.items()
+            ]
+        orders = []
+        for attr_name in order_by or []:
+            desc = attr_name.startswith("-")
+            attr_name = attr_name.lstrip("-")
+            orders.append({"column": column_names.get(attr_name, attr_name), "desc": desc})
+
+        return {"where": conditions, "order_by": orders, "limit": limit, "offset": offset}
+
+    def _build_conditions(self, where: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convertit un filtre where (voir find) en conditions JSON"""
+        column_names = self._column_mapping
+
+        conditions = []
+        for attr_name, condition in (where or {}).items():
+            column = column_names.get(attr_name, attr_name)
+            if condition is None:
+                conditions.append({"column": column, "op": "IS NULL"})
+            elif isinstance(condition, tuple):
+                # ("IS NOT NULL",) ou (operator, value)
+                op, *value = condition
+                conditions.append(
+                    {"column": column, "op": op, "value": value[0] if value else None}
+                )
+            else:
+                conditions.append({"column": column, "op": "=", "value": condition})
+        return conditions
+
     def _entity_to_dict(self, entity) -> Dict[str, Any]:
         """Convertit une entité en dictionnaire - optimisé"""
-        # Cache column mapping for better performance
-        if not hasattr(self, "_column_mapping"):
-            self._column_mapping = {
-                attr_name: col_meta["name"]
-                for attr_name, col_meta in self.entity_class._takeo_columns.items()
-            }
+        if self._to_row is not None:
+            return self._to_row(entity)
 
         # Fast dict comprehension instead of loop
         return {
@@ -295,21 +977,153 @@ class Repository:
             if hasattr(entity, attr_name) and getattr(entity, attr_name) is not None
         }
 
-    def _dict_to_entity(self, data: Dict[str, Any]):
-        """Convertit un dictionnaire en entité - optimisé"""
-        # Cache reverse column mapping
-        if not hasattr(self, "_reverse_column_mapping"):
-            self._reverse_column_mapping = {
-                col_meta["name"]: attr_name
-                for attr_name, col_meta in self.entity_class._takeo_columns.items()
-            }
+    def _rows_to_entities(self, row_set: Dict[str, Any]) -> List[Any]:
+        """Construit les entités depuis un RowSet positionnel {"columns": [...], "rows": [[...]]}"""
+        if self._row_loaders is not None:
+            # One generated loader per column layout, compiled on first use
+            columns = tuple(row_set["columns"])
+            loader = self._row_loaders.get(columns)
+            if loader is None:
+                loader = _compile_row_loader(self.entity_class, columns)
+                self._row_loaders[columns] = loader
+            return loader(row_set["rows"])
 
-        entity = self.entity_class()
-        # Fast batch setattr
-        for column_name, value in data.items():
-            if column_name in self._reverse_column_mapping:
-                setattr(entity, self._reverse_column_mapping[column_name], value)
-        return entity
+        # Resolve column positions once per result, not once per row
+        fields = [
+            (index, self._reverse_column_mapping[column_name])
+            for index, column_name in enumerate(row_set["columns"])
+            if column_name in self._reverse_column_mapping
+        ]
+
+        rows = row_set["rows"]
+        decimals = [
+            index
+            for index, column_name in enumerate(row_set["columns"])
+            if column_name in self._decimal_columns
+        ]
+        if decimals:
+            # NUMERIC arrives as exact text
+            for row in rows:
+                for index in decimals:
+                    if row[index] is not None:
+                        row[index] = Decimal(row[index])
+
+        entity_class = self.entity_class
+        entities = []
+        for row in rows:
+            entity = entity_class()
+            for index, attr_name in fields:
+                setattr(entity, attr_name, row[index])
+            entities.append(entity)
+        return entities
+
+
+class IdentityMap:
+    """Cache de premier niveau : une seule instance par (classe d'entité, clé primaire).
+
+    Les lectures retournent l'instance déjà chargée, sans requête pour findOne et
+    findByIds; les écritures des repositories (save, update, delete...) la tiennent
+    à jour. Les écritures faites ailleurs (autre processus, SQL direct) ne sont pas
+    vues : appeler clear() aux frontières de requête.
+    """
+
+    def __init__(self):
+        self._entities: Dict[Tuple[Type, Any], Any] = {}
+
+    def get(self, entity_class: Type, entity_id: Any) -> Optional[Any]:
+        """Retourne l'instance suivie, ou None"""
+        return self._entities.get((entity_class, entity_id))
+
+    def add(self, entity):
+        """Suit entity, en remplaçant l'instance suivie pour la même ligne"""
+        entity_id = getattr(entity, type(entity)._takeo_primary_key, None)
+        if entity_id is not None:
+            self._entities[(type(entity), entity_id)] = entity
+
+    def merge(self, entity) -> Any:
+        """Retourne l'instance suivie pour la ligne de entity, en suivant entity sinon"""
+        key = (type(entity), getattr(entity, type(entity)._takeo_primary_key, None))
+        if key[1] is None:
+            return entity
+        return self._entities.setdefault(key, entity)
+
+    def update(self, entity_class: Type, entity_id: Any, values: Dict[str, Any]):
+        """Applique des valeurs (par nom d'attribut) à l'instance suivie"""
+        entity = self._entities.get((entity_class, entity_id))
+        if entity is not None:
+            for attr_name, value in values.items():
+                setattr(entity, attr_name, value)
+
+    def remove(self, entity_class: Type, entity_id: Any):
+        """Oublie une ligne"""
+        self._entities.pop((entity_class, entity_id), None)
+
+    def evict(self, entity_class: Type):
+        """Oublie toutes les lignes d'une classe d'entité"""
+        for key in [key for key in self._entities if key[0] is entity_class]:
+            del self._entities[key]
+
+    def clear(self):
+        """Oublie toutes les entités"""
+        self._entities.clear()
+
+    def __len__(self) -> int:
+        return len(self._entities)
+
+
+class SaveFuture:
+    """Résultat d'une sauvegarde write-behind (voir Repository.saveDeferred)"""
+
+    def __init__(self, api, entity, ticket: int):
+        self._api = api
+        self._entity = entity
+        self._ticket = ticket
+        self._resolved = False
+        self._error = None
+
+    def done(self) -> bool:
+        """Indique si le lot contenant la sauvegarde a été écrit"""
+        return self._resolved or bool(self._api.SaveDone(self._ticket))
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """Attend l'écriture (timeout en secondes) et retourne l'entité avec son ID"""
+        self._resolve(timeout)
+        if self._error is not None:
+            raise Exception(f"Save error: {self._error}")
+        return self._entity
+
+    def exception(self, timeout: Optional[float] = None) -> Optional[Exception]:
+        """Attend l'écriture et retourne l'erreur éventuelle (None si succès)"""
+        self._resolve(timeout)
+        return Exception(f"Save error: {self._error}") if self._error is not None else None
+
+    def _resolve(self, timeout: Optional[float]):
+        if self._resolved:
+            return
+
+        timeout_ms = int(timeout * 1000) if timeout is not None else 0
+        if timeout is not None and timeout_ms <= 0:
+            timeout_ms = 1
+        result = self._api.AwaitSave(self._ticket, timeout_ms)
+        error = None
+        if isinstance(result, tuple):
+            result, error = result
+        if error and "timed out" in str(error):
+            raise TimeoutError(f"Save error: {error}")
+
+        self._resolved = True
+        if error:
+            self._error = error
+        else:
+            setattr(self._entity, type(self._entity)._takeo_primary_key, result)
+
+    def __del__(self):
+        # The save still happens; only the id is dropped on the Go side
+        if not getattr(self, "_resolved", True):
+            try:
+                self._api.ReleaseSave(self._ticket)
+            except Exception:
+                pass
 
 
 def createConnection(
@@ -319,6 +1133,39 @@ def createConnection(
     password: str,
     database: str,
     sslmode: str = "disable",
+    copy_threshold: Optional[int] = None,
+    max_open_conns: Optional[int] = None,
+    max_idle_conns: Optional[int] = None,
+    conn_max_lifetime: Optional[float] = None,
+    conn_max_idle_time: Optional[float] = None,
+    stmt_cache_size: Optional[int] = None,
+    write_behind: bool = False,
+    write_behind_max_batch: Optional[int] = None,
+    write_behind_max_delay: Optional[float] = None,
+    identity_map: bool = False,
+    result_cache_size: Optional[int] = None,
+    cache_sync: bool = False,
+    cache_sync_channel: Optional[str] = None,
 ) -> TakeoPyTypeORM:
     """Crée une connexion Takeo-ORM (style TypeORM)"""
-    return TakeoPyTypeORM(host, port, user, password, database, sslmode)
+    return TakeoPyTypeORM(
+        host,
+        port,
+        user,
+        password,
+        database,
+        sslmode,
+        copy_threshold=copy_threshold,
+        max_open_conns=max_open_conns,
+        max_idle_conns=max_idle_conns,
+        conn_max_lifetime=conn_max_lifetime,
+        conn_max_idle_time=conn_max_idle_time,
+        stmt_cache_size=stmt_cache_size,
+        write_behind=write_behind,
+        write_behind_max_batch=write_behind_max_batch,
+        write_behind_max_delay=write_behind_max_delay,
+        identity_map=identity_map,
+        result_cache_size=result_cache_size,
+        cache_sync=cache_sync,
+        cache_sync_channel=cache_sync_channel,
+    )
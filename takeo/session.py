@@ -0,0 +1,189 @@
+"""
+Takeo-ORM - Unit of work
+Tracks loaded entities and writes new, changed and deleted ones in a single transaction
+"""
+
+import copy
+from typing import Dict, List, Any, Optional, Tuple, Type
+
+from .orm import json_dumps, json_loads, _to_go_bytes, _from_go_bytes
+
+
+class Session:
+    """Unité de travail : identity map des entités chargées et snapshot de leurs colonnes.
+
+    flush() compare chaque entité à son snapshot et envoie les insertions, les
+    colonnes modifiées et les suppressions en batch, dans une seule transaction.
+    Utilisé comme context manager, le flush a lieu à la sortie du bloc (sauf
+    exception, auquel cas les changements en attente sont abandonnés).
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._identity_map: Dict[Tuple[Type, Any], Any] = {}
+        # Snapshots and pending deletes are keyed by id(entity): the identity map
+        # keeps the entities alive, so ids cannot be reused while tracked
+        self._snapshots: Dict[int, Dict[str, Any]] = {}
+        self._new: List[Any] = []
+        self._deleted: Dict[int, Any] = {}
+
+    def get(self, entity_class: Type, entity_id: Any) -> Optional[Any]:
+        """Trouve une entité par ID, sans requête si elle est déjà chargée"""
+        entity = self._identity_map.get((entity_class, entity_id))
+        if entity is not None:
+            return None if id(entity) in self._deleted else entity
+
+        entity = self._connection.getRepository(entity_class).findOne(entity_id)
+        return self._merge(entity) if entity is not None else None
+
+    def find(self, entity_class: Type, *args, **kwargs) -> List[Any]:
+        """Comme Repository.find; les entités déjà chargées sont retournées telles quelles"""
+        entities = self._connection.getRepository(entity_class).find(*args, **kwargs)
+        return [self._merge(entity) for entity in entities]
+
+    def findByIds(self, entity_class: Type, ids: List[Any]) -> List[Optional[Any]]:
+        """Comme Repository.findByIds, en passant par l'identity map"""
+        entities = self._connection.getRepository(entity_class).findByIds(ids)
+        return [self._merge(entity) if entity is not None else None for entity in entities]
+
+    def add(self, entity) -> Any:
+        """Ajoute une entité : INSERT au flush si elle n'a pas d'ID, suivie sinon"""
+        if self._primary_key_value(entity) is None:
+            if not any(pending is entity for pending in self._new):
+                self._new.append(entity)
+            return entity
+        return self._merge(entity)
+
+    def delete(self, entity):
+        """Marque une entité pour suppression au prochain flush"""
+        for index, pending in enumerate(self._new):
+            if pending is entity:
+                del self._new[index]
+                return
+
+        if self._primary_key_value(entity) is not None:
+            self._merge(entity)
+            self._deleted[id(entity)] = entity
+
+    def flush(self):
+        """Écrit les changements en attente en une transaction (un batch par type et opération)"""
+        changes: Dict[Type, Dict[str, list]] = {}
+
+        def entity_changes(entity_class: Type) -> Dict[str, list]:
+            if entity_class not in changes:
+                self._connection.getRepository(entity_class)
+                changes[entity_class] = {"inserts": [], "updates": [], "deletes": []}
+            return changes[entity_class]
+
+        for entity in self._new:
+            repository = self._connection.getRepository(type(entity))
+            entity_changes(type(entity))["inserts"].append(repository._entity_to_dict(entity))
+
+        dirty = []
+        for (entity_class, entity_id), entity in self._identity_map.items():
+            if id(entity) in self._deleted:
+                continue
+            updates = self._changed_columns(entity)
+            if updates:
+                entity_changes(entity_class)["updates"].append(
+                    {"id": entity_id, "updates": updates}
+                )
+                dirty.append(entity)
+
+        for entity in self._deleted.values():
+            entity_changes(type(entity))["deletes"].append(self._primary_key_value(entity))
+
+        if not changes:
+            return
+
+        payload = [
+            {"entity": entity_class.__name__, **entity_change}
+            for entity_class, entity_change in changes.items()
+        ]
+        result = self._connection._api.ApplyChanges(_to_go_bytes(json_dumps(payload)))
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"Flush error: {error}")
+
+        # The connection's identity map did not see these writes
+        identity_map = self._connection._identity_map
+        if identity_map is not None:
+            for entity_class in changes:
+                identity_map.evict(entity_class)
+
+        # Inserted ids come back per entity type, in insertion order
+        inserted = {
+            entity_class: iter(ids)
+            for entity_class, ids in zip(changes, json_loads(_from_go_bytes(result)))
+        }
+        for entity in self._new:
+            setattr(entity, type(entity)._takeo_primary_key, next(inserted[type(entity)]))
+            self._merge(entity)
+
+        for entity in dirty:
+            self._snapshots[id(entity)] = self._snapshot(entity)
+
+        for entity in self._deleted.values():
+            self._identity_map.pop((type(entity), self._primary_key_value(entity)), None)
+            self._snapshots.pop(id(entity), None)
+
+        self._new = []
+        self._deleted = {}
+
+    def clear(self):
+        """Oublie toutes les entités suivies et les changements en attente"""
+        self._identity_map.clear()
+        self._snapshots.clear()
+        self._new = []
+        self._deleted = {}
+
+    def __enter__(self) -> "Session":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.flush()
+        finally:
+            self.clear()
+
+    def _merge(self, entity) -> Any:
+        """Retourne l'instance suivie pour cette clé, en suivant entity si elle est nouvelle"""
+        key = (type(entity), self._primary_key_value(entity))
+        tracked = self._identity_map.get(key)
+        if tracked is not None:
+            return tracked
+
+        self._identity_map[key] = entity
+        self._snapshots[id(entity)] = self._snapshot(entity)
+        return entity
+
+    def _snapshot(self, entity) -> Dict[str, Any]:
+        """Copie des valeurs de colonnes (les listes/dicts sont copiés pour détecter les mutations)"""
+        return {
+            attr_name: _copy_value(getattr(entity, attr_name, None))
+            for attr_name in type(entity)._takeo_columns
+        }
+
+    def _changed_columns(self, entity) -> Dict[str, Any]:
+        """Colonnes dont la valeur diffère du snapshot, par nom de colonne"""
+        entity_class = type(entity)
+        snapshot = self._snapshots[id(entity)]
+        return {
+            col_meta["name"]: getattr(entity, attr_name, None)
+            for attr_name, col_meta in entity_class._takeo_columns.items()
+            if attr_name != entity_class._takeo_primary_key
+            and getattr(entity, attr_name, None) != snapshot[attr_name]
+        }
+
+    @staticmethod
+    def _primary_key_value(entity) -> Any:
+        return getattr(entity, type(entity)._takeo_primary_key, None)
+
+
+def _copy_value(value: Any) -> Any:
+    """Copie profonde des valeurs mutables; les scalaires sont partagés"""
+    if isinstance(value, (list, dict, set)):
+        return copy.deepcopy(value)
+    return value
@@ -0,0 +1,222 @@
+"""
+Takeo-ORM - Transactions
+Repositories whose calls all run inside one Go transaction, on statements prepared on it
+"""
+
+from typing import Dict, List, Any, Optional, Type
+
+from .orm import Repository, json_dumps, json_loads, _to_go_bytes, _from_go_bytes
+
+
+class Transaction:
+    """Transaction ouverte côté Go.
+
+    Utilisée comme context manager : commit à la sortie du bloc, rollback si le
+    bloc lève une exception.
+    """
+
+    def __init__(self, connection):
+        self._connection = connection
+        self._api = connection._api
+        self._repositories = {}
+        self._finished = False
+
+        tx_id = self._api.BeginTransaction()
+        if isinstance(tx_id, tuple):
+            tx_id, error = tx_id
+            if error:
+                raise Exception(f"BeginTransaction error: {error}")
+        self._tx_id = tx_id
+
+    def getRepository(self, entity_class: Type) -> "TransactionRepository":
+        """Obtient le repository de l'entité lié à cette transaction"""
+        class_name = entity_class.__name__
+
+        if class_name not in self._repositories:
+            # Registers the entity in Go if needed
+            self._connection.getRepository(entity_class)
+            self._repositories[class_name] = TransactionRepository(
+                entity_class, self._api, self._tx_id
+            )
+
+        return self._repositories[class_name]
+
+    def commit(self):
+        """Valide la transaction"""
+        self._finish(self._api.Commit, "Commit")
+
+    def rollback(self):
+        """Annule la transaction"""
+        self._finish(self._api.Rollback, "Rollback")
+
+    def _finish(self, end, name: str):
+        if self._finished:
+            raise Exception(f"{name} error: transaction already finished")
+        self._finished = True
+        try:
+            result = end(self._tx_id)
+        finally:
+            # Writes made in the transaction bypassed the connection's identity map,
+            # and after a rollback the tracked instances may hold values that were
+            # never written: forget every entity class the transaction touched
+            identity_map = self._connection._identity_map
+            if identity_map is not None:
+                for repository in self._repositories.values():
+                    identity_map.evict(repository.entity_class)
+        if result:
+            raise Exception(f"{name} error: {result}")
+
+    def __enter__(self) -> "Transaction":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self._finished:
+            return
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
+
+
+class TransactionRepository(Repository):
+    """Repository dont les opérations s'exécutent dans une transaction"""
+
+    def __init__(self, entity_class: Type, api, tx_id: int):
+        super().__init__(entity_class, api)
+        self._tx_id = tx_id
+
+    def save(self, entity) -> Any:
+        """Sauvegarde une entité dans la transaction"""
+        result = self._api.TxSave(
+            self._tx_id,
+            self.entity_class.__name__,
+            _to_go_bytes(json_dumps(self._entity_to_dict(entity))),
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"Save error: {error}")
+
+        setattr(entity, self.entity_class._takeo_primary_key, result)
+        return entity
+
+    def saveBatch(self, entities: List[Any]) -> List[Any]:
+        """Sauvegarde plusieurs entités dans la transaction"""
+        if not entities:
+            return []
+
+        entities_data = [self._entity_to_dict(entity) for entity in entities]
+        result = self._api.TxSaveBatch(
+            self._tx_id, self.entity_class.__name__, _to_go_bytes(json_dumps(entities_data))
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"SaveBatch error: {error}")
+
+        result = _from_go_bytes(result)
+        if result:
+            primary_key = self.entity_class._takeo_primary_key
+            for entity, entity_id in zip(entities, json_loads(result)):
+                setattr(entity, primary_key, entity_id)
+
+        return entities
+
+    def findOne(self, id: int) -> Optional[Any]:
+        """Trouve une entité par ID, en voyant les écritures de la transaction"""
+        entities = self.find(where={self.entity_class._takeo_primary_key: id})
+        return entities[0] if entities else None
+
+    def findByIds(self, ids: List[int]) -> List[Optional[Any]]:
+        """Trouve plusieurs entités par ID dans la transaction (ordre de ids, None si absente)"""
+        if not ids:
+            return []
+
+        primary_key = self.entity_class._takeo_primary_key
+        entities = self.find(where={primary_key: ("IN", list(ids))})
+        by_id = {getattr(entity, primary_key): entity for entity in entities}
+        return [by_id.get(id) for id in ids]
+
+    def find(
+        self,
+        where: Optional[Dict[str, Any]] = None,
+        order_by: Any = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        parallel: Optional[int] = None,
+    ) -> List[Any]:
+        """Trouve les entités dans la transaction (même syntaxe que Repository.find).
+        parallel est ignoré : la transaction n'a qu'une connexion."""
+        query = self._build_query(where, order_by, limit, offset)
+        result = self._api.TxFindQuery(
+            self._tx_id, self.entity_class.__name__, _to_go_bytes(json_dumps(query))
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"Find error: {error}")
+
+        result = _from_go_bytes(result)
+        if result:
+            try:
+                return self._rows_to_entities(json_loads(result))
+            except ValueError as e:
+                raise Exception(f"JSON decode error: {e}")
+        return []
+
+    def update(self, id: int, update_data: Dict[str, Any]):
+        """Met à jour une entité dans la transaction"""
+        result = self._api.TxUpdate(
+            self._tx_id, self.entity_class.__name__, id, _to_go_bytes(json_dumps(update_data))
+        )
+        if result:
+            raise Exception(f"Update error: {result}")
+
+    def updateBatch(self, updates) -> int:
+        """Met à jour plusieurs entités dans la transaction (même format que
+        Repository.updateBatch), retourne le nombre de lignes modifiées"""
+        if not updates:
+            return 0
+
+        result = self._api.TxUpdateBatch(
+            self._tx_id,
+            self.entity_class.__name__,
+            _to_go_bytes(json_dumps(self._update_payload(updates))),
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"UpdateBatch error: {error}")
+        return result
+
+    def delete(self, id: int):
+        """Supprime une entité dans la transaction"""
+        result = self._api.TxDelete(self._tx_id, self.entity_class.__name__, id)
+        if result:
+            raise Exception(f"Delete error: {result}")
+
+    def deleteMany(self, ids: List[int]) -> int:
+        """Supprime plusieurs entités par ID dans la transaction, retourne le nombre supprimé"""
+        if not ids:
+            return 0
+
+        result = self._api.TxDeleteBatch(
+            self._tx_id, self.entity_class.__name__, _to_go_bytes(json_dumps(list(ids)))
+        )
+        if isinstance(result, tuple):
+            result, error = result
+            if error:
+                raise Exception(f"DeleteMany error: {error}")
+        return result
+
+    def _not_in_transaction(self, *args, **kwargs):
+        raise Exception(
+            "Operation not available inside a transaction: use "
+            "find/save/saveBatch/update/updateBatch/delete/deleteMany"
+        )
+
+    # Streaming reads hold their own pooled connection in Go, the Go
+    # transaction has no upsert or filtered delete, and deferred saves are
+    # written by the write-behind queue, outside the transaction
+    findColumns = findIter = _not_in_transaction
+    upsertBatch = deleteWhere = saveDeferred = _not_in_transaction
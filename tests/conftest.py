@@ -0,0 +1,241 @@
+"""
+Shared fixtures for the takeo package tests
+
+The Go bindings (takeo.core) are replaced by a stub when they are not built, and
+connections get a FakeAPI: an in-memory stand-in for core.TakeoAPI that follows
+its calling conventions (JSON []byte in and out, (value, error) tuples).
+"""
+
+import copy
+import json
+import sys
+import types
+
+import pytest
+
+try:
+    from takeo.core import core, go  # noqa: F401
+except ImportError:
+    _core_package = types.ModuleType("takeo.core")
+    _core_package.__path__ = []
+    _core_package.core = types.ModuleType("takeo.core.core")
+    _core_package.go = types.ModuleType("takeo.core.go")
+    _core_package.go.Slice_byte = type(
+        "Slice_byte", (), {"from_bytes": staticmethod(bytes)}
+    )
+    sys.modules["takeo.core"] = _core_package
+    sys.modules["takeo.core.core"] = _core_package.core
+    sys.modules["takeo.core.go"] = _core_package.go
+
+import takeo.orm  # noqa: E402
+
+
+class FakeAPI:
+    """In-memory TakeoAPI. Every call is recorded in calls as (method, args)."""
+
+    # Entity registrations outlive a connection, like the _takeo_registered flag
+    schemas = {}
+
+    def __init__(self, *connection_args):
+        self.tables = {}
+        self.next_id = 0
+        self.calls = []
+        self.transactions = {}
+        self.next_tx_id = 0
+
+    def __getattribute__(self, name):
+        attr = object.__getattribute__(self, name)
+        if name[:1].isupper() and callable(attr):
+
+            def recorded(*args):
+                object.__getattribute__(self, "calls").append((name, args))
+                return attr(*args)
+
+            return recorded
+        return attr
+
+    def method_calls(self, name):
+        """Arguments of every recorded call to method name"""
+        return [args for method, args in self.calls if method == name]
+
+    # Registration
+
+    def RegisterEntity(self, name, table_name, columns_json, primary_key):
+        columns = list(json.loads(bytes(columns_json)))
+        FakeAPI.schemas[name] = (columns, primary_key)
+
+    # Reads
+
+    def FindByID(self, entity, id):
+        row = self._table(entity).get(id)
+        return self._row_set(entity, [row] if row else []), None
+
+    def FindByIDs(self, entity, ids_json):
+        table = self._table(entity)
+        rows = [table[id] for id in sorted(set(json.loads(bytes(ids_json)))) if id in table]
+        return self._row_set(entity, rows), None
+
+    def FindAll(self, entity):
+        return self._row_set(entity, list(self._table(entity).values())), None
+
+    def FindQuery(self, entity, query_json):
+        return self._find(self.tables, entity, json.loads(bytes(query_json))), None
+
+    # Writes
+
+    def Save(self, entity, data_json):
+        return self._insert(self.tables, entity, json.loads(bytes(data_json))), None
+
+    def SaveBatch(self, entity, entities_json):
+        rows = json.loads(bytes(entities_json))
+        return json.dumps([self._insert(self.tables, entity, row) for row in rows]).encode(), None
+
+    def Update(self, entity, id, update_json):
+        return self._update(self.tables, entity, id, json.loads(bytes(update_json)))
+
+    def UpdateBatch(self, entity, updates_json):
+        return self._update_batch(self.tables, entity, json.loads(bytes(updates_json))), None
+
+    def Delete(self, entity, id):
+        self._table(entity).pop(id, None)
+        return ""
+
+    def DeleteBatch(self, entity, ids_json):
+        return self._delete(self.tables, entity, json.loads(bytes(ids_json))), None
+
+    def DeleteWhere(self, entity, query_json):
+        query = json.loads(bytes(query_json))
+        matches = self._matches(self.tables, entity, query["where"])
+        return self._delete(self.tables, entity, [row[self._primary_key(entity)] for row in matches]), None
+
+    def ApplyChanges(self, changes_json):
+        tables = copy.deepcopy(self.tables)
+        changes = json.loads(bytes(changes_json))
+        inserted = [
+            [self._insert(tables, change["entity"], row) for row in change["inserts"]]
+            for change in changes
+        ]
+        for change in changes:
+            if change["updates"]:
+                self._update_batch(tables, change["entity"], change["updates"])
+        for change in reversed(changes):
+            self._delete(tables, change["entity"], change["deletes"])
+        self.tables = tables
+        return json.dumps(inserted).encode(), None
+
+    # Transactions: writes go to a copy of the tables, swapped in on commit
+
+    def BeginTransaction(self):
+        self.next_tx_id += 1
+        self.transactions[self.next_tx_id] = copy.deepcopy(self.tables)
+        return self.next_tx_id, None
+
+    def Commit(self, tx_id):
+        self.tables = self.transactions.pop(tx_id)
+        return ""
+
+    def Rollback(self, tx_id):
+        self.transactions.pop(tx_id)
+        return ""
+
+    def TxSave(self, tx_id, entity, data_json):
+        return self._insert(self.transactions[tx_id], entity, json.loads(bytes(data_json))), None
+
+    def TxSaveBatch(self, tx_id, entity, entities_json):
+        tables = self.transactions[tx_id]
+        rows = json.loads(bytes(entities_json))
+        return json.dumps([self._insert(tables, entity, row) for row in rows]).encode(), None
+
+    def TxUpdate(self, tx_id, entity, id, update_json):
+        return self._update(self.transactions[tx_id], entity, id, json.loads(bytes(update_json)))
+
+    def TxUpdateBatch(self, tx_id, entity, updates_json):
+        return self._update_batch(self.transactions[tx_id], entity, json.loads(bytes(updates_json))), None
+
+    def TxDelete(self, tx_id, entity, id):
+        self.transactions[tx_id].get(entity, {}).pop(id, None)
+        return ""
+
+    def TxDeleteBatch(self, tx_id, entity, ids_json):
+        return self._delete(self.transactions[tx_id], entity, json.loads(bytes(ids_json))), None
+
+    def TxFindQuery(self, tx_id, entity, query_json):
+        return self._find(self.transactions[tx_id], entity, json.loads(bytes(query_json))), None
+
+    # Helpers
+
+    def _table(self, entity, tables=None):
+        return (self.tables if tables is None else tables).setdefault(entity, {})
+
+    def _primary_key(self, entity):
+        return FakeAPI.schemas[entity][1]
+
+    def _row_set(self, entity, rows):
+        columns = FakeAPI.schemas[entity][0]
+        return json.dumps(
+            {"columns": columns, "rows": [[row.get(column) for column in columns] for row in rows]}
+        ).encode()
+
+    def _insert(self, tables, entity, data):
+        self.next_id += 1
+        row = dict(data)
+        row[self._primary_key(entity)] = self.next_id
+        self._table(entity, tables)[self.next_id] = row
+        return self.next_id
+
+    def _update(self, tables, entity, id, updates):
+        row = self._table(entity, tables).get(id)
+        if row is None:
+            return f"entity with id {id} not found"
+        row.update(updates)
+        return ""
+
+    def _update_batch(self, tables, entity, updates):
+        table = self._table(entity, tables)
+        affected = 0
+        for update in updates:
+            if update["id"] in table:
+                table[update["id"]].update(update["updates"])
+                affected += 1
+        return affected
+
+    def _delete(self, tables, entity, ids):
+        table = self._table(entity, tables)
+        return sum(table.pop(id, None) is not None for id in ids)
+
+    def _matches(self, tables, entity, conditions):
+        def match(row, condition):
+            value = row.get(condition["column"])
+            if condition["op"] == "IN":
+                return value in condition["value"]
+            return value == condition["value"]
+
+        return [
+            row
+            for row in self._table(entity, tables).values()
+            if all(match(row, condition) for condition in conditions or [])
+        ]
+
+    def _find(self, tables, entity, query):
+        return self._row_set(entity, self._matches(tables, entity, query.get("where")))
+
+
+@pytest.fixture
+def api(monkeypatch):
+    """FakeAPI returned by core.NewTakeoAPI for the connections of a test"""
+    fake = FakeAPI()
+    monkeypatch.setattr(takeo.orm.core, "NewTakeoAPI", lambda *args: fake, raising=False)
+    return fake
+
+
+@pytest.fixture
+def connection(api):
+    return takeo.orm.createConnection("localhost", 5432, "user", "password", "db")
+
+
+@pytest.fixture
+def tracked_connection(api):
+    """Connection with an identity map"""
+    return takeo.orm.createConnection(
+        "localhost", 5432, "user", "password", "db", identity_map=True
+    )
@@ -0,0 +1,170 @@
+"""
+Tests for the @Entity(compiled=True) and @Entity(slots=True) options
+"""
+
+import pickle
+
+import pytest
+
+from takeo import Entity, PrimaryGeneratedColumn, Column
+from takeo.orm import _compile_row_loader, _compile_to_row
+
+
+@Entity("compiled_users", compiled=True)
+class CompiledUser:
+    id = PrimaryGeneratedColumn()
+    name = Column("TEXT")
+    age = Column("INTEGER")
+
+    def __init__(self):
+        raise AssertionError("loaded entities must not call __init__")
+
+
+class Base:
+    __slots__ = ()
+
+    def __init__(self):
+        self.initialized = True
+
+    def describe(self):
+        return "base"
+
+
+@Entity("slotted_users", slots=True)
+class SlottedUser(Base):
+    id = PrimaryGeneratedColumn()
+    name = Column("TEXT")
+    initialized = Column("BOOLEAN")
+
+    def __init__(self, name=None):
+        super().__init__()
+        self.id = None
+        self.name = name
+
+    def describe(self):
+        return "slotted " + super().describe()
+
+    @classmethod
+    def create(cls, name):
+        return cls(name)
+
+    @property
+    def label(self):
+        return f"{self.name} ({super().describe()})"
+
+
+@Entity("fast_users", compiled=True, slots=True)
+class FastUser:
+    id = PrimaryGeneratedColumn()
+    name = Column("TEXT")
+    email = Column("TEXT")
+
+
+def test_compile_to_row_omits_none_columns():
+    """Test the generated to_row maps columns and skips None like _entity_to_dict"""
+    to_row = _compile_to_row(CompiledUser)
+
+    entity = object.__new__(CompiledUser)
+    entity.id = None
+    entity.name = "Ada"
+    entity.age = 0
+
+    assert to_row(entity) == {"name": "Ada", "age": 0}
+
+
+def test_compile_row_loader_follows_column_order():
+    """Test the generated loader assigns by position and ignores unknown columns"""
+    load_rows = _compile_row_loader(CompiledUser, ("age", "extra", "id", "name"))
+
+    first, second = load_rows([[36, "x", 1, "Ada"], [41, "y", 2, "Bob"]])
+
+    assert type(first) is CompiledUser
+    assert (first.id, first.name, first.age) == (1, "Ada", 36)
+    assert (second.id, second.name, second.age) == (2, "Bob", 41)
+    assert not hasattr(first, "extra")
+
+
+def test_compile_row_loader_null_columns():
+    """Test NULL columns are loaded as None"""
+    load_rows = _compile_row_loader(CompiledUser, ("id", "name", "age"))
+
+    (entity,) = load_rows([[1, None, None]])
+
+    assert entity.name is None
+    assert entity.age is None
+
+
+def test_compiled_repository_round_trip(connection):
+    """Test compiled entities are saved and loaded through the generated converters"""
+    repository = connection.getRepository(CompiledUser)
+    entity = object.__new__(CompiledUser)
+    entity.id, entity.name, entity.age = None, "Ada", None
+    repository.save(entity)
+
+    (loaded,) = repository.find()
+
+    assert (loaded.id, loaded.name, loaded.age) == (entity.id, "Ada", None)
+    assert len(CompiledUser._takeo_row_loaders) == 1
+
+
+def test_slots_replace_instance_dict():
+    """Test slots=True gives instances __slots__ on the columns and no __dict__"""
+    user = SlottedUser("Ada")
+
+    assert SlottedUser.__slots__ == ("id", "name", "initialized")
+    assert not hasattr(user, "__dict__")
+    with pytest.raises(AttributeError):
+        user.nickname = "A"
+
+
+def test_slots_keep_zero_argument_super():
+    """Test methods using super() work on the rebuilt class"""
+    user = SlottedUser.create("Ada")
+
+    assert user.initialized is True
+    assert user.describe() == "slotted base"
+    assert user.label == "Ada (base)"
+    assert isinstance(user, Base)
+
+
+def test_slots_repository_round_trip(connection):
+    """Test slotted entities are saved and loaded, with NULL and unset columns"""
+    repository = connection.getRepository(SlottedUser)
+    user = SlottedUser("Ada")
+    del user.initialized
+    repository.save(user)
+
+    loaded = repository.findOne(user.id)
+
+    assert loaded is not user
+    assert (loaded.id, loaded.name, loaded.initialized) == (user.id, "Ada", None)
+
+
+def test_compiled_slots_round_trip(connection):
+    """Test compiled=True and slots=True together"""
+    repository = connection.getRepository(FastUser)
+    user = FastUser()
+    user.name = "Ada"
+    repository.save(user)
+
+    (loaded,) = repository.findByIds([user.id])
+
+    assert not hasattr(loaded, "__dict__")
+    assert (loaded.id, loaded.name, loaded.email) == (user.id, "Ada", None)
+
+
+class Models:
+    @Entity("nested_slotted_users", slots=True)
+    class NestedUser:
+        id = PrimaryGeneratedColumn()
+        name = Column("TEXT")
+
+
+def test_slots_keep_qualname_for_pickle():
+    """Test a nested slotted entity keeps its __qualname__ and pickles"""
+    user = Models.NestedUser()
+    user.id, user.name = 1, "Ada"
+
+    assert Models.NestedUser.__qualname__ == "Models.NestedUser"
+    loaded = pickle.loads(pickle.dumps(user))
+    assert (loaded.id, loaded.name) == (1, "Ada")
@@ -0,0 +1,135 @@
+"""
+Tests for the identity map (createConnection(..., identity_map=True))
+"""
+
+import json
+
+import pytest
+
+from takeo import Entity, PrimaryGeneratedColumn, Column
+
+
+@Entity("identity_users")
+class User:
+    id = PrimaryGeneratedColumn()
+    name = Column("TEXT")
+    team = Column("TEXT")
+
+    def __init__(self, name=None, team=None):
+        self.id = None
+        self.name = name
+        self.team = team
+
+
+@pytest.fixture
+def users(tracked_connection):
+    repository = tracked_connection.getRepository(User)
+    repository.saveBatch([User("ada", "red"), User("bob", "red"), User("cy", "blue")])
+    tracked_connection.clearIdentityMap()
+    return repository
+
+
+def test_repeat_reads_return_the_tracked_instance(users, api):
+    """Test findOne, findByIds and find return the same instance for a row"""
+    ada = users.findOne(1)
+
+    assert users.findOne(1) is ada
+    assert len(api.method_calls("FindByID")) == 1
+
+    found = users.findByIds([2, 1, 9])
+    assert found[1] is ada
+    assert found[2] is None
+    assert users.findByIds([1, 2]) == [ada, found[0]]
+    # Only the ids missing from the map were read
+    assert [json.loads(bytes(args[1])) for args in api.method_calls("FindByIDs")] == [[2, 9]]
+
+    everyone = users.find()
+    assert everyone[0] is ada and everyone[1] is found[0]
+    assert users.find({"team": "blue"})[0] is everyone[2]
+
+
+def test_saved_entities_are_tracked(tracked_connection, api):
+    """Test save and saveBatch track the instances they write"""
+    repository = tracked_connection.getRepository(User)
+    ada = repository.save(User("ada"))
+    bob, cy = repository.saveBatch([User("bob"), User("cy")])
+
+    assert repository.findOne(ada.id) is ada
+    assert repository.findByIds([bob.id, cy.id]) == [bob, cy]
+    assert api.method_calls("FindByID") == []
+    assert api.method_calls("FindByIDs") == []
+
+
+def test_updates_are_applied_to_the_tracked_instance(users):
+    """Test update and updateBatch change the tracked instance in place"""
+    ada, bob = users.findByIds([1, 2])
+
+    users.update(1, {"name": "ada l."})
+    users.updateBatch({2: {"team": "blue"}, 3: {"team": "red"}})
+
+    assert users.findOne(1) is ada and ada.name == "ada l."
+    assert bob.team == "blue"
+    assert users.findOne(3).team == "red"
+
+
+def test_deleted_rows_are_forgotten(tracked_connection, users):
+    """Test delete and deleteMany leave no stale instance"""
+    users.find()
+
+    users.delete(1)
+    users.deleteMany([2])
+
+    assert users.findOne(1) is None
+    assert users.findByIds([1, 2, 3])[:2] == [None, None]
+    assert len(tracked_connection._identity_map) == 1
+
+
+def test_delete_where_forgets_the_class(tracked_connection, users):
+    """Test deleteWhere evicts every tracked entity of the class"""
+    ada, bob, cy = users.find()
+
+    assert users.deleteWhere({"team": "red"}) == 2
+
+    assert len(tracked_connection._identity_map) == 0
+    assert users.findOne(1) is None
+    assert users.findOne(2) is None
+    reloaded = users.findOne(3)
+    assert reloaded is not cy and reloaded.name == "cy"
+
+
+def test_transaction_writes_reach_the_map_on_commit(tracked_connection, users):
+    """Test rows written in a committed transaction are reloaded, deleted ones gone"""
+    ada, bob, cy = users.find()
+
+    with tracked_connection.transaction() as tx:
+        tx_users = tx.getRepository(User)
+        tx_users.update(1, {"name": "ada l."})
+        tx_users.delete(2)
+        # The map still serves the committed state during the transaction
+        assert users.findOne(1) is ada and ada.name == "ada"
+
+    assert users.findOne(1).name == "ada l."
+    assert users.findOne(2) is None
+    assert users.findOne(3) is not cy
+
+
+def test_transaction_rollback_restores_committed_state(tracked_connection, users):
+    """Test a rolled back transaction leaves no instance holding its writes"""
+    ada = users.findOne(1)
+
+    tx = tracked_connection.transaction()
+    tx.getRepository(User).delete(1)
+    tx.rollback()
+
+    assert len(tracked_connection._identity_map) == 0
+    reloaded = users.findOne(1)
+    assert reloaded is not ada and reloaded.name == "ada"
+
+
+def test_without_identity_map_reads_return_new_instances(connection):
+    """Test repeat reads return distinct instances when the option is off"""
+    repository = connection.getRepository(User)
+    repository.save(User("ada"))
+
+    assert repository.findOne(1) is not repository.findOne(1)
+    assert connection._identity_map is None
@@ -0,0 +1,78 @@
+"""
+Tests for NUMERIC/DECIMAL columns, which Go sends as exact text
+"""
+
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from takeo import Entity, PrimaryGeneratedColumn, Column
+from takeo.orm import _is_decimal_annotation, json_dumps, json_loads
+
+PRECISE = "12345678901234567890.123456789012345678"
+
+
+@Entity("numeric_prices")
+class Price:
+    id = PrimaryGeneratedColumn()
+    amount: Decimal = Column("NUMERIC(40, 18)")
+    fee: Optional[Decimal] = Column("NUMERIC(12, 2)")
+    label = Column("NUMERIC(12, 2)")
+
+    def __init__(self, amount=None, fee=None, label=None):
+        self.id = None
+        self.amount = amount
+        self.fee = fee
+        self.label = label
+
+
+@Entity("numeric_compiled_prices", compiled=True)
+class CompiledPrice:
+    id = PrimaryGeneratedColumn()
+    amount: Decimal = Column("NUMERIC(40, 18)")
+
+    def __init__(self, amount=None):
+        self.id = None
+        self.amount = amount
+
+
+@pytest.mark.parametrize("repository_class", [Price, CompiledPrice])
+def test_decimal_fields_keep_precision(connection, repository_class):
+    """Test a NUMERIC value round-trips exactly into a Decimal field"""
+    repository = connection.getRepository(repository_class)
+    repository.save(repository_class(Decimal(PRECISE)))
+
+    (loaded,) = repository.find()
+
+    assert isinstance(loaded.amount, Decimal)
+    assert loaded.amount == Decimal(PRECISE)
+
+
+def test_null_and_unannotated_numeric_columns(connection):
+    """Test NULL stays None and columns not annotated Decimal keep the text"""
+    repository = connection.getRepository(Price)
+    repository.save(Price(Decimal("1.5"), None, Decimal("2.50")))
+
+    loaded = repository.findOne(1)
+
+    assert loaded.fee is None
+    assert loaded.label == "2.50"
+
+
+def test_decimal_values_are_sent_as_text():
+    """Test Decimal parameters are encoded as exact JSON strings"""
+    assert json_loads(json_dumps({"amount": Decimal(PRECISE)})) == {"amount": PRECISE}
+    with pytest.raises(TypeError):
+        json_dumps({"value": object()})
+
+
+def test_decimal_annotations():
+    """Test which annotations select the Decimal conversion"""
+    assert _is_decimal_annotation(Decimal)
+    assert _is_decimal_annotation(Optional[Decimal])
+    assert _is_decimal_annotation("Decimal")
+    assert not _is_decimal_annotation(float)
+    assert not _is_decimal_annotation(None)
+    assert Price._takeo_columns["fee"]["decimal"]
+    assert not Price._takeo_columns["label"]["decimal"]
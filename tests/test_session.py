@@ -0,0 +1,144 @@
+"""
+Tests for the unit of work (takeo.Session)
+"""
+
+import json
+
+from takeo import Entity, PrimaryGeneratedColumn, Column
+
+
+@Entity("session_authors")
+class Author:
+    id = PrimaryGeneratedColumn()
+    name = Column("TEXT")
+    tags = Column("JSONB")
+
+    def __init__(self, name=None, tags=None):
+        self.id = None
+        self.name = name
+        self.tags = tags
+
+
+@Entity("session_books")
+class Book:
+    id = PrimaryGeneratedColumn()
+    title = Column("TEXT")
+
+    def __init__(self, title=None):
+        self.id = None
+        self.title = title
+
+
+def flushed_changes(api):
+    """Payload of the last ApplyChanges call"""
+    (changes_json,) = api.method_calls("ApplyChanges")[-1]
+    return json.loads(bytes(changes_json))
+
+
+def test_flush_payload(connection, api):
+    """Test flush sends inserts, changed columns and deletes in one ApplyChanges"""
+    connection.getRepository(Author).saveBatch([Author("Ada"), Author("Bob")])
+
+    session = connection.session()
+    ada, bob = session.find(Author)
+    ada.name = "Ada L."
+    session.delete(bob)
+    session.add(Author("Cy", ["new"]))
+    session.flush()
+
+    assert flushed_changes(api) == [
+        {
+            "entity": "Author",
+            "inserts": [{"name": "Cy", "tags": ["new"]}],
+            "updates": [{"id": ada.id, "updates": {"name": "Ada L."}}],
+            "deletes": [bob.id],
+        }
+    ]
+    assert sorted(row["name"] for row in api.tables["Author"].values()) == ["Ada L.", "Cy"]
+
+
+def test_unchanged_entities_are_not_written(connection, api):
+    """Test a flush without changes makes no call"""
+    connection.getRepository(Author).save(Author("Ada", ["a"]))
+
+    with connection.session() as session:
+        author = session.get(Author, 1)
+        author.name = "Ada"
+        author.tags = ["a"]
+
+    assert api.method_calls("ApplyChanges") == []
+
+
+def test_mutated_list_and_dict_values_are_detected(connection, api):
+    """Test in-place mutations of list and dict attributes produce an UPDATE"""
+    repository = connection.getRepository(Author)
+    repository.save(Author("Ada", ["a"]))
+    repository.save(Author("Bob", {"level": 1}))
+
+    session = connection.session()
+    ada = session.get(Author, 1)
+    bob = session.get(Author, 2)
+    ada.tags.append("b")
+    bob.tags["level"] = 2
+    session.flush()
+
+    assert flushed_changes(api)[0]["updates"] == [
+        {"id": 1, "updates": {"tags": ["a", "b"]}},
+        {"id": 2, "updates": {"tags": {"level": 2}}},
+    ]
+
+    # The snapshots were refreshed by the flush
+    session.flush()
+    assert len(api.method_calls("ApplyChanges")) == 1
+
+
+def test_inserted_ids_are_assigned_per_entity_type(connection, api):
+    """Test ids of a flush inserting several entity types go to the right entities"""
+    first_author, second_author = Author("Ada"), Author("Bob")
+    first_book, second_book = Book("Dune"), Book("Emma")
+
+    with connection.session() as session:
+        for entity in (first_book, first_author, second_book, second_author):
+            session.add(entity)
+
+    # One change set per type, in the order types were first added
+    assert [change["entity"] for change in flushed_changes(api)] == ["Book", "Author"]
+    assert api.tables["Book"][first_book.id]["title"] == "Dune"
+    assert api.tables["Book"][second_book.id]["title"] == "Emma"
+    assert api.tables["Author"][first_author.id]["name"] == "Ada"
+    assert api.tables["Author"][second_author.id]["name"] == "Bob"
+
+
+def test_flushed_inserts_are_tracked(connection, api):
+    """Test an inserted entity is then tracked: get returns it and edits are flushed"""
+    session = connection.session()
+    author = session.add(Author("Ada"))
+    session.flush()
+
+    assert session.get(Author, author.id) is author
+    author.name = "Ada L."
+    session.flush()
+    assert flushed_changes(api)[0]["updates"] == [
+        {"id": author.id, "updates": {"name": "Ada L."}}
+    ]
+
+
+def test_deleting_a_pending_insert_cancels_it(connection, api):
+    """Test delete of an entity added in the same session writes nothing"""
+    with connection.session() as session:
+        author = session.add(Author("Ada"))
+        session.delete(author)
+
+    assert api.method_calls("ApplyChanges") == []
+
+
+def test_exception_discards_pending_changes(connection, api):
+    """Test leaving the block with an exception does not flush"""
+    try:
+        with connection.session() as session:
+            session.add(Author("Ada"))
+            raise RuntimeError("abort")
+    except RuntimeError:
+        pass
+
+    assert api.method_calls("ApplyChanges") == []
@@ -0,0 +1,122 @@
+"""
+Tests for transactions (takeo.Transaction)
+"""
+
+import pytest
+
+from takeo import Entity, PrimaryGeneratedColumn, Column
+
+
+@Entity("tx_accounts")
+class Account:
+    id = PrimaryGeneratedColumn()
+    owner = Column("TEXT")
+    balance = Column("INTEGER")
+
+    def __init__(self, owner=None, balance=0):
+        self.id = None
+        self.owner = owner
+        self.balance = balance
+
+
+def balances(api):
+    return {row["owner"]: row["balance"] for row in api.tables.get("Account", {}).values()}
+
+
+def test_commit_makes_writes_visible(connection, api):
+    """Test writes are only applied when the transaction commits"""
+    tx = connection.transaction()
+    accounts = tx.getRepository(Account)
+    account = accounts.save(Account("ada", 10))
+    accounts.update(account.id, {"balance": 20})
+
+    assert accounts.findOne(account.id).balance == 20
+    assert balances(api) == {}
+
+    tx.commit()
+    assert balances(api) == {"ada": 20}
+    with pytest.raises(Exception, match="already finished"):
+        tx.commit()
+
+
+def test_rollback_discards_writes(connection, api):
+    """Test rollback leaves the committed data untouched"""
+    connection.getRepository(Account).save(Account("ada", 10))
+
+    tx = connection.transaction()
+    accounts = tx.getRepository(Account)
+    accounts.update(1, {"balance": 0})
+    accounts.saveBatch([Account("bob"), Account("cy")])
+    tx.rollback()
+
+    assert balances(api) == {"ada": 10}
+    with pytest.raises(Exception, match="already finished"):
+        tx.rollback()
+
+
+def test_context_manager_rolls_back_on_exception(connection, api):
+    """Test leaving the block with an exception rolls back and re-raises"""
+    with pytest.raises(RuntimeError):
+        with connection.transaction() as tx:
+            tx.getRepository(Account).save(Account("ada"))
+            raise RuntimeError("abort")
+
+    assert balances(api) == {}
+    assert len(api.method_calls("Rollback")) == 1
+    assert api.method_calls("Commit") == []
+
+
+def test_context_manager_commits(connection, api):
+    """Test leaving the block normally commits"""
+    with connection.transaction() as tx:
+        tx.getRepository(Account).save(Account("ada", 5))
+
+    assert balances(api) == {"ada": 5}
+
+
+def test_batched_writes_in_transaction(connection, api):
+    """Test updateBatch and deleteMany run inside the transaction"""
+    connection.getRepository(Account).saveBatch(
+        [Account("ada", 1), Account("bob", 2), Account("cy", 3)]
+    )
+
+    with connection.transaction() as tx:
+        accounts = tx.getRepository(Account)
+        assert accounts.updateBatch({1: {"balance": 10}, 2: {"balance": 20}}) == 2
+        assert accounts.deleteMany([3, 4]) == 1
+        assert balances(api) == {"ada": 1, "bob": 2, "cy": 3}
+
+    assert balances(api) == {"ada": 10, "bob": 20}
+    assert [args[0] for args in api.method_calls("TxUpdateBatch")] == [1]
+    assert api.method_calls("UpdateBatch") == []
+    assert api.method_calls("DeleteBatch") == []
+
+
+def test_unsupported_operations_raise(connection):
+    """Test operations the Go transaction does not support are rejected"""
+    with connection.transaction() as tx:
+        accounts = tx.getRepository(Account)
+        with pytest.raises(Exception, match="not available inside a transaction"):
+            accounts.deleteWhere({"owner": "ada"})
+        with pytest.raises(Exception, match="not available inside a transaction"):
+            list(accounts.findIter())
+        with pytest.raises(Exception, match="not available inside a transaction"):
+            accounts.saveDeferred(Account("ada"))
+
+
+@pytest.mark.parametrize("end", ["commit", "rollback"])
+def test_finishing_evicts_identity_map(tracked_connection, api, end):
+    """Test commit and rollback forget the tracked entities of the classes written"""
+    repository = tracked_connection.getRepository(Account)
+    repository.save(Account("ada", 10))
+    tracked = repository.findOne(1)
+
+    tx = tracked_connection.transaction()
+    tx.getRepository(Account).update(1, {"balance": 0})
+    tracked.balance = 0  # e.g. the caller mirrored the write on its instance
+    getattr(tx, end)()
+
+    assert len(tracked_connection._identity_map) == 0
+    reloaded = repository.findOne(1)
+    assert reloaded is not tracked
+    assert reloaded.balance == (0 if end == "commit" else 10)